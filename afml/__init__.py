@@ -0,0 +1 @@
+"""AFML: dữ liệu chứng khoán Việt Nam, thanh thông tin (information-driven bars) và phân bổ danh mục HRP/NCO."""
@@ -0,0 +1,170 @@
+"""
+Giao diện dòng lệnh cho các job ngắn (chạy theo lịch):
+
+    afml load FPT VNM --start 2025-01-01 --freq 1D --field close --update-aggregates --out close.csv
+    afml bars FPT --type dollar --start 2025-01-01 --n-target 10 --out fpt_dollar.csv
+    afml hrp --top 50 --start 2025-01-01 --freq 1D --estimator ledoit-wolf --out weights.csv
+
+Chỉ argparse được import lúc khởi động; pandas/numba/scipy/matplotlib được nạp bên trong
+từng lệnh, và chỉ những gì lệnh đó thực sự cần.
+"""
+import argparse
+import sys
+
+
+def _write_or_print(df, out, label):
+    if out:
+        df.to_csv(out)
+        print(f"[{label}] Đã ghi {len(df)} dòng vào {out}")
+    else:
+        print(df)
+
+
+def cmd_load(args):
+    if args.field:
+        from afml.services.data_loader import load_panel
+        panel = load_panel(args.field, args.tickers or None, args.start, args.end, how=args.how,
+                           source=args.source, freq=args.freq, update=args.update_aggregates)
+        _write_or_print(panel, args.out, 'load')
+        return 0
+
+    import pandas as pd
+    from afml.services.data_loader import load_stocks
+    stocks = load_stocks(args.tickers or None, args.start, args.end, source=args.source, freq=args.freq,
+                         update=args.update_aggregates)
+    summary = pd.DataFrame({
+        'rows': {t: len(df) for t, df in stocks.items()},
+        'first': {t: df['time'].min() if len(df) else None for t, df in stocks.items()},
+        'last': {t: df['time'].max() if len(df) else None for t, df in stocks.items()},
+    })
+    _write_or_print(summary, args.out, 'load')
+    return 0
+
+
+def cmd_bars(args):
+    import pandas as pd
+    from afml.services.data_loader import load_stocks
+    from afml.models.preprocess.info_driven import TimeBar, DollarBar
+
+    stocks = load_stocks([args.ticker], args.start, args.end, source=args.source)
+    if args.ticker not in stocks or stocks[args.ticker].empty:
+        print(f"[bars] Không có dữ liệu cho {args.ticker}.", file=sys.stderr)
+        return 1
+    df = stocks[args.ticker]
+    df = df.assign(time=pd.to_datetime(df['time'])).set_index('time').sort_index()
+    df['typical_price'] = (df['open'] + df['high'] + df['low'] + df['close']) / 4.0
+    df['dollar_value'] = df['typical_price'] * df['volume']
+
+    if args.type == 'time':
+        bars = TimeBar.time_bar(df, expected_bars=args.expected_bars)
+    elif args.type == 'dollar':
+        bars = DollarBar.dynamic_dollar_bars(df, rolling_window=args.rolling_window, n_target=args.n_target)
+    elif args.type == 'imbalance':
+        bars = DollarBar.imbalance(df, initial_T_guess=args.initial_t, span=args.span)
+    else:
+        bars = DollarBar.runs_bar(df, initial_T_guess=args.initial_t, span=args.span, run_type=args.run_type)
+    _write_or_print(bars, args.out, 'bars')
+    return 0
+
+
+def _make_estimator(name, span, psd_repair=None):
+    from afml.models.opti.estimators import EWMACovariance, LedoitWolfShrinkage, SampleCovariance
+    if name == 'ewma':
+        return EWMACovariance(span=span)
+    if name == 'ledoit-wolf':
+        return LedoitWolfShrinkage()
+    return SampleCovariance(psd_repair=psd_repair)
+
+
+def cmd_hrp(args):
+    import os
+    import pandas as pd
+    from afml.utils.config import stocks_data_path
+    from afml.services.data_loader import load_panel
+    from afml.utils.math_engines import panel_log_returns
+    from afml.models.opti.HRP import HRP
+
+    tickers = args.tickers
+    if not tickers:
+        tickers = sorted(os.path.splitext(f)[0] for f in os.listdir(stocks_data_path) if f.endswith('.csv'))
+        tickers = tickers[:args.top] if args.top else tickers
+    # 'sample' ước lượng pairwise-complete nên giữ được toàn bộ lịch sử của từng mã;
+    # các bộ ước lượng khác cần panel đầy đủ
+    how = 'mask' if args.estimator == 'sample' else 'inner'
+    prices = load_panel('close', tickers, args.start, args.end, how=how, source=args.source, freq=args.freq,
+                        update=args.update_aggregates)
+    returns = pd.DataFrame(panel_log_returns(prices.values), columns=prices.columns)
+    returns = returns.dropna(how='all') if how == 'mask' else returns.dropna()
+    if returns.empty or returns.shape[1] < 2:
+        print("[hrp] Không đủ dữ liệu lợi suất để phân bổ.", file=sys.stderr)
+        return 1
+
+    model = HRP(use_numba=args.numba, bisection=args.bisection, linkage_backend=args.linkage,
+                estimator=_make_estimator(args.estimator, args.span, args.psd_repair))
+    weights = model.allocate(returns, visualize=args.plot).to_frame(name='weight')
+    weights.index.name = 'ticker'
+    _write_or_print(weights, args.out, 'hrp')
+    if args.plot:
+        import matplotlib.pyplot as plt
+        plt.show()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='afml', description="Công cụ dữ liệu, thanh thông tin và phân bổ HRP.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    def add_common(p):
+        p.add_argument('--start', default=None, help="Ngày bắt đầu (YYYY-MM-DD).")
+        p.add_argument('--end', default=None, help="Ngày kết thúc (YYYY-MM-DD).")
+        p.add_argument('--source', choices=('csv', 'store'), default='csv')
+        p.add_argument('--out', default=None, help="Ghi kết quả ra CSV thay vì in ra màn hình.")
+
+    p_load = sub.add_parser('load', help="Đọc dữ liệu giá (tóm tắt theo mã hoặc panel một cột).")
+    p_load.add_argument('tickers', nargs='*', help="Danh sách mã (mặc định: toàn bộ).")
+    add_common(p_load)
+    p_load.add_argument('--freq', default=None, help="None = 1 phút; '5min', '15min', '1D' đọc từ kho tổng hợp.")
+    p_load.add_argument('--update-aggregates', action='store_true',
+                        help="Cập nhật tăng dần kho tổng hợp của --freq trước khi đọc.")
+    p_load.add_argument('--field', default=None, help="Dựng panel (time x ticker) cho cột này, vd close.")
+    p_load.add_argument('--how', choices=('inner', 'ffill', 'mask'), default='inner')
+    p_load.set_defaults(func=cmd_load)
+
+    p_bars = sub.add_parser('bars', help="Sinh thanh thời gian / dollar / imbalance / runs cho một mã.")
+    p_bars.add_argument('ticker')
+    add_common(p_bars)
+    p_bars.add_argument('--type', choices=('time', 'dollar', 'imbalance', 'runs'), default='dollar')
+    p_bars.add_argument('--expected-bars', type=int, default=3078)
+    p_bars.add_argument('--rolling-window', type=int, default=20)
+    p_bars.add_argument('--n-target', type=int, default=20)
+    p_bars.add_argument('--initial-t', type=int, default=100)
+    p_bars.add_argument('--span', type=int, default=100)
+    p_bars.add_argument('--run-type', choices=('tick', 'volume', 'dollar'), default='dollar', help="v_t cho --type runs.")
+    p_bars.set_defaults(func=cmd_bars)
+
+    p_hrp = sub.add_parser('hrp', help="Phân bổ HRP trên lợi suất log của giá đóng cửa.")
+    p_hrp.add_argument('tickers', nargs='*', help="Danh sách mã (mặc định: --top mã đầu tiên).")
+    add_common(p_hrp)
+    p_hrp.add_argument('--top', type=int, default=50)
+    p_hrp.add_argument('--freq', default=None, help="Tần suất giá, vd 1D cho HRP theo ngày.")
+    p_hrp.add_argument('--update-aggregates', action='store_true',
+                       help="Cập nhật tăng dần kho tổng hợp của --freq trước khi đọc.")
+    p_hrp.add_argument('--estimator', choices=('sample', 'ewma', 'ledoit-wolf'), default='sample')
+    p_hrp.add_argument('--span', type=int, default=60, help="span cho --estimator ewma.")
+    p_hrp.add_argument('--psd-repair', choices=('clip', 'higham'), default=None,
+                       help="Sửa cov pairwise-complete về PSD gần nhất (--estimator sample).")
+    p_hrp.add_argument('--linkage', choices=('scipy', 'mst'), default='scipy')
+    p_hrp.add_argument('--bisection', choices=('halving', 'tree'), default='halving')
+    p_hrp.add_argument('--numba', action='store_true', help="Dùng kernel Numba cho Recursive Bisection.")
+    p_hrp.add_argument('--plot', action='store_true')
+    p_hrp.set_defaults(func=cmd_hrp)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
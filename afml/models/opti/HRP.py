@@ -0,0 +1,282 @@
+import os
+
+import pandas as pd
+import numpy as np
+
+from afml.utils.math_engines import pairwise_distance
+from afml.models.opti.cluster_tree import ClusterTree
+from afml.models.opti.estimators import SampleCovariance
+from afml.models.opti.mst import IncrementalMST
+
+class HRP:
+    def __init__(self, dtype=None, block_size=None, use_numba=False, bisection='halving', estimator=None,
+                 cache=None, distance='dod', linkage_backend='scipy'):
+        """
+        :param dtype: kiểu số thực cho ma trận khoảng cách (np.float32 để tiết kiệm bộ nhớ).
+        :param block_size: kích thước khối khi tính khoảng cách (None = tính một lần).
+        :param use_numba: dùng kernel Numba cho Recursive Bisection thay vì NumPy.
+        :param bisection: 'halving' (chia đôi danh sách như bài báo) hoặc 'tree' (chia theo dendrogram).
+        :param estimator: bộ ước lượng cov/corr một lượt (mặc định SampleCovariance).
+        :param cache: ClusteringCache (tuỳ chọn) để dùng lại linkage/thứ tự lá giữa các lần gọi.
+        :param distance: 'dod' (distance-of-distance như bài báo) hoặc 'corr' (sqrt(0.5 * (1 - corr))).
+        :param linkage_backend: 'scipy' (sch.linkage) hoặc 'mst' (IncrementalMST).
+        """
+        if bisection not in ('halving', 'tree'):
+            raise ValueError("bisection phải là 'halving' hoặc 'tree'.")
+        if distance not in ('dod', 'corr'):
+            raise ValueError("distance phải là 'dod' hoặc 'corr'.")
+        if linkage_backend not in ('scipy', 'mst'):
+            raise ValueError("linkage_backend phải là 'scipy' hoặc 'mst'.")
+        self.distance = distance
+        self.linkage_backend = linkage_backend
+        self.bisection = bisection
+        self.dtype = dtype
+        self.block_size = block_size
+        self.use_numba = use_numba
+        self.estimator = estimator if estimator is not None else SampleCovariance()
+        self.cache = cache
+
+    def get_distance_matrix(self, corr):
+        # 1. Khoảng cách cơ bản dựa trên tương quan
+        dist_corr = np.sqrt(0.5 * (1 - corr))
+        if self.distance == 'corr':
+            # Chỉ phụ thuộc corr_ij: khoảng cách cũ không đổi khi universe đổi (hợp với IncrementalMST)
+            dist_values = np.array(dist_corr.values, dtype=self.dtype or np.float64)
+            np.fill_diagonal(dist_values, 0.0)
+            return pd.DataFrame(dist_values, index=corr.index, columns=corr.columns)
+        
+        # 2. Khoảng cách của khoảng cách (Distance of Distance)
+        # Tính cả ma trận bằng đồng nhất thức Gram thay vì vòng lặp đôi O(n^3) trên pandas
+        dist_of_dist = pairwise_distance(dist_corr.values, dtype=self.dtype, block_size=self.block_size)
+                
+        return pd.DataFrame(dist_of_dist, index=corr.index, columns=corr.columns)
+
+    def get_linkage(self, dist_of_dist):
+        if self.linkage_backend == 'mst':
+            # Single linkage = MST: Prim trên ma trận dày, không tạo ma trận nén squareform
+            return IncrementalMST(dist_of_dist).to_linkage()
+
+        # scipy chỉ được import khi thực sự cần linkage (giữ import HRP nhẹ cho job nhỏ)
+        import scipy.cluster.hierarchy as sch
+        from scipy.spatial.distance import squareform
+        dist_values = dist_of_dist.values
+        # Đảm bảo ma trận đối xứng và đường chéo bằng 0 cho squareform
+        dist_values = (dist_values + dist_values.T) / 2
+        np.fill_diagonal(dist_values, 0)
+        dist_array = squareform(dist_values)
+        
+        # Sử dụng 'single' linkage theo thuật toán bài báo
+        link = sch.linkage(dist_array, method='single')
+        return link
+
+    def get_cluster_tree(self, link):
+        # Cây mảng dựng một lần, dùng chung cho quasi-diag, bisection và vẽ
+        return ClusterTree(link)
+
+    def get_quasi_diag(self, link, tree=None):
+        # Thứ tự lá = duyệt tiền thứ tự cây (con trái trước), O(n)
+        tree = tree if tree is not None else self.get_cluster_tree(link)
+        return tree.order.tolist()
+
+    @staticmethod
+    def _cluster_var(cov_sorted, inv_diag, start, stop):
+        """Phương sai cụm [start, stop) với trọng số nghịch đảo phương sai nội bộ (w' Σ w)."""
+        ivp = inv_diag[start:stop] / inv_diag[start:stop].sum()
+        return ivp @ cov_sorted[start:stop, start:stop] @ ivp
+
+    def get_rec_bipart(self, cov, sort_ix, tree=None):
+        """
+        Recursive Bisection. Mặc định chia đôi danh sách sort_ix (như bài báo);
+        nếu truyền `tree` thì chia theo dendrogram thật (con trái / con phải của mỗi cụm).
+        """
+        # Sắp xếp lại cov một lần theo sort_ix: mọi cụm trở thành khối liền kề [start, stop)
+        sort_arr = np.asarray(sort_ix, dtype=np.int64)
+        cov_values = np.asarray(cov.values if hasattr(cov, 'values') else cov, dtype=np.float64)
+        cov_sorted = np.ascontiguousarray(cov_values[np.ix_(sort_arr, sort_arr)])
+
+        if self.use_numba:
+            from afml.utils.numba_kernels import rec_bipart, rec_bipart_splits
+        if tree is not None:
+            splits = tree.splits()
+            if self.use_numba:
+                w = rec_bipart_splits(cov_sorted, splits)
+            else:
+                w = self._rec_bipart_splits_numpy(cov_sorted, splits)
+        elif self.use_numba:
+            w = rec_bipart(cov_sorted)
+        else:
+            w = self._rec_bipart_numpy(cov_sorted)
+
+        return pd.Series(w, index=sort_ix)
+
+    @staticmethod
+    def _rec_bipart_numpy(cov_sorted):
+        n = cov_sorted.shape[0]
+        # Nghịch đảo phương sai tính trước cho toàn bộ đường chéo
+        # (cộng 1e-8 để tránh chia cho 0 với tài sản không có variance)
+        inv_diag = 1. / (np.diag(cov_sorted) + 1e-8)
+        w = np.ones(n)
+
+        c_items = [(0, n)]
+        while len(c_items) > 0:
+            # Chia đôi mỗi cụm theo vị trí (tương đương cắt list i[:len//2], i[len//2:])
+            c_items = [
+                part
+                for start, stop in c_items if stop - start > 1
+                for part in ((start, start + (stop - start) // 2), (start + (stop - start) // 2, stop))
+            ]
+
+            for i in range(0, len(c_items), 2):
+                start0, stop0 = c_items[i]
+                start1, stop1 = c_items[i + 1]
+
+                c_var0 = HRP._cluster_var(cov_sorted, inv_diag, start0, stop0)
+                c_var1 = HRP._cluster_var(cov_sorted, inv_diag, start1, stop1)
+
+                alpha = 1 - c_var0 / (c_var0 + c_var1)
+
+                w[start0:stop0] *= alpha
+                w[start1:stop1] *= 1 - alpha
+
+        return w
+
+    @staticmethod
+    def _rec_bipart_splits_numpy(cov_sorted, splits):
+        inv_diag = 1. / (np.diag(cov_sorted) + 1e-8)
+        w = np.ones(cov_sorted.shape[0])
+
+        # splits đã theo thứ tự từ gốc xuống lá
+        for start, mid, stop in splits:
+            c_var0 = HRP._cluster_var(cov_sorted, inv_diag, start, mid)
+            c_var1 = HRP._cluster_var(cov_sorted, inv_diag, mid, stop)
+            alpha = 1 - c_var0 / (c_var0 + c_var1)
+            w[start:mid] *= alpha
+            w[mid:stop] *= 1 - alpha
+
+        return w
+        
+    def plot_visualizations(self, corr, link, sort_ix, tree=None):
+        import matplotlib.pyplot as plt
+        # --- Cửa sổ 1: Sơ đồ cây (Dendrogram) ---
+        plt.figure(figsize=(10, 6))
+        plt.title("Tree Clustering Dendrogram")
+        if tree is not None:
+            # Vẽ lại từ cây đã dựng, không để scipy tính lại dendrogram
+            icoord, dcoord = tree.dendrogram_coords()
+            for xs, ys in zip(icoord, dcoord):
+                plt.plot(xs, ys, color='C0', linewidth=1)
+            labels = corr.index[tree.order].tolist()
+            plt.xticks(5 + 10 * np.arange(len(labels)), labels, rotation=90)
+            plt.xlim(0, 10 * len(labels))
+        else:
+            import scipy.cluster.hierarchy as sch
+            sch.dendrogram(link, labels=corr.index.tolist(), leaf_rotation=90)
+        min_merge_dist = link[0, 2]
+        plt.ylim(bottom=max(0, min_merge_dist - 0.02))
+        plt.xlabel("Tài sản (Assets)")
+        plt.ylabel("Khoảng cách")
+        plt.tight_layout()
+        
+        # --- Cửa sổ 2: So sánh Heatmap Correlation (Trước và Sau Quasi-Diagonalization) ---
+        fig, axes = plt.subplots(1, 2, figsize=(16, 7))
+        
+        # 1. Heatmap: Trước khi sắp xếp (Gốc)
+        im1 = axes[0].imshow(corr.values, cmap='coolwarm', vmin=-0.5, vmax=0.5, aspect='auto')
+        axes[0].set_title("Correlation Heatmap: Gốc (Trước Quasi-Diag)")
+        axes[0].set_xticks(np.arange(len(corr.columns)))
+        axes[0].set_yticks(np.arange(len(corr.index)))
+        axes[0].set_xticklabels(corr.columns, rotation=90, fontsize=9)
+        axes[0].set_yticklabels(corr.index, fontsize=9)
+        fig.colorbar(im1, ax=axes[0])
+        
+        # 2. Heatmap: Sau khi sắp xếp (Quasi-Diagonalization)
+        corr_sorted = corr.iloc[sort_ix, sort_ix]
+        im2 = axes[1].imshow(corr_sorted.values, cmap='coolwarm', vmin=-0.5, vmax=0.5, aspect='auto')
+        axes[1].set_title("Correlation Heatmap: Sau khi sắp xếp (Quasi-Diag)")
+        axes[1].set_xticks(np.arange(len(corr_sorted.columns)))
+        axes[1].set_yticks(np.arange(len(corr_sorted.index)))
+        axes[1].set_xticklabels(corr_sorted.columns, rotation=90, fontsize=9)
+        axes[1].set_yticklabels(corr_sorted.index, fontsize=9)
+        fig.colorbar(im2, ax=axes[1])
+
+        plt.tight_layout()
+
+    def allocate(self, returns_df, visualize=False, estimator=None):
+        """
+        :param returns_df: DataFrame lợi suất (time x assets), được phép có NaN (lịch sử không đều):
+                           SampleCovariance ước lượng pairwise-complete trên toàn bộ lịch sử chung.
+        :param estimator: bộ ước lượng cov/corr (mặc định self.estimator), xem models.opti.estimators.
+        """
+        estimator = estimator if estimator is not None else self.estimator
+        cov, corr = estimator.estimate(returns_df)
+        return self.allocate_cov(cov, corr, visualize=visualize, estimator_params=estimator.params())
+
+    def allocate_cov(self, cov, corr, visualize=False, estimator_params=None, link=None):
+        """
+        Phân bổ HRP từ ma trận hiệp phương sai và tương quan đã tính sẵn
+        (dùng cho các engine tự cập nhật cov/corr như walk-forward).
+        :param link: linkage tính sẵn theo thứ tự cov.columns (vd IncrementalMST.to_linkage), bỏ qua bước phân cụm.
+        """
+        # 1. Tree Clustering (dùng lại từ cache nếu tương quan chưa trôi quá ngưỡng)
+        cached = None
+        if link is not None:
+            cached = (link, self.get_cluster_tree(link))
+        elif self.cache is not None:
+            cache_key = self.cache.make_key(corr.columns, estimator_params)
+            cached = self.cache.lookup(cache_key, corr.values)
+
+        if cached is not None:
+            link, tree = cached
+        else:
+            dist_matrix = self.get_distance_matrix(corr)
+            link = self.get_linkage(dist_matrix)
+            tree = self.get_cluster_tree(link)
+            if self.cache is not None:
+                self.cache.store(cache_key, corr.values, link, tree)
+            
+        # 2. Quasi-Diagonalization
+        sort_ix = self.get_quasi_diag(link, tree=tree)
+        
+        if visualize:
+            self.plot_visualizations(corr, link, sort_ix, tree=tree)
+        
+        # 3. Recursive Bisection
+        weights = self.get_rec_bipart(cov, sort_ix, tree=tree if self.bisection == 'tree' else None)
+        
+        # Ánh xạ index kết quả về index chữ (tên các assets ban đầu)
+        weights.index = cov.columns[weights.index] 
+        weights = weights.loc[cov.columns]
+        
+        return weights
+
+if __name__ == "__main__":
+    # Chạy: python -m afml.models.opti.HRP (hoặc lệnh CLI `afml hrp`)
+    import matplotlib.pyplot as plt
+    from afml.utils.config import stocks_data_path
+    from afml.services.data_loader import load_panel
+    from afml.utils.math_engines import panel_log_returns
+
+    # Chọn ra max 50 mã để test (có thể chọn toàn bộ nều tài nguyên cho phép)
+    all_tickers = [os.path.splitext(f)[0] for f in os.listdir(stocks_data_path) if f.endswith('.csv')]
+    tickers_to_test = all_tickers[:50]
+    print(f"\nSử dụng {len(tickers_to_test)} mã để test HRP: {tickers_to_test}")
+    
+    print("Đang tải ma trận giá đóng cửa (time x ticker)...")
+    # Giữ NaN ở ô thiếu: mã niêm yết muộn không làm cụt lịch sử của các mã khác
+    prices_df = load_panel('close', tickers_to_test, start_date='2025-01-01', how='mask')
+    
+    print("\nTính Log Returns với hàm từ core.math_engines...")
+    # Một kernel cho toàn bộ ma trận (time x ticker); giá NaN hoặc <= 0 cho lợi suất NaN
+    returns_df = pd.DataFrame(panel_log_returns(prices_df.values), columns=prices_df.columns)
+    returns_df.dropna(how='all', inplace=True)
+    
+    print("\nKhởi tạo mô hình HRP và phân bổ danh mục (có bật visualize=True)...")
+    model = HRP()
+    weights = model.allocate(returns_df, visualize=True)
+    
+    print("\n>>> KẾT QUẢ TRỌNG SỐ PHÂN BỔ HRP <<<")
+    print(weights.to_frame(name="Weight"))
+    print("\nTổng trọng số (Cần xấp xỉ 1.0):", weights.sum())
+    
+    # Hiện biểu đồ thụt lùi xuống cuối cùng để in text ra xong mới vẽ
+    plt.show()
\ No newline at end of file
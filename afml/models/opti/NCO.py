@@ -0,0 +1,155 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import numpy as np
+
+from afml.models.opti.HRP import HRP
+
+
+def opt_port(cov, mu=None):
+    """
+    Danh mục tối ưu dạng đóng: w ∝ C^-1 mu (mu=None -> vector 1 -> min-variance), chuẩn hoá tổng bằng 1.
+    """
+    ones = np.ones(cov.shape[0])
+    mu = ones if mu is None else mu
+    try:
+        w = np.linalg.solve(cov, mu)
+    except np.linalg.LinAlgError:
+        # Ma trận suy biến (vd cụm có tài sản trùng lặp) -> giả nghịch đảo
+        w = np.linalg.pinv(cov) @ mu
+    return w / (ones @ w)
+
+
+def _intra_solve(args):
+    cov_block, mu_block = args
+    return opt_port(cov_block, mu_block)
+
+
+class NCO:
+    """
+    Nested Clustered Optimization (AFML/MLAM chương 16).
+    1. Phân cụm tài sản bằng ma trận khoảng cách/linkage của HRP.
+    2. Giải tối ưu trong từng cụm (độc lập -> song song được trên process pool).
+    3. Giải bài toán rút gọn giữa các cụm trên cov_reduced = W^T C W.
+
+    Chi phí giải một cụm ~ |cụm|^3, nên các cụm chỉ được gửi sang pool khi tổng sum |cụm|^3 đạt
+    `min_parallel_work` (vd universe 1000 mã ~ 31 cụm x 32 mã); universe nhỏ giải tuần tự vì dựng pool
+    và pickle các khối cov tốn hơn chính phép giải.
+    """
+    def __init__(self, n_clusters=None, max_clusters=None, objective='min_var', max_workers=None, hrp=None,
+                 executor=None, min_parallel_work=1_000_000):
+        """
+        :param n_clusters: số cụm cố định. None = chọn theo silhouette trong [2, max_clusters].
+        :param max_clusters: số cụm tối đa khi tự chọn (mặc định sqrt(n)).
+        :param objective: 'min_var' hoặc 'max_sharpe' (cần truyền mu khi allocate).
+        :param max_workers: số process giải cụm khi tự dựng pool. 1 = tuần tự, None = số core.
+        :param hrp: instance HRP cung cấp estimator, distance và linkage (mặc định HRP()).
+        :param executor: Executor do người gọi quản lý (vd ProcessPoolExecutor dùng lại qua nhiều lần
+                         allocate); khi truyền thì không tự dựng pool và bỏ qua max_workers.
+        :param min_parallel_work: tổng sum |cụm|^3 tối thiểu để gửi các cụm sang pool.
+        """
+        if objective not in ('min_var', 'max_sharpe'):
+            raise ValueError("objective phải là 'min_var' hoặc 'max_sharpe'.")
+        self.n_clusters = n_clusters
+        self.max_clusters = max_clusters
+        self.objective = objective
+        self.max_workers = max_workers
+        self.hrp = hrp if hrp is not None else HRP()
+        self.executor = executor
+        self.min_parallel_work = min_parallel_work
+
+    @staticmethod
+    def silhouette(dist, labels):
+        """Hệ số silhouette trung bình trên ma trận khoảng cách dày, vector hoá O(n^2 * k)."""
+        n = dist.shape[0]
+        clusters, inv = np.unique(labels, return_inverse=True)
+        onehot = np.zeros((n, len(clusters)))
+        onehot[np.arange(n), inv] = 1.0
+        counts = onehot.sum(axis=0)
+
+        sums = dist @ onehot
+        own = counts[inv]
+        # a: khoảng cách trung bình trong cụm (bỏ chính nó), b: cụm gần nhất khác
+        a = np.where(own > 1, sums[np.arange(n), inv] / np.maximum(own - 1, 1), 0.0)
+        means = sums / counts
+        means[np.arange(n), inv] = np.inf
+        b = means.min(axis=1)
+        s = np.where(own > 1, (b - a) / np.maximum(a, b), 0.0)
+        return float(s.mean())
+
+    def get_clusters(self, corr):
+        """
+        :return: np.ndarray nhãn cụm (0..k-1) theo thứ tự corr.columns.
+        """
+        import scipy.cluster.hierarchy as sch
+        dist = self.hrp.get_distance_matrix(corr)
+        link = self.hrp.get_linkage(dist)
+        n = corr.shape[0]
+
+        if self.n_clusters is not None:
+            candidates = [min(self.n_clusters, n)]
+        else:
+            max_k = self.max_clusters or max(2, int(np.sqrt(n)))
+            candidates = range(2, min(max_k, n - 1) + 1)
+
+        best_labels, best_score = np.zeros(n, dtype=np.int64), -np.inf
+        dist_values = np.asarray(dist.values, dtype=np.float64)
+        for k in candidates:
+            labels = sch.fcluster(link, t=k, criterion='maxclust')
+            score = self.silhouette(dist_values, labels) if len(candidates) > 1 else 0.0
+            if score > best_score:
+                best_score, best_labels = score, labels
+        return np.unique(best_labels, return_inverse=True)[1]
+
+    def allocate(self, returns_df, mu=None, estimator=None):
+        """
+        :param returns_df: DataFrame lợi suất (time x assets).
+        :param mu: lợi suất kỳ vọng (Series/array theo cột) cho objective='max_sharpe'.
+        :return: pd.Series trọng số theo returns_df.columns.
+        """
+        estimator = estimator if estimator is not None else self.hrp.estimator
+        cov, corr = estimator.estimate(returns_df)
+        return self.allocate_cov(cov, corr, mu=mu)
+
+    def allocate_cov(self, cov, corr, mu=None):
+        if self.objective == 'max_sharpe':
+            if mu is None:
+                raise ValueError("[NCO] objective='max_sharpe' cần mu.")
+            if isinstance(mu, pd.Series):
+                mu = mu.reindex(cov.columns).values
+            mu = np.asarray(mu, dtype=np.float64)
+        else:
+            mu = None
+
+        cov_values = np.asarray(cov.values, dtype=np.float64)
+        labels = self.get_clusters(corr)
+        n_clusters = labels.max() + 1
+        members = [np.flatnonzero(labels == c) for c in range(n_clusters)]
+
+        # 2. Tối ưu nội cụm: các cụm độc lập, chỉ gửi sang pool khi tổng khối lượng đủ bù chi phí pool
+        jobs = [
+            (cov_values[np.ix_(idx, idx)], None if mu is None else mu[idx])
+            for idx in members
+        ]
+        work = sum(len(idx) ** 3 for idx in members)
+        parallel = n_clusters > 1 and work >= self.min_parallel_work
+        if parallel and self.executor is not None:
+            intra = list(self.executor.map(_intra_solve, jobs))
+        elif parallel and self.max_workers != 1:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                intra = list(executor.map(_intra_solve, jobs))
+        else:
+            intra = [_intra_solve(job) for job in jobs]
+
+        w_intra = np.zeros((cov_values.shape[0], n_clusters))
+        for c, (idx, w) in enumerate(zip(members, intra)):
+            w_intra[idx, c] = w
+
+        # 3. Tối ưu liên cụm trên ma trận rút gọn
+        cov_reduced = w_intra.T @ cov_values @ w_intra
+        mu_reduced = None if mu is None else w_intra.T @ mu
+        w_inter = opt_port(cov_reduced, mu_reduced)
+
+        weights = w_intra @ w_inter
+        self.labels_ = pd.Series(labels, index=cov.columns)
+        return pd.Series(weights, index=cov.columns)
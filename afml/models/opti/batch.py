@@ -0,0 +1,122 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import pandas as pd
+import numpy as np
+
+from afml.models.opti.HRP import HRP
+
+# Trạng thái của mỗi worker: view numpy trỏ vào vùng shared memory (gán trong initializer)
+_worker_state = {}
+
+
+def _init_worker(shm_name, shape, dtype, hrp):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_state['shm'] = shm  # giữ tham chiếu để vùng nhớ không bị đóng
+    _worker_state['values'] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _worker_state['hrp'] = hrp
+
+
+def _allocate_job(values, hrp, start, end, col_pos):
+    # Giữ nguyên NaN: estimator tự ước lượng pairwise-complete (lịch sử không đều giữa các mã)
+    sub = values[start:end, col_pos]
+    return hrp.allocate(pd.DataFrame(sub)).values
+
+
+def _run_job(job):
+    return _allocate_job(_worker_state['values'], _worker_state['hrp'], *job)
+
+
+def _resolve_job(returns_df, window, tickers):
+    """
+    Chuyển một job (window, tickers) thành (start, end, vị trí cột).
+    - window: slice hoặc tuple (start, end) theo nhãn index (bao gồm 2 đầu như .loc), None = toàn bộ.
+    - tickers: danh sách mã, None = toàn bộ cột.
+    """
+    if window is None:
+        window = slice(None)
+    elif not isinstance(window, slice):
+        window = slice(*window)
+    rows = returns_df.index.slice_indexer(window.start, window.stop)
+    start, end, _ = rows.indices(len(returns_df.index))
+
+    if tickers is None:
+        col_pos = np.arange(returns_df.shape[1])
+    else:
+        col_pos = returns_df.columns.get_indexer(tickers)
+        if (col_pos < 0).any():
+            missing = [t for t, p in zip(tickers, col_pos) if p < 0]
+            raise KeyError(f"[Batch HRP] Không tìm thấy mã: {missing}")
+    return start, end, col_pos
+
+
+def batch_allocate(returns_df, jobs, max_workers=None, hrp=None, return_report=False):
+    """
+    Chạy HRP cho nhiều (cửa sổ, tập mã) song song trên process pool.
+    Ma trận lợi suất được đặt một lần vào shared memory, worker chỉ đọc view chứ không nhận bản pickle.
+
+    :param returns_df: DataFrame lợi suất (time x assets), index đã sắp xếp.
+    :param jobs: list các tuple (window, tickers) (job id = vị trí trong list)
+                 hoặc dict {job_id: (window, tickers)}, xem _resolve_job.
+    :param max_workers: số process. 1 = chạy tuần tự trong process hiện tại.
+    :param hrp: instance HRP cấu hình sẵn (mặc định HRP()).
+    :param return_report: trả thêm báo cáo {'jobs', 'ok', 'failed', 'seconds'}.
+    :return: DataFrame trọng số, index 'job' là job id theo đúng thứ tự đầu vào,
+             cột là toàn bộ assets (NaN với mã không thuộc job).
+             Job lỗi không làm hỏng cả lô: dòng của nó toàn NaN và được liệt kê trong report['failed'].
+    """
+    hrp = hrp if hrp is not None else HRP()
+    job_ids, specs = (list(jobs.keys()), list(jobs.values())) if isinstance(jobs, dict) \
+        else (list(range(len(jobs))), list(jobs))
+    report = {'jobs': len(specs), 'ok': 0, 'failed': [], 'seconds': 0.0}
+
+    t0 = time.perf_counter()
+    resolved = {}
+    for job_id, (window, tickers) in zip(job_ids, specs):
+        try:
+            resolved[job_id] = _resolve_job(returns_df, window, tickers)
+        except Exception as e:
+            report['failed'].append((job_id, f"{type(e).__name__}: {e}"))
+
+    values = np.ascontiguousarray(returns_df.values, dtype=np.float64)
+    results = {}
+
+    def collect(job_id, run):
+        try:
+            results[job_id] = run()
+            report['ok'] += 1
+        except Exception as e:
+            report['failed'].append((job_id, f"{type(e).__name__}: {e}"))
+
+    if max_workers == 1:
+        for job_id, job in resolved.items():
+            collect(job_id, lambda: _allocate_job(values, hrp, *job))
+    elif resolved:
+        shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        try:
+            shared = np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)
+            shared[:] = values
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_worker,
+                initargs=(shm.name, values.shape, values.dtype, hrp),
+            ) as executor:
+                futures = {job_id: executor.submit(_run_job, job) for job_id, job in resolved.items()}
+                for job_id, future in futures.items():
+                    collect(job_id, future.result)
+            del shared
+        finally:
+            shm.close()
+            shm.unlink()
+
+    report['seconds'] = time.perf_counter() - t0
+    for job_id, error in report['failed']:
+        print(f"[Batch HRP] Lỗi job {job_id!r}: {error}")
+
+    panel = np.full((len(job_ids), returns_df.shape[1]), np.nan)
+    for k, job_id in enumerate(job_ids):
+        if job_id in results:
+            panel[k, resolved[job_id][2]] = results[job_id]
+    weights = pd.DataFrame(panel, index=pd.Index(job_ids, name='job'), columns=returns_df.columns)
+    return (weights, report) if return_report else weights
@@ -0,0 +1,85 @@
+import numpy as np
+
+
+class ClusterTree:
+    """
+    Cây phân cụm dạng mảng, dựng một lần từ ma trận linkage của scipy.
+    Nút 0..n-1 là lá (tài sản), nút n+i là cụm tạo ở dòng i của linkage.
+    Dùng chung cho Quasi-Diagonalization, Recursive Bisection và vẽ dendrogram.
+    """
+    def __init__(self, link):
+        link = np.asarray(link)
+        self.link = link
+        self.n_leaves = link.shape[0] + 1
+        n_nodes = 2 * self.n_leaves - 1
+        self.root = n_nodes - 1
+
+        # Con trái/phải của các nút trong (index i <-> nút n+i)
+        self.left = link[:, 0].astype(np.int64)
+        self.right = link[:, 1].astype(np.int64)
+        self.heights = link[:, 2].astype(np.float64)
+
+        self.size = np.ones(n_nodes, dtype=np.int64)
+        self.size[self.n_leaves:] = link[:, 3].astype(np.int64)
+
+        # Duyệt tiền thứ tự (con trái trước) bằng ngăn xếp: O(n), cho thứ tự lá
+        # và đoạn [leaf_start, leaf_stop) của mỗi nút trong thứ tự đó
+        self.leaf_start = np.empty(n_nodes, dtype=np.int64)
+        order = np.empty(self.n_leaves, dtype=np.int64)
+        pos = 0
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            self.leaf_start[node] = pos
+            if node < self.n_leaves:
+                order[pos] = node
+                pos += 1
+            else:
+                k = node - self.n_leaves
+                stack.append(self.right[k])
+                stack.append(self.left[k])
+        self.order = order
+        self.leaf_stop = self.leaf_start + self.size
+
+    def children(self, node):
+        if node < self.n_leaves:
+            return ()
+        k = node - self.n_leaves
+        return self.left[k], self.right[k]
+
+    def leaves(self, node):
+        """Các lá (tài sản) thuộc cây con của `node`, theo thứ tự quasi-diag."""
+        return self.order[self.leaf_start[node]:self.leaf_stop[node]]
+
+    def splits(self):
+        """
+        Các điểm chia đôi (start, mid, stop) theo dendrogram thật, từ gốc xuống.
+        Cụm [start, stop) tách thành con trái [start, mid) và con phải [mid, stop).
+        """
+        # Nút cha luôn có id lớn hơn nút con -> duyệt id giảm dần là duyệt từ gốc xuống
+        internal = np.arange(self.root, self.n_leaves - 1, -1)
+        k = internal - self.n_leaves
+        starts = self.leaf_start[internal]
+        mids = self.leaf_stop[self.left[k]]
+        stops = self.leaf_stop[internal]
+        return np.column_stack([starts, mids, stops])
+
+    def dendrogram_coords(self):
+        """
+        Toạ độ các đoạn chữ U của dendrogram (cùng quy ước icoord/dcoord của scipy).
+        Lá ở vị trí x = 5 + 10 * (thứ tự quasi-diag).
+        """
+        n_nodes = 2 * self.n_leaves - 1
+        x = np.empty(n_nodes)
+        y = np.zeros(n_nodes)
+        x[self.order] = 5.0 + 10.0 * np.arange(self.n_leaves)
+
+        icoord, dcoord = [], []
+        for k in range(self.n_leaves - 1):
+            node = self.n_leaves + k
+            l, r = self.left[k], self.right[k]
+            x[node] = (x[l] + x[r]) / 2
+            y[node] = self.heights[k]
+            icoord.append([x[l], x[l], x[r], x[r]])
+            dcoord.append([y[l], y[node], y[node], y[r]])
+        return icoord, dcoord
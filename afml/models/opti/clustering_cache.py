@@ -0,0 +1,72 @@
+from collections import OrderedDict
+
+import numpy as np
+
+
+class ClusteringCache:
+    """
+    Bộ nhớ đệm (LRU) cho phần phân cụm của HRP: linkage và cây ClusterTree (thứ tự quasi-diag).
+    Khoá theo (universe, tham số estimator). Khi ma trận tương quan mới lệch so với ma trận
+    lúc phân cụm ít hơn `tol`, dùng lại linkage cũ và chỉ chạy lại Recursive Bisection.
+    """
+    def __init__(self, maxsize=32, tol=0.05, metric='max'):
+        """
+        :param maxsize: số universe tối đa giữ trong cache (LRU).
+        :param tol: ngưỡng độ trôi tương quan để dùng lại phân cụm.
+        :param metric: 'max' = max |Δcorr|, 'rms' = căn trung bình bình phương Δcorr.
+        """
+        if metric not in ('max', 'rms'):
+            raise ValueError("metric phải là 'max' hoặc 'rms'.")
+        self.maxsize = maxsize
+        self.tol = tol
+        self.metric = metric
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(columns, estimator_params=None):
+        return (tuple(columns), estimator_params)
+
+    def drift(self, corr_old, corr_new):
+        diff = np.abs(np.asarray(corr_new) - corr_old)
+        if self.metric == 'max':
+            return float(diff.max()) if diff.size else 0.0
+        return float(np.sqrt(np.mean(diff * diff))) if diff.size else 0.0
+
+    def lookup(self, key, corr):
+        """
+        :return: (link, tree) nếu có phân cụm cũ đủ gần, ngược lại None.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and self.drift(entry[0], corr) <= self.tol:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+        self.misses += 1
+        return None
+
+    def store(self, key, corr, link, tree):
+        # Giữ tương quan lúc phân cụm làm mốc, tránh trôi dần qua nhiều lần dùng lại
+        self._entries[key] = (np.array(corr, dtype=np.float64), link, tree)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'hit_rate': self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,225 @@
+import pandas as pd
+import numpy as np
+
+
+def cov_to_corr(cov):
+    """
+    Ma trận tương quan suy ra từ hiệp phương sai: D^-1/2 * cov * D^-1/2 (không quét lại dữ liệu).
+    """
+    std = np.sqrt(np.diag(cov))
+    corr = cov / np.outer(std, std)
+    np.fill_diagonal(corr, 1.0)
+    return np.clip(corr, -1.0, 1.0, out=corr)
+
+
+def pairwise_cov(X, min_periods=2, ddof=1):
+    """
+    Hiệp phương sai/tương quan pairwise-complete (giống DataFrame.cov()/corr() của pandas)
+    bằng vài tích ma trận trên mặt nạ thay vì vòng lặp theo cặp:
+    với M = mặt nạ có dữ liệu, Z = X với NaN -> 0,
+        N = M^T M (số quan sát chung), S = Z^T M (tổng x_i trên các dòng j cũng có),
+        P = Z^T Z (tích chéo), Q = (Z*Z)^T M (tổng bình phương trên các dòng chung).
+
+    :param X: np.ndarray (time x assets), có thể chứa NaN.
+    :param min_periods: số quan sát chung tối thiểu; ít hơn -> NaN.
+    :return: (cov, corr, counts)
+    """
+    mask = ~np.isnan(X)
+    # Trừ trung bình từng cột trước để giảm sai số triệt tiêu (cov không đổi khi tịnh tiến)
+    Z = X - np.nanmean(X, axis=0)
+    Z[~mask] = 0.0
+    M = mask.astype(X.dtype)
+
+    counts = M.T @ M
+    sums = Z.T @ M
+    cross = Z.T @ Z
+    sq_sums = (Z * Z).T @ M
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denom = counts - ddof
+        cov = (cross - sums * sums.T / counts) / denom
+        var_i = (sq_sums - sums * sums / counts) / denom
+        corr = cov / np.sqrt(var_i * var_i.T)
+    invalid = (counts < max(min_periods, ddof + 1))
+    cov[invalid] = np.nan
+    corr[invalid] = np.nan
+    corr = np.clip(corr, -1.0, 1.0, out=corr)
+    np.fill_diagonal(corr, np.where(np.isnan(np.diag(cov)), np.nan, 1.0))
+    return cov, corr, counts
+
+
+def nearest_psd(corr, method='clip', eps=1e-10, max_iter=100, tol=1e-10):
+    """
+    Ma trận tương quan nửa xác định dương gần nhất (ma trận pairwise-complete thường không PSD).
+    - 'clip'  : kẹp trị riêng âm về eps rồi chuẩn hoá lại đường chéo bằng 1 (một lần eigh).
+    - 'higham': chiếu luân phiên Higham (2002), gần nhất theo chuẩn Frobenius.
+    """
+    corr = np.array(corr, dtype=np.float64)
+    if method == 'clip':
+        vals, vecs = np.linalg.eigh(corr)
+        if vals[0] >= eps:
+            return corr
+        out = (vecs * np.maximum(vals, eps)) @ vecs.T
+    elif method == 'higham':
+        Y = corr
+        delta = np.zeros_like(corr)
+        for _ in range(max_iter):
+            R = Y - delta
+            vals, vecs = np.linalg.eigh(R)
+            X = (vecs * np.maximum(vals, eps)) @ vecs.T
+            delta = X - R
+            Y_next = X.copy()
+            np.fill_diagonal(Y_next, 1.0)
+            converged = np.linalg.norm(Y_next - Y) <= tol * np.linalg.norm(Y)
+            Y = Y_next
+            if converged:
+                break
+        out = Y
+    else:
+        raise ValueError("method phải là 'clip' hoặc 'higham'.")
+    d = np.sqrt(np.diag(out))
+    out = out / np.outer(d, d)
+    out = (out + out.T) / 2
+    np.fill_diagonal(out, 1.0)
+    return out
+
+
+class CovarianceEstimator:
+    """
+    Lớp cơ sở cho các bộ ước lượng hiệp phương sai dùng trong HRP.allocate.
+    Lớp con chỉ cần cài đặt `_estimate_cov` trên mảng numpy (time x assets) không có NaN.
+    """
+    def __init__(self, dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+
+    def params(self):
+        """Tham số định danh bộ ước lượng (dùng làm khoá cache)."""
+        return (type(self).__name__, self.dtype.str)
+
+    def _estimate_cov(self, X):
+        raise NotImplementedError
+
+    def estimate(self, returns_df):
+        """
+        :param returns_df: DataFrame lợi suất (time x assets).
+        :return: (cov, corr) dạng DataFrame, corr suy ra từ cov trong cùng một lượt.
+        """
+        X = np.asarray(returns_df.values, dtype=self.dtype)
+        if np.isnan(X).any():
+            raise ValueError(f"[{type(self).__name__}] Lợi suất có NaN: dùng SampleCovariance "
+                             "(pairwise-complete) hoặc loại bỏ dòng khuyết trước.")
+        cov = self._estimate_cov(X)
+        corr = cov_to_corr(cov)
+        columns = returns_df.columns
+        return (pd.DataFrame(cov, index=columns, columns=columns),
+                pd.DataFrame(corr, index=columns, columns=columns))
+
+
+class SampleCovariance(CovarianceEstimator):
+    """
+    Hiệp phương sai mẫu (ddof=1) tính bằng một tích ma trận X_c^T X_c.
+    Panel có NaN (mã niêm yết muộn, lịch sử không đều) được ước lượng pairwise-complete
+    bằng pairwise_cov, nên mỗi cặp dùng toàn bộ lịch sử chung thay vì dropna toàn panel.
+    """
+    def __init__(self, min_periods=2, psd_repair=None, dtype=np.float64):
+        """
+        :param min_periods: số quan sát chung tối thiểu cho một cặp; cặp thiếu được coi là không tương quan.
+        :param psd_repair: None, 'clip' hoặc 'higham': sửa ma trận pairwise về PSD gần nhất (xem nearest_psd).
+        """
+        super().__init__(dtype=dtype)
+        if psd_repair not in (None, 'clip', 'higham'):
+            raise ValueError("psd_repair phải là None, 'clip' hoặc 'higham'.")
+        self.min_periods = min_periods
+        self.psd_repair = psd_repair
+
+    def params(self):
+        return super().params() + (self.min_periods, self.psd_repair)
+
+    def estimate(self, returns_df):
+        X = np.asarray(returns_df.values, dtype=self.dtype)
+        if not np.isnan(X).any():
+            return super().estimate(returns_df)
+
+        cov, corr, _ = pairwise_cov(X, min_periods=self.min_periods)
+        std = np.sqrt(np.diag(cov))
+        if np.isnan(std).any():
+            missing = returns_df.columns[np.isnan(std)].tolist()
+            raise ValueError(f"[SampleCovariance] Không đủ {self.min_periods} quan sát cho: {missing}")
+        # Cặp không đủ lịch sử chung: coi như không tương quan
+        np.nan_to_num(cov, copy=False, nan=0.0)
+        np.nan_to_num(corr, copy=False, nan=0.0)
+        if self.psd_repair is not None:
+            # Dựng lại cov từ tương quan đã sửa và độ lệch chuẩn trên toàn lịch sử của từng mã
+            corr = nearest_psd(corr, method=self.psd_repair)
+            cov = corr * np.outer(std, std)
+        columns = returns_df.columns
+        return (pd.DataFrame(cov, index=columns, columns=columns),
+                pd.DataFrame(corr, index=columns, columns=columns))
+
+    def _estimate_cov(self, X):
+        Xc = X - X.mean(axis=0)
+        return (Xc.T @ Xc) / (X.shape[0] - 1)
+
+
+class EWMACovariance(CovarianceEstimator):
+    """
+    Hiệp phương sai trọng số mũ (quan sát mới nhất nặng nhất).
+    Trọng số chuẩn hoá w_t ∝ (1 - alpha)^(T-1-t), cov = (X_c * w)^T X_c.
+    """
+    def __init__(self, span=None, halflife=None, alpha=None, dtype=np.float64):
+        super().__init__(dtype=dtype)
+        if alpha is None:
+            if span is not None:
+                alpha = 2.0 / (span + 1)
+            elif halflife is not None:
+                alpha = 1.0 - np.exp(np.log(0.5) / halflife)
+            else:
+                raise ValueError("[EWMACovariance] Cần truyền một trong span, halflife hoặc alpha.")
+        if not 0 < alpha <= 1:
+            raise ValueError("[EWMACovariance] alpha phải nằm trong (0, 1].")
+        self.alpha = float(alpha)
+
+    def params(self):
+        return super().params() + (self.alpha,)
+
+    def _estimate_cov(self, X):
+        n_rows = X.shape[0]
+        # Tính trong log để tránh underflow khi chuỗi rất dài
+        log_w = np.arange(n_rows - 1, -1, -1) * np.log1p(-self.alpha) if self.alpha < 1 else None
+        if log_w is None:
+            w = np.zeros(n_rows)
+            w[-1] = 1.0
+        else:
+            w = np.exp(log_w - log_w.max())
+        w = (w / w.sum()).astype(X.dtype)
+
+        mean = w @ X
+        Xc = X - mean
+        return (Xc * w[:, None]).T @ Xc
+
+
+class LedoitWolfShrinkage(CovarianceEstimator):
+    """
+    Co rút Ledoit-Wolf (2004) về mục tiêu mu * I.
+    Hệ số co rút tính dạng đóng từ X^T X và chuẩn ||x_t||^4, không cần vòng lặp theo thời gian.
+    """
+    def _estimate_cov(self, X):
+        n_rows, n_assets = X.shape
+        Xc = X - X.mean(axis=0)
+        S = (Xc.T @ Xc) / n_rows
+        mu = np.trace(S) / n_assets
+
+        S_fro2 = np.sum(S * S)
+        # delta^2 = ||S - mu I||_F^2 / n
+        delta2 = (S_fro2 - 2 * mu * np.trace(S) + mu * mu * n_assets) / n_assets
+        # beta^2 = 1/(n T^2) * sum_t ||x_t x_t^T - S||_F^2 = 1/(n T^2) * (sum_t ||x_t||^4 - T ||S||_F^2)
+        row_norm2 = np.einsum('ij,ij->i', Xc, Xc)
+        beta2 = (row_norm2 @ row_norm2 - n_rows * S_fro2) / (n_assets * n_rows * n_rows)
+        beta2 = min(beta2, delta2)
+
+        shrinkage = 0.0 if delta2 == 0 else beta2 / delta2
+        self.shrinkage_ = shrinkage
+
+        cov = (1.0 - shrinkage) * S
+        cov[np.diag_indices(n_assets)] += shrinkage * mu
+        return cov
@@ -0,0 +1,235 @@
+import numpy as np
+import pandas as pd
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = np.arange(n)
+
+    def find(self, x):
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # Nén đường đi
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, x, y):
+        rx, ry = self.find(x), self.find(y)
+        if rx == ry:
+            return False
+        self.parent[ry] = rx
+        return True
+
+
+def _kruskal(n_nodes, a, b, w):
+    """Chọn cạnh của cây khung nhỏ nhất trong tập cạnh ứng viên (a, b, w). Trả về mặt nạ cạnh được chọn."""
+    order = np.argsort(w, kind='stable')
+    uf = _UnionFind(n_nodes)
+    keep = np.zeros(len(w), dtype=bool)
+    for e in order:
+        if uf.union(a[e], b[e]):
+            keep[e] = True
+    return keep
+
+
+class IncrementalMST:
+    """
+    Cây khung nhỏ nhất (MST) trên ma trận khoảng cách dày, tương đương single linkage.
+    Hỗ trợ thêm/bớt tài sản mà không dựng lại toàn bộ:
+    - insert: MST mới là MST của (cạnh cây cũ + n cạnh tới đỉnh mới), O(n log n).
+    - remove: giữ các cạnh cây không chạm đỉnh bị xoá, nối lại các thành phần bằng cạnh cắt nhỏ nhất.
+    to_linkage() xuất ma trận linkage đúng định dạng scipy cho phần còn lại của pipeline HRP.
+
+    Lưu ý: insert/remove chỉ chính xác khi khoảng cách giữa các tài sản cũ không đổi
+    (vd HRP(distance='corr')). Với distance-of-distance mọi khoảng cách đều đổi khi universe đổi,
+    khi đó dùng rebuild().
+    """
+    def __init__(self, dist=None, labels=None, capacity=16):
+        self._D = np.zeros((capacity, capacity))
+        self._labels = [None] * capacity
+        self._slot = {}
+        self._edges = np.empty((0, 2), dtype=np.int64)
+        self._weights = np.empty(0)
+        if dist is not None:
+            self.rebuild(dist, labels)
+
+    @property
+    def labels(self):
+        return list(self._slot.keys())
+
+    def __len__(self):
+        return len(self._slot)
+
+    def _grow(self, capacity):
+        D = np.zeros((capacity, capacity))
+        old = self._D.shape[0]
+        D[:old, :old] = self._D
+        self._D = D
+        self._labels.extend([None] * (capacity - old))
+
+    def _free_slot(self):
+        for slot, label in enumerate(self._labels):
+            if label is None:
+                return slot
+        slot = len(self._labels)
+        self._grow(2 * slot)
+        return slot
+
+    def rebuild(self, dist, labels=None):
+        """Dựng lại toàn bộ bằng Prim trên ma trận dày O(n^2), không cần ma trận nén squareform."""
+        if isinstance(dist, pd.DataFrame):
+            labels = list(dist.index) if labels is None else labels
+            dist = dist.values
+        dist = np.asarray(dist, dtype=np.float64)
+        n = dist.shape[0]
+        labels = list(range(n)) if labels is None else list(labels)
+
+        capacity = max(16, self._D.shape[0])
+        while capacity < n:
+            capacity *= 2
+        self._D = np.zeros((capacity, capacity))
+        self._D[:n, :n] = dist
+        self._labels = labels + [None] * (capacity - n)
+        self._slot = {label: i for i, label in enumerate(labels)}
+
+        edges = np.empty((max(n - 1, 0), 2), dtype=np.int64)
+        weights = np.empty(max(n - 1, 0))
+        if n > 0:
+            in_tree = np.zeros(n, dtype=bool)
+            best = np.full(n, np.inf)
+            parent = np.full(n, -1, dtype=np.int64)
+            best[0] = 0.0
+            k = 0
+            for _ in range(n):
+                u = int(np.argmin(np.where(in_tree, np.inf, best)))
+                in_tree[u] = True
+                if parent[u] >= 0:
+                    edges[k] = (parent[u], u)
+                    weights[k] = best[u]
+                    k += 1
+                row = dist[u]
+                better = ~in_tree & (row < best)
+                best[better] = row[better]
+                parent[better] = u
+        self._edges = edges
+        self._weights = weights
+
+    def insert(self, label, distances):
+        """
+        :param label: tên tài sản mới.
+        :param distances: khoảng cách tới các tài sản hiện có (pd.Series theo nhãn,
+                          hoặc mảng theo thứ tự self.labels).
+        """
+        if label in self._slot:
+            raise KeyError(f"[IncrementalMST] {label} đã có trong cây.")
+        current = self.labels
+        if isinstance(distances, pd.Series):
+            distances = distances.reindex(current).values
+        distances = np.asarray(distances, dtype=np.float64)
+        if len(distances) != len(current) or np.isnan(distances).any():
+            raise ValueError("[IncrementalMST] Cần khoảng cách tới mọi tài sản hiện có.")
+
+        slot = self._free_slot()
+        others = np.array([self._slot[l] for l in current], dtype=np.int64)
+        self._D[slot, :] = 0.0
+        self._D[:, slot] = 0.0
+        self._D[slot, others] = distances
+        self._D[others, slot] = distances
+        self._labels[slot] = label
+        self._slot[label] = slot
+        if len(current) == 0:
+            return
+
+        # Ứng viên = cạnh cây cũ + cạnh mới tới đỉnh vừa thêm
+        cand = np.vstack([self._edges, np.column_stack([others, np.full(len(others), slot)])])
+        cand_w = np.concatenate([self._weights, distances])
+        keep = _kruskal(self._D.shape[0], cand[:, 0], cand[:, 1], cand_w)
+        self._edges = cand[keep]
+        self._weights = cand_w[keep]
+
+    def remove(self, label):
+        slot = self._slot.pop(label)
+        self._labels[slot] = None
+
+        touching = (self._edges[:, 0] == slot) | (self._edges[:, 1] == slot)
+        edges = self._edges[~touching]
+        weights = self._weights[~touching]
+
+        remaining = np.array(list(self._slot.values()), dtype=np.int64)
+        if len(remaining) <= 1:
+            self._edges, self._weights = edges, weights
+            return
+
+        # Gán thành phần liên thông cho các đỉnh còn lại theo các cạnh cây được giữ
+        uf = _UnionFind(self._D.shape[0])
+        for a, b in edges:
+            uf.union(a, b)
+        roots = np.array([uf.find(s) for s in remaining])
+        comp_roots, comp = np.unique(roots, return_inverse=True)
+        n_comp = len(comp_roots)
+
+        if n_comp > 1:
+            # Cạnh cắt nhỏ nhất giữa từng cặp thành phần, rồi Kruskal trên đồ thị thu gọn
+            cand_a, cand_b, cand_w = [], [], []
+            members = [remaining[comp == c] for c in range(n_comp)]
+            for ca in range(n_comp):
+                for cb in range(ca + 1, n_comp):
+                    block = self._D[np.ix_(members[ca], members[cb])]
+                    i, j = np.unravel_index(np.argmin(block), block.shape)
+                    cand_a.append(members[ca][i])
+                    cand_b.append(members[cb][j])
+                    cand_w.append(block[i, j])
+            cand_a = np.array(cand_a, dtype=np.int64)
+            cand_b = np.array(cand_b, dtype=np.int64)
+            cand_w = np.array(cand_w)
+            comp_of = dict(zip(remaining, comp))
+            keep = _kruskal(
+                n_comp,
+                np.array([comp_of[a] for a in cand_a]),
+                np.array([comp_of[b] for b in cand_b]),
+                cand_w,
+            )
+            edges = np.vstack([edges, np.column_stack([cand_a[keep], cand_b[keep]])])
+            weights = np.concatenate([weights, cand_w[keep]])
+
+        self._edges, self._weights = edges, weights
+
+    def to_linkage(self, order=None):
+        """
+        Ma trận linkage định dạng scipy (single linkage) từ các cạnh MST.
+        :param order: thứ tự nhãn ứng với lá 0..n-1 (mặc định self.labels), vd corr.columns.
+        """
+        order = self.labels if order is None else list(order)
+        n = len(order)
+        if set(order) != set(self._slot):
+            raise ValueError("[IncrementalMST] order phải chứa đúng các tài sản trong cây.")
+        pos = np.full(self._D.shape[0], -1, dtype=np.int64)
+        pos[[self._slot[l] for l in order]] = np.arange(n)
+
+        a = pos[self._edges[:, 0]]
+        b = pos[self._edges[:, 1]]
+        sort = np.argsort(self._weights, kind='stable')
+
+        # Gán nhãn cụm giống scipy: cụm tạo ở bước i mang id n + i, cặp (min, max)
+        link = np.empty((n - 1, 4))
+        parent = np.arange(2 * n - 1)
+        size = np.ones(2 * n - 1)
+
+        def find(x):
+            root = x
+            while parent[root] != root:
+                root = parent[root]
+            while parent[x] != root:
+                parent[x], x = root, parent[x]
+            return root
+
+        for i, e in enumerate(sort):
+            ra, rb = find(a[e]), find(b[e])
+            lo, hi = (ra, rb) if ra < rb else (rb, ra)
+            new = n + i
+            parent[ra] = parent[rb] = new
+            size[new] = size[ra] + size[rb]
+            link[i] = (lo, hi, self._weights[e], size[new])
+        return link
@@ -0,0 +1,124 @@
+import pandas as pd
+import numpy as np
+
+from afml.models.opti.HRP import HRP
+from afml.models.opti.estimators import cov_to_corr
+
+
+class RollingMoments:
+    """
+    Tổng chạy (running sums) của lợi suất và ma trận tích chéo X^T X.
+    Thêm/bớt k dòng tốn O(k * n^2) thay vì quét lại cả cửa sổ O(T * n^2).
+    """
+    def __init__(self, n_assets, shift=None):
+        self.n_assets = n_assets
+        # Dịch gốc (shift) cố định để giảm sai số triệt tiêu khi S2 - S1 S1^T / T
+        self.shift = np.zeros(n_assets) if shift is None else np.asarray(shift, dtype=np.float64)
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.sum = np.zeros(self.n_assets)
+        self.cross = np.zeros((self.n_assets, self.n_assets))
+
+    def add(self, rows):
+        rows = np.asarray(rows, dtype=np.float64) - self.shift
+        if rows.shape[0] == 0:
+            return
+        self.count += rows.shape[0]
+        self.sum += rows.sum(axis=0)
+        self.cross += rows.T @ rows
+
+    def drop(self, rows):
+        rows = np.asarray(rows, dtype=np.float64) - self.shift
+        if rows.shape[0] == 0:
+            return
+        self.count -= rows.shape[0]
+        self.sum -= rows.sum(axis=0)
+        self.cross -= rows.T @ rows
+
+    def cov(self):
+        if self.count < 2:
+            raise ValueError("[RollingMoments] Cần ít nhất 2 quan sát để tính hiệp phương sai.")
+        cov = (self.cross - np.outer(self.sum, self.sum) / self.count) / (self.count - 1)
+        # Ép đối xứng sau nhiều lần cộng/trừ
+        return (cov + cov.T) / 2
+
+
+class WalkForwardHRP:
+    """
+    Phân bổ HRP theo cửa sổ trượt (rolling) hoặc mở rộng (expanding).
+    cov/corr được cập nhật tăng dần từ RollingMoments giữa các ngày tái cân bằng.
+    """
+    def __init__(self, hrp=None, window=None, min_periods=2, refresh_every=None):
+        """
+        :param hrp: instance HRP dùng để phân bổ (mặc định HRP()).
+        :param window: số dòng của cửa sổ trượt, tối thiểu max(2, min_periods). None = cửa sổ mở rộng.
+        :param min_periods: số dòng tối thiểu trước lần phân bổ đầu tiên.
+        :param refresh_every: tính lại tổng từ đầu sau mỗi N lần cập nhật để chặn trôi số học.
+        """
+        self.hrp = hrp if hrp is not None else HRP()
+        self.min_periods = max(int(min_periods), 2)
+        if window is not None and window < self.min_periods:
+            raise ValueError(f"[WalkForwardHRP] window={window} quá nhỏ: cần window >= max(2, min_periods)"
+                             f" = {self.min_periods} để cửa sổ đủ dòng tính hiệp phương sai.")
+        self.window = window
+        self.refresh_every = refresh_every
+
+    def _rebalance_positions(self, index, rebalance):
+        """
+        Vị trí kết thúc (exclusive) của dữ liệu dùng cho mỗi ngày tái cân bằng.
+        - int: tái cân bằng sau mỗi `rebalance` dòng.
+        - danh sách ngày: dùng mọi dòng có index <= ngày đó.
+        """
+        n_rows = len(index)
+        if isinstance(rebalance, (int, np.integer)):
+            ends = np.arange(self.min_periods, n_rows + 1, int(rebalance))
+        else:
+            dates = pd.to_datetime(pd.Index(rebalance))
+            ends = index.searchsorted(dates, side='right')
+        return np.unique(ends[ends >= self.min_periods])
+
+    def run(self, returns_df, rebalance=1):
+        """
+        :param returns_df: DataFrame lợi suất (time x assets), đã sắp xếp theo thời gian, không có NaN.
+        :param rebalance: int (mỗi N dòng) hoặc danh sách ngày tái cân bằng.
+        :return: DataFrame trọng số (index = thời điểm dữ liệu cuối cùng được dùng, columns = assets).
+        """
+        if returns_df.isna().values.any():
+            raise ValueError("[WalkForwardHRP] returns_df chứa NaN, hãy làm sạch trước khi chạy.")
+
+        values = returns_df.values.astype(np.float64, copy=False)
+        columns = returns_df.columns
+        ends = self._rebalance_positions(returns_df.index, rebalance)
+        if len(ends) == 0:
+            return pd.DataFrame(columns=columns, dtype=np.float64)
+
+        moments = RollingMoments(values.shape[1], shift=values[:ends[0]].mean(axis=0))
+        start, end = 0, 0
+        n_updates = 0
+        weights = np.empty((len(ends), values.shape[1]))
+
+        for k, new_end in enumerate(ends):
+            new_start = 0 if self.window is None else max(0, new_end - self.window)
+
+            refresh = self.refresh_every is not None and n_updates >= self.refresh_every
+            if refresh or new_start >= end:
+                # Cửa sổ mới không chồng lấn cửa sổ cũ -> tính lại từ đầu
+                moments.reset()
+                moments.add(values[new_start:new_end])
+                n_updates = 0
+            else:
+                # Cập nhật hạng k: thêm dòng mới, bỏ dòng rơi khỏi cửa sổ
+                moments.add(values[end:new_end])
+                moments.drop(values[start:new_start])
+                n_updates += 1
+            start, end = new_start, new_end
+
+            cov = moments.cov()
+            corr = cov_to_corr(cov)
+            cov_df = pd.DataFrame(cov, index=columns, columns=columns)
+            corr_df = pd.DataFrame(corr, index=columns, columns=columns)
+            weights[k] = self.hrp.allocate_cov(cov_df, corr_df).values
+
+        return pd.DataFrame(weights, index=returns_df.index[ends - 1], columns=columns)
@@ -0,0 +1,265 @@
+"""
+Bộ sinh thanh có trạng thái cho dữ liệu chỉ nối thêm (crawler ghi thêm phút mới mỗi ngày).
+
+Mỗi builder nhận lô dòng mới qua `update(new_rows)` và trả về các thanh vừa hoàn tất;
+thanh đang mở, ngưỡng EWMA và khối lượng theo ngày được giữ lại giữa các lần gọi,
+nên chi phí mỗi lần chỉ là O(số dòng mới). `snapshot(path)` / `BarBuilder.restore(path)`
+lưu và khôi phục toàn bộ trạng thái ra một file .npz.
+
+    builder = DollarBarBuilder(rolling_window=20, n_target=20)
+    bars = builder.update(history)            # lần đầu: toàn bộ lịch sử
+    builder.snapshot('state/FPT_dollar.npz')
+    ...
+    builder = BarBuilder.restore('state/FPT_dollar.npz')
+    new_bars = builder.update(today_minutes)  # chỉ xử lý phút mới
+
+Cho cùng dữ liệu, ghép kết quả của các lần update bằng kết quả của bản tĩnh tương ứng
+trong info_driven (TimeBar.time_bar với tần suất cố định, DollarBar.dynamic_dollar_bars,
+DollarBar.imbalance). Dòng có 'time' không mới hơn dòng cuối đã xử lý bị bỏ qua.
+"""
+import json
+import os
+
+import pandas as pd
+import numpy as np
+
+from afml.models.preprocess.info_driven import _as_f8, _bars_frame, _ns, _time_unit
+
+DAY_NS = 86_400 * 10**9
+
+
+def _local_ns(index: pd.DatetimeIndex) -> np.ndarray:
+    """Thời gian theo giờ địa phương của index (int64 ns), dùng để chia ngày/khung."""
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return _ns(index)
+
+
+class BarBuilder:
+    """Lớp cơ sở: lọc dòng mới, snapshot/restore. Lớp con khai báo _PARAMS và _STATE."""
+    _PARAMS = ()
+    _STATE = ()
+
+    def __init__(self):
+        self.last_time = None
+        self.tz = None
+        self.unit = 'ns'
+
+    def _new_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        if df.empty:
+            return df
+        if self.tz is None and df.index.tz is not None:
+            self.tz = str(df.index.tz)
+        if self.last_time is not None:
+            df = df[_ns(df.index) > self.last_time]
+        if not df.empty:
+            self.last_time = int(_ns(df.index)[-1])
+            self.unit = _time_unit(df.index)
+        return df
+
+    def update(self, new_rows: pd.DataFrame) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def snapshot(self, path: str):
+        """Ghi tham số và trạng thái ra file .npz (ghi file tạm rồi đổi tên)."""
+        meta = {
+            'class': type(self).__name__,
+            'params': {k: getattr(self, k) for k in self._PARAMS},
+            'last_time': self.last_time,
+            'tz': self.tz,
+            'unit': self.unit,
+        }
+        arrays = {k: getattr(self, k) for k in self._STATE}
+        path = os.fspath(path)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, _meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def restore(path: str) -> 'BarBuilder':
+        """Dựng lại builder (đúng lớp con) từ file snapshot."""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['_meta']))
+            cls = _BUILDERS[meta['class']]
+            builder = cls(**meta['params'])
+            for k in cls._STATE:
+                setattr(builder, k, data[k].copy())
+        builder.last_time = meta['last_time']
+        builder.tz = meta['tz']
+        builder.unit = meta['unit']
+        return builder
+
+
+class TimeBarBuilder(BarBuilder):
+    """
+    Time Bars tăng dần với tần suất cố định (TimeBar.time_bar suy ra tần suất từ toàn bộ lịch sử
+    nên không cập nhật tăng dần được). Khung căn theo nửa đêm ngày đầu tiên như resample();
+    một khung chỉ được trả về khi đã có dòng thuộc khung sau.
+    """
+    _PARAMS = ('freq',)
+    _STATE = ('fstate', 'istate', 'origin')
+
+    def __init__(self, freq: str = '15min'):
+        super().__init__()
+        from afml.models.preprocess import bar_kernels
+        self.freq = freq
+        self.freq_ns = pd.Timedelta(freq).value
+        self.fstate, self.istate = bar_kernels.new_time_state()
+        self.origin = np.full(1, -1, dtype=np.int64)
+
+    def update(self, new_rows: pd.DataFrame) -> pd.DataFrame:
+        df = self._new_rows(new_rows)
+        if df.empty:
+            return pd.DataFrame()
+        from afml.models.preprocess import bar_kernels
+
+        local = _local_ns(df.index)
+        if self.origin[0] < 0:
+            self.origin[0] = local[0] // DAY_NS * DAY_NS
+        bins = self.origin[0] + (local - self.origin[0]) // self.freq_ns * self.freq_ns
+
+        col_dollar = 'dollar_value' if 'dollar_value' in df.columns else 'dola_value'
+        dollars = df[col_dollar].values if col_dollar in df.columns else df['close'].values * df['volume'].values
+        out = np.empty(len(df), dtype=bar_kernels.TIME_BAR_DTYPE)
+        n_bars = bar_kernels.time_bars(bins, _as_f8(df['typical_price'].values), _as_f8(df['volume'].values),
+                                       _as_f8(dollars), self.fstate, self.istate, out)
+        return self._frame(out[:n_bars])
+
+    def flush(self) -> pd.DataFrame:
+        """Đóng khung đang mở (vd cuối lịch sử khi chạy theo lô) và trả về nó nếu có giá hợp lệ."""
+        from afml.models.preprocess import bar_kernels
+        out = np.empty(1, dtype=bar_kernels.TIME_BAR_DTYPE)
+        n_bars = 0
+        if self.istate[0] and not np.isnan(self.fstate[0]):
+            out[0] = (self.istate[1], *self.fstate)
+            n_bars = 1
+        self.fstate, self.istate = bar_kernels.new_time_state()
+        return self._frame(out[:n_bars])
+
+    def _frame(self, records):
+        bars = _bars_frame(records, self.unit)
+        if self.tz is not None and not bars.empty:
+            bars.index = bars.index.tz_localize(self.tz)
+        return bars
+
+
+class DollarBarBuilder(BarBuilder):
+    """
+    Dynamic Dollar Bars tăng dần (cùng quy tắc DollarBar.dynamic_dollar_bars): ngưỡng của một ngày là
+    trung bình dollar volume của rolling_window ngày có giao dịch trước đó chia n_target.
+    Ngày chưa có dollar volume dương được giữ chờ (pending) vì bản tĩnh bỏ cả ngày có tổng bằng 0.
+    """
+    _PARAMS = ('rolling_window', 'n_target')
+    _STATE = ('fstate', 'istate', 'daily_volumes', 'day_state', 'pending_times', 'pending')
+
+    def __init__(self, rolling_window: int = 20, n_target: int = 20):
+        super().__init__()
+        from afml.models.preprocess import bar_kernels
+        self.rolling_window = rolling_window
+        self.n_target = n_target
+        self.fstate, self.istate = bar_kernels.new_dollar_state()
+        # Dollar volume của các ngày có giao dịch gần nhất (tối đa rolling_window ngày)
+        self.daily_volumes = np.empty(0, dtype=np.float64)
+        # [ngày hiện tại (số ngày từ epoch, giờ địa phương), tổng dollar của ngày, ngưỡng của ngày]
+        self.day_state = np.array([np.nan, 0.0, np.nan])
+        # Các dòng của ngày hiện tại chưa được đưa vào kernel: thời gian và cột open, high, low, close, volume, dollar
+        self.pending_times = np.empty(0, dtype=np.int64)
+        self.pending = np.empty((0, 6), dtype=np.float64)
+
+    def _close_day(self):
+        if self.day_state[1] > 0:
+            self.daily_volumes = np.append(self.daily_volumes, self.day_state[1])[-self.rolling_window:]
+
+    def update(self, new_rows: pd.DataFrame) -> pd.DataFrame:
+        df = self._new_rows(new_rows)
+        if df.empty:
+            return pd.DataFrame()
+        from afml.models.preprocess import bar_kernels
+
+        col_dollar = 'dollar_value' if 'dollar_value' in df.columns else 'dola_value'
+        dollars = df[col_dollar].values if col_dollar in df.columns else df['typical_price'].values * df['volume'].values
+        days = _local_ns(df.index) // DAY_NS
+        rows = np.column_stack([
+            _as_f8(df['open'].values), _as_f8(df['high'].values), _as_f8(df['low'].values),
+            _as_f8(df['close'].values), _as_f8(df['volume'].values), _as_f8(dollars),
+        ])
+        times = np.concatenate([self.pending_times, _ns(df.index)])
+        rows = np.concatenate([self.pending, rows])
+        if len(self.pending):
+            days = np.concatenate([np.full(len(self.pending), int(self.day_state[0])), days])
+
+        # Ngưỡng từng dòng: duyệt theo ngày (O(số ngày)), chỉ ngày có tổng dollar dương được giữ
+        starts = np.concatenate(([0], np.flatnonzero(days[1:] != days[:-1]) + 1))
+        ends = np.append(starts[1:], len(days))
+        thresholds = np.full(len(days), np.nan)
+        keep = np.zeros(len(days), dtype=bool)
+        pending_from = len(days)
+        for k, (lo, hi) in enumerate(zip(starts, ends)):
+            if days[lo] != self.day_state[0]:
+                self._close_day()
+                vt = self.daily_volumes.mean() / self.n_target if len(self.daily_volumes) else np.nan
+                self.day_state[:] = (days[lo], 0.0, vt)
+            self.day_state[1] += np.nansum(rows[lo:hi, 5])
+            thresholds[lo:hi] = self.day_state[2]
+            if self.day_state[1] > 0:
+                keep[lo:hi] = True
+            elif k == len(starts) - 1:
+                pending_from = lo
+        keep &= ~np.isnan(thresholds)
+        self.pending_times = times[pending_from:].copy()
+        self.pending = rows[pending_from:].copy()
+
+        out = np.empty(int(keep.sum()), dtype=bar_kernels.DOLLAR_BAR_DTYPE)
+        n_bars = bar_kernels.dollar_bars(
+            np.ascontiguousarray(times[keep]),
+            *(np.ascontiguousarray(rows[keep, c]) for c in range(6)),
+            np.ascontiguousarray(thresholds[keep]),
+            self.fstate, self.istate, out,
+        )
+        return _bars_frame(out[:n_bars], self.unit)
+
+
+class ImbalanceBarBuilder(BarBuilder):
+    """
+    Imbalance Bars tăng dần (cùng quy tắc DollarBar.imbalance): quy tắc tick, pha mồi,
+    ngưỡng EWMA + sàn và thanh đang mở nằm trọn trong bản ghi trạng thái của kernel.
+    """
+    _PARAMS = ('initial_T_guess', 'span')
+    _STATE = ('state', 'warmup_buf')
+
+    def __init__(self, initial_T_guess: int = 100, span: int = 100):
+        super().__init__()
+        from afml.models.preprocess import bar_kernels
+        self.initial_T_guess = initial_T_guess
+        self.span = span
+        self.state, self.warmup_buf = bar_kernels.new_imbalance_state(initial_T_guess, span)
+
+    def update(self, new_rows: pd.DataFrame) -> pd.DataFrame:
+        df = self._new_rows(new_rows)
+        if df.empty:
+            return pd.DataFrame()
+        from afml.models.preprocess import bar_kernels
+
+        typical = df['typical_price'].values if 'typical_price' in df.columns else \
+            (df['open'].values + df['high'].values + df['low'].values + df['close'].values) / 4.0
+        col_dollar = 'dollar_value' if 'dollar_value' in df.columns else 'dola_value'
+        dollars = df[col_dollar].values if col_dollar in df.columns else typical * df['volume'].values
+
+        out = np.empty(len(df), dtype=bar_kernels.IMBALANCE_BAR_DTYPE)
+        n_bars = bar_kernels.imbalance_bars(
+            _ns(df.index),
+            _as_f8(df['open'].values),
+            _as_f8(df['high'].values),
+            _as_f8(df['low'].values),
+            _as_f8(df['close'].values),
+            _as_f8(df['volume'].values),
+            _as_f8(dollars),
+            _as_f8(typical),
+            self.state, self.warmup_buf, out,
+        )
+        return _bars_frame(out[:n_bars], self.unit)
+
+
+_BUILDERS = {cls.__name__: cls for cls in (TimeBarBuilder, DollarBarBuilder, ImbalanceBarBuilder)}
@@ -0,0 +1,607 @@
+"""
+Kernel Numba (@njit, cache=True) cho các động cơ sinh thanh trong info_driven.
+info_driven import module này muộn, bên trong hàm, để `import numba` chỉ xảy ra khi thực sự sinh thanh.
+
+Quy ước chung:
+- Đầu vào là các mảng float64 liền kề theo thời gian; thời gian là int64 (ns từ epoch).
+- Kết quả ghi vào mảng có cấu trúc (structured array) cấp phát sẵn, kernel trả về số thanh đã ghi.
+- Trạng thái thanh đang mở được đọc từ / ghi lại vào các mảng state nhỏ, nên cùng một kernel
+  dùng được cho cả chạy một lần trên toàn lịch sử lẫn cập nhật tăng dần theo lô dữ liệu mới.
+"""
+import numpy as np
+from numba import njit
+
+DOLLAR_BAR_DTYPE = np.dtype([
+    ('open_time', np.int64),
+    ('close_time', np.int64),
+    ('open', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('close', np.float64),
+    ('volume', np.float64),
+    ('dollar_value', np.float64),
+    ('tick_count', np.int64),
+    ('vt_threshold', np.float64),
+])
+
+# Trạng thái thanh dollar đang mở
+# fstate: [cum_dollar, cum_volume, high, low, open_price]
+# istate: [has_open, open_time, cum_ticks]
+DOLLAR_FSTATE_SIZE = 5
+DOLLAR_ISTATE_SIZE = 3
+
+
+def new_dollar_state():
+    fstate = np.array([0.0, 0.0, -np.inf, np.inf, np.nan])
+    istate = np.zeros(DOLLAR_ISTATE_SIZE, dtype=np.int64)
+    return fstate, istate
+
+
+@njit(cache=True)
+def dollar_bars(times, opens, highs, lows, closes, volumes, dollars, thresholds, fstate, istate, out):
+    """
+    Tích luỹ dollar value từng dòng, đóng thanh khi tổng >= ngưỡng của ngày (thresholds[i])
+    và hấp thụ toàn bộ phần dư (thanh mới bắt đầu từ 0).
+    :return: số thanh đã ghi vào out[:n_bars].
+    """
+    cum_dollar = fstate[0]
+    cum_volume = fstate[1]
+    high_price = fstate[2]
+    low_price = fstate[3]
+    open_price = fstate[4]
+    has_open = istate[0] != 0
+    open_time = istate[1]
+    cum_ticks = istate[2]
+
+    n_bars = 0
+    for i in range(times.shape[0]):
+        if not has_open:
+            open_price = opens[i]
+            open_time = times[i]
+            has_open = True
+
+        cum_dollar += dollars[i]
+        cum_volume += volumes[i]
+        cum_ticks += 1
+
+        if highs[i] > high_price:
+            high_price = highs[i]
+        if lows[i] < low_price:
+            low_price = lows[i]
+
+        if cum_dollar >= thresholds[i]:
+            bar = out[n_bars]
+            bar.open_time = open_time
+            bar.close_time = times[i]
+            bar.open = open_price
+            # Cùng ngữ nghĩa với max()/min() của Python (giữ phần tử đầu khi so sánh với NaN)
+            bar.high = open_price if open_price > high_price else high_price
+            bar.low = open_price if open_price < low_price else low_price
+            bar.close = closes[i]
+            bar.volume = cum_volume
+            bar.dollar_value = cum_dollar
+            bar.tick_count = cum_ticks
+            bar.vt_threshold = thresholds[i]
+            n_bars += 1
+
+            cum_dollar = 0.0
+            cum_volume = 0.0
+            cum_ticks = 0
+            high_price = -np.inf
+            low_price = np.inf
+            has_open = False
+
+    fstate[0] = cum_dollar
+    fstate[1] = cum_volume
+    fstate[2] = high_price
+    fstate[3] = low_price
+    fstate[4] = open_price
+    istate[0] = 1 if has_open else 0
+    istate[1] = open_time
+    istate[2] = cum_ticks
+    return n_bars
+
+
+TIME_BAR_DTYPE = np.dtype([
+    ('close_time', np.int64),
+    ('open', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('close', np.float64),
+    ('volume', np.float64),
+    ('dollar_value', np.float64),
+])
+
+# Trạng thái khung thời gian đang mở
+# fstate: [open, high, low, close, volume, dollar_value]
+# istate: [has_open, bin_start]
+TIME_FSTATE_SIZE = 6
+TIME_ISTATE_SIZE = 2
+
+
+def new_time_state():
+    fstate = np.array([np.nan, np.nan, np.nan, np.nan, 0.0, 0.0])
+    istate = np.zeros(TIME_ISTATE_SIZE, dtype=np.int64)
+    return fstate, istate
+
+
+@njit(cache=True)
+def time_bars(bins, prices, volumes, dollars, fstate, istate, out):
+    """
+    Gộp từng dòng vào khung thời gian bins[i] (mốc đầu khung, int64 ns); một khung chỉ đóng khi
+    có dòng thuộc khung sau. Cùng ngữ nghĩa với resample().agg(first/max/min/last/sum).dropna():
+    giá bỏ qua NaN, khung không có giá hợp lệ bị bỏ.
+    :return: số thanh đã ghi vào out[:n_bars].
+    """
+    open_price = fstate[0]
+    high_price = fstate[1]
+    low_price = fstate[2]
+    close_price = fstate[3]
+    cum_volume = fstate[4]
+    cum_dollar = fstate[5]
+    has_open = istate[0] != 0
+    bin_start = istate[1]
+
+    n_bars = 0
+    for i in range(bins.shape[0]):
+        if has_open and bins[i] != bin_start:
+            if not np.isnan(open_price):
+                bar = out[n_bars]
+                bar.close_time = bin_start
+                bar.open = open_price
+                bar.high = high_price
+                bar.low = low_price
+                bar.close = close_price
+                bar.volume = cum_volume
+                bar.dollar_value = cum_dollar
+                n_bars += 1
+            has_open = False
+
+        if not has_open:
+            bin_start = bins[i]
+            open_price = np.nan
+            high_price = np.nan
+            low_price = np.nan
+            close_price = np.nan
+            cum_volume = 0.0
+            cum_dollar = 0.0
+            has_open = True
+
+        price = prices[i]
+        if not np.isnan(price):
+            if np.isnan(open_price):
+                open_price = price
+                high_price = price
+                low_price = price
+            if price > high_price:
+                high_price = price
+            if price < low_price:
+                low_price = price
+            close_price = price
+        if not np.isnan(volumes[i]):
+            cum_volume += volumes[i]
+        if not np.isnan(dollars[i]):
+            cum_dollar += dollars[i]
+
+    fstate[0] = open_price
+    fstate[1] = high_price
+    fstate[2] = low_price
+    fstate[3] = close_price
+    fstate[4] = cum_volume
+    fstate[5] = cum_dollar
+    istate[0] = 1 if has_open else 0
+    istate[1] = bin_start
+    return n_bars
+
+
+IMBALANCE_BAR_DTYPE = np.dtype([
+    ('open_time', np.int64),
+    ('close_time', np.int64),
+    ('open', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('close', np.float64),
+    ('volume', np.float64),
+    ('dollar_imbalance', np.float64),
+    ('tick_count', np.int64),
+    ('threshold_used', np.float64),
+])
+
+# Trạng thái có kiểu của động cơ Imbalance Bars (thay cho ImbalanceThresholdEngine):
+# quy tắc tick, pha mồi (warm-up), ngưỡng EWMA + sàn, và thanh đang mở.
+IMBALANCE_STATE_DTYPE = np.dtype([
+    ('alpha', np.float64),
+    ('expected_T', np.float64),
+    ('expected_b_v', np.float64),
+    ('pending_b_v', np.float64),       # EWMA b_v chạy trong thanh đang mở, chốt khi đóng thanh
+    ('initial_threshold', np.float64),
+    ('current_threshold', np.float64),
+    ('floor', np.float64),
+    ('theta', np.float64),
+    ('cum_volume', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('open_price', np.float64),
+    ('prev_close', np.float64),
+    ('prev_b', np.float64),
+    ('open_time', np.int64),
+    ('cum_ticks', np.int64),
+    ('has_open', np.int64),
+    ('warmup_size', np.int64),
+    ('warmup_seen', np.int64),
+])
+
+
+def new_imbalance_state(initial_T_guess, span):
+    """
+    Trạng thái ban đầu (mảng có cấu trúc 1 phần tử) và bộ đệm typical price cho pha mồi
+    gồm initial_T_guess * 5 dòng hợp lệ đầu tiên.
+    """
+    state = np.zeros(1, dtype=IMBALANCE_STATE_DTYPE)
+    st = state[0]
+    st['alpha'] = 2.0 / (span + 1)
+    st['expected_T'] = initial_T_guess
+    st['pending_b_v'] = np.nan
+    st['high'] = -np.inf
+    st['low'] = np.inf
+    st['open_price'] = np.nan
+    st['prev_close'] = np.nan
+    st['prev_b'] = 1.0
+    st['warmup_size'] = initial_T_guess * 5
+    warmup_buf = np.empty(initial_T_guess * 5, dtype=np.float64)
+    return state, warmup_buf
+
+
+@njit(cache=True)
+def imbalance_bars(times, opens, highs, lows, closes, volumes, dollars, typical, state, warmup_buf, out):
+    """
+    Toàn bộ máy trạng thái Imbalance Bars (chuẩn MLFinLab) trong một lượt:
+    1. Quy tắc tick: b_t = sign(delta close), delta = 0/NaN giữ dấu trước (ban đầu +1).
+    2. Pha mồi: warmup_size dòng hợp lệ đầu (dollar khác NaN) khởi tạo E[b_v] bằng EWMA
+       và sàn ngưỡng = max(0.1 * E[T]|E[b_v]|, 0.1 * median(typical price)); không sinh thanh.
+    3. theta += b_t * dollar; đóng thanh khi |theta| >= ngưỡng, rồi cập nhật EWMA của T và b_v.
+    :return: số thanh đã ghi vào out[:n_bars].
+    """
+    st = state[0]
+    alpha = st.alpha
+    expected_T = st.expected_T
+    expected_b_v = st.expected_b_v
+    pending_b_v = st.pending_b_v
+    initial_threshold = st.initial_threshold
+    current_threshold = st.current_threshold
+    floor = st.floor
+    theta = st.theta
+    cum_volume = st.cum_volume
+    high_price = st.high
+    low_price = st.low
+    open_price = st.open_price
+    prev_close = st.prev_close
+    prev_b = st.prev_b
+    open_time = st.open_time
+    cum_ticks = st.cum_ticks
+    has_open = st.has_open != 0
+    warmup_size = st.warmup_size
+    warmup_seen = st.warmup_seen
+
+    n_bars = 0
+    for i in range(times.shape[0]):
+        delta = closes[i] - prev_close
+        if delta > 0.0:
+            b_t = 1.0
+        elif delta < 0.0:
+            b_t = -1.0
+        else:
+            b_t = prev_b
+        prev_b = b_t
+        prev_close = closes[i]
+
+        dollar_val = dollars[i]
+        if np.isnan(dollar_val):
+            continue
+        tick_imbalance = b_t * dollar_val
+
+        if warmup_seen < warmup_size:
+            if warmup_seen == 0:
+                expected_b_v = tick_imbalance
+            else:
+                expected_b_v = alpha * tick_imbalance + (1.0 - alpha) * expected_b_v
+            warmup_buf[warmup_seen] = typical[i]
+            warmup_seen += 1
+            if warmup_seen == warmup_size:
+                initial_threshold = expected_T * np.abs(expected_b_v)
+                current_threshold = initial_threshold
+                median_floor = np.nanmedian(warmup_buf[:warmup_seen]) * 0.1
+                floor = initial_threshold * 0.1
+                if median_floor > floor:
+                    floor = median_floor
+                pending_b_v = expected_b_v
+            continue
+
+        theta += tick_imbalance
+        pending_b_v = alpha * tick_imbalance + (1.0 - alpha) * pending_b_v
+
+        if not has_open:
+            open_price = opens[i]
+            open_time = times[i]
+            has_open = True
+
+        if highs[i] > high_price:
+            high_price = highs[i]
+        if lows[i] < low_price:
+            low_price = lows[i]
+
+        cum_volume += volumes[i]
+        cum_ticks += 1
+
+        if np.abs(theta) >= current_threshold:
+            bar = out[n_bars]
+            bar.open_time = open_time
+            bar.close_time = times[i]
+            bar.open = open_price
+            bar.high = open_price if open_price > high_price else high_price
+            bar.low = open_price if open_price < low_price else low_price
+            bar.close = closes[i]
+            bar.volume = cum_volume
+            bar.dollar_imbalance = theta
+            bar.tick_count = cum_ticks
+            bar.threshold_used = current_threshold
+            n_bars += 1
+
+            # Cập nhật ngưỡng: EWMA của T và của b_v (đã chạy tick-by-tick trong thanh), rồi áp sàn
+            expected_T = alpha * cum_ticks + (1.0 - alpha) * expected_T
+            expected_b_v = pending_b_v
+            raw_threshold = expected_T * np.abs(expected_b_v)
+            current_threshold = floor if floor > raw_threshold else raw_threshold
+
+            theta = 0.0
+            cum_volume = 0.0
+            cum_ticks = 0
+            high_price = -np.inf
+            low_price = np.inf
+            has_open = False
+
+    st.expected_T = expected_T
+    st.expected_b_v = expected_b_v
+    st.pending_b_v = pending_b_v
+    st.initial_threshold = initial_threshold
+    st.current_threshold = current_threshold
+    st.floor = floor
+    st.theta = theta
+    st.cum_volume = cum_volume
+    st.high = high_price
+    st.low = low_price
+    st.open_price = open_price
+    st.prev_close = prev_close
+    st.prev_b = prev_b
+    st.open_time = open_time
+    st.cum_ticks = cum_ticks
+    st.has_open = 1 if has_open else 0
+    st.warmup_seen = warmup_seen
+    return n_bars
+
+
+RUNS_BAR_DTYPE = np.dtype([
+    ('open_time', np.int64),
+    ('close_time', np.int64),
+    ('open', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('close', np.float64),
+    ('volume', np.float64),
+    ('dollar_value', np.float64),
+    ('buy_run', np.float64),
+    ('sell_run', np.float64),
+    ('tick_count', np.int64),
+    ('threshold_used', np.float64),
+])
+
+# Trạng thái động cơ Runs Bars: E[T], P[b=1], E[v|b=1], E[v|b=-1] (EWMA) và thanh đang mở.
+# Các giá trị pending_* chạy tick-by-tick trong thanh đang mở và được chốt khi đóng thanh.
+RUNS_STATE_DTYPE = np.dtype([
+    ('alpha', np.float64),
+    ('expected_T', np.float64),
+    ('p_buy', np.float64),
+    ('v_buy', np.float64),
+    ('v_sell', np.float64),
+    ('pending_p_buy', np.float64),
+    ('pending_v_buy', np.float64),
+    ('pending_v_sell', np.float64),
+    ('initial_threshold', np.float64),
+    ('current_threshold', np.float64),
+    ('floor', np.float64),
+    ('buy_run', np.float64),
+    ('sell_run', np.float64),
+    ('cum_volume', np.float64),
+    ('cum_dollar', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('open_price', np.float64),
+    ('prev_close', np.float64),
+    ('prev_b', np.float64),
+    ('open_time', np.int64),
+    ('cum_ticks', np.int64),
+    ('has_open', np.int64),
+    ('warmup_size', np.int64),
+    ('warmup_seen', np.int64),
+])
+
+
+def new_runs_state(initial_T_guess, span):
+    """Trạng thái ban đầu (mảng có cấu trúc 1 phần tử), pha mồi gồm initial_T_guess * 5 dòng hợp lệ đầu."""
+    state = np.zeros(1, dtype=RUNS_STATE_DTYPE)
+    st = state[0]
+    st['alpha'] = 2.0 / (span + 1)
+    st['expected_T'] = initial_T_guess
+    for name in ('p_buy', 'v_buy', 'v_sell', 'pending_p_buy', 'pending_v_buy', 'pending_v_sell', 'open_price', 'prev_close'):
+        st[name] = np.nan
+    st['high'] = -np.inf
+    st['low'] = np.inf
+    st['prev_b'] = 1.0
+    st['warmup_size'] = initial_T_guess * 5
+    return state
+
+
+@njit(cache=True)
+def _ewma_step(state, x, alpha):
+    # EWMA chưa khởi tạo (NaN) nhận luôn quan sát đầu tiên
+    if np.isnan(state):
+        return x
+    return alpha * x + (1.0 - alpha) * state
+
+
+@njit(cache=True)
+def _runs_threshold(expected_T, p_buy, v_buy, v_sell):
+    buy = p_buy * v_buy if not np.isnan(v_buy) else 0.0
+    sell = (1.0 - p_buy) * v_sell if not np.isnan(v_sell) else 0.0
+    return expected_T * (buy if buy > sell else sell)
+
+
+@njit(cache=True)
+def runs_bars(times, opens, highs, lows, closes, volumes, dollars, values, state, out):
+    """
+    Runs Bars (AFML 2.3.2.2) trong một lượt. values là v_t của từng tick:
+    1 (tick runs), volume (volume runs) hoặc dollar value (dollar runs).
+    1. Quy tắc tick như imbalance_bars: b_t = sign(delta close), delta = 0/NaN giữ dấu trước.
+    2. Pha mồi: warmup_size dòng hợp lệ đầu khởi tạo EWMA của P[b=1], E[v|b=1], E[v|b=-1];
+       ngưỡng ban đầu E0[T] * max(P E[v|+], (1-P) E[v|-]), sàn = 0.1 * ngưỡng ban đầu; không sinh thanh.
+    3. theta = max(tổng v mua, tổng v bán) trong thanh; đóng thanh khi theta >= ngưỡng,
+       rồi cập nhật EWMA của T và chốt các EWMA đã chạy tick-by-tick trong thanh.
+    :return: số thanh đã ghi vào out[:n_bars].
+    """
+    st = state[0]
+    alpha = st.alpha
+    expected_T = st.expected_T
+    p_buy = st.p_buy
+    v_buy = st.v_buy
+    v_sell = st.v_sell
+    pending_p_buy = st.pending_p_buy
+    pending_v_buy = st.pending_v_buy
+    pending_v_sell = st.pending_v_sell
+    initial_threshold = st.initial_threshold
+    current_threshold = st.current_threshold
+    floor = st.floor
+    buy_run = st.buy_run
+    sell_run = st.sell_run
+    cum_volume = st.cum_volume
+    cum_dollar = st.cum_dollar
+    high_price = st.high
+    low_price = st.low
+    open_price = st.open_price
+    prev_close = st.prev_close
+    prev_b = st.prev_b
+    open_time = st.open_time
+    cum_ticks = st.cum_ticks
+    has_open = st.has_open != 0
+    warmup_size = st.warmup_size
+    warmup_seen = st.warmup_seen
+
+    n_bars = 0
+    for i in range(times.shape[0]):
+        delta = closes[i] - prev_close
+        if delta > 0.0:
+            b_t = 1.0
+        elif delta < 0.0:
+            b_t = -1.0
+        else:
+            b_t = prev_b
+        prev_b = b_t
+        prev_close = closes[i]
+
+        v = values[i]
+        if np.isnan(v) or np.isnan(dollars[i]):
+            continue
+        is_buy = 1.0 if b_t > 0.0 else 0.0
+
+        pending_p_buy = _ewma_step(pending_p_buy, is_buy, alpha)
+        if b_t > 0.0:
+            pending_v_buy = _ewma_step(pending_v_buy, v, alpha)
+        else:
+            pending_v_sell = _ewma_step(pending_v_sell, v, alpha)
+
+        if warmup_seen < warmup_size:
+            warmup_seen += 1
+            if warmup_seen == warmup_size:
+                p_buy = pending_p_buy
+                v_buy = pending_v_buy
+                v_sell = pending_v_sell
+                initial_threshold = _runs_threshold(expected_T, p_buy, v_buy, v_sell)
+                current_threshold = initial_threshold
+                floor = initial_threshold * 0.1
+            continue
+
+        if b_t > 0.0:
+            buy_run += v
+        else:
+            sell_run += v
+
+        if not has_open:
+            open_price = opens[i]
+            open_time = times[i]
+            has_open = True
+
+        if highs[i] > high_price:
+            high_price = highs[i]
+        if lows[i] < low_price:
+            low_price = lows[i]
+
+        cum_volume += volumes[i]
+        cum_dollar += dollars[i]
+        cum_ticks += 1
+
+        theta = buy_run if buy_run > sell_run else sell_run
+        if theta >= current_threshold:
+            bar = out[n_bars]
+            bar.open_time = open_time
+            bar.close_time = times[i]
+            bar.open = open_price
+            bar.high = open_price if open_price > high_price else high_price
+            bar.low = open_price if open_price < low_price else low_price
+            bar.close = closes[i]
+            bar.volume = cum_volume
+            bar.dollar_value = cum_dollar
+            bar.buy_run = buy_run
+            bar.sell_run = sell_run
+            bar.tick_count = cum_ticks
+            bar.threshold_used = current_threshold
+            n_bars += 1
+
+            expected_T = alpha * cum_ticks + (1.0 - alpha) * expected_T
+            p_buy = pending_p_buy
+            v_buy = pending_v_buy
+            v_sell = pending_v_sell
+            raw_threshold = _runs_threshold(expected_T, p_buy, v_buy, v_sell)
+            current_threshold = floor if floor > raw_threshold else raw_threshold
+
+            buy_run = 0.0
+            sell_run = 0.0
+            cum_volume = 0.0
+            cum_dollar = 0.0
+            cum_ticks = 0
+            high_price = -np.inf
+            low_price = np.inf
+            has_open = False
+
+    st.expected_T = expected_T
+    st.p_buy = p_buy
+    st.v_buy = v_buy
+    st.v_sell = v_sell
+    st.pending_p_buy = pending_p_buy
+    st.pending_v_buy = pending_v_buy
+    st.pending_v_sell = pending_v_sell
+    st.initial_threshold = initial_threshold
+    st.current_threshold = current_threshold
+    st.floor = floor
+    st.buy_run = buy_run
+    st.sell_run = sell_run
+    st.cum_volume = cum_volume
+    st.cum_dollar = cum_dollar
+    st.high = high_price
+    st.low = low_price
+    st.open_price = open_price
+    st.prev_close = prev_close
+    st.prev_b = prev_b
+    st.open_time = open_time
+    st.cum_ticks = cum_ticks
+    st.has_open = 1 if has_open else 0
+    st.warmup_seen = warmup_seen
+    return n_bars
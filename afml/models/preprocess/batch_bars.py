@@ -0,0 +1,143 @@
+"""
+Sinh thanh cho cả universe song song trên process pool.
+
+Mỗi worker tự đọc mã của mình (CSV hoặc kho cột) nên tiến trình chính không phải pickle
+dữ liệu phút; chỉ khi truyền sẵn `stocks` (kết quả của load_stocks) thì DataFrame mới được gửi sang.
+Thanh được sinh bằng các builder trong bar_builders (kernel Numba, không copy DataFrame),
+kết quả gộp thành một bảng dài có cột 'ticker' kèm thống kê thời gian của từng mã.
+
+    bars, stats = build_universe_bars('dollar', source='store', start_date='2024-01-01', n_target=20)
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Tuple
+import os
+import time
+
+import pandas as pd
+import numpy as np
+
+from afml.utils.config import stocks_data_path, stocks_store_path
+from afml.services.columnar_store import list_store_tickers, read_ticker
+from afml.services.data_loader import CSV_DTYPES, _read_csv_frame
+
+BAR_TYPES = ('time', 'dollar', 'imbalance')
+_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'volume']
+
+
+def _load_ticker(ticker, source, start_date, end_date):
+    if source == 'store':
+        df = read_ticker(ticker, start_date, end_date, _COLUMNS, stocks_store_path)
+        if isinstance(df['time'].dtype, pd.DatetimeTZDtype):
+            df['time'] = df['time'].dt.tz_localize(None)
+        return df
+    df = _read_csv_frame(os.path.join(stocks_data_path, f"{ticker}.csv"), CSV_DTYPES, True)
+    if df['time'].dt.tz is not None:
+        df['time'] = df['time'].dt.tz_localize(None)
+    times = df['time'].values
+    lo = np.searchsorted(times, pd.Timestamp(start_date).to_datetime64(), side='left') if start_date else 0
+    hi = np.searchsorted(times, pd.Timestamp(end_date).to_datetime64(), side='right') if end_date else len(df)
+    return df.iloc[lo:hi]
+
+
+def _prepare(df):
+    """
+    Khung phút (cột 'time') -> index thời gian + typical_price, dollar_value theo đúng công thức của bản tĩnh
+    (DollarBar): (O+H+L+C)/4 và typical * volume, kể cả với dòng giá <= 0.
+    """
+    df = df.set_index(pd.DatetimeIndex(df['time'])).drop(columns='time')
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    df['typical_price'] = (df['open'] + df['high'] + df['low'] + df['close']) / 4.0
+    df['dollar_value'] = df['typical_price'] * df['volume']
+    return df
+
+
+def _make_builder(bar_type, params):
+    from afml.models.preprocess.bar_builders import TimeBarBuilder, DollarBarBuilder, ImbalanceBarBuilder
+    cls = {'time': TimeBarBuilder, 'dollar': DollarBarBuilder, 'imbalance': ImbalanceBarBuilder}[bar_type]
+    return cls(**params)
+
+
+def _bars_job(job):
+    """Một mã: đọc (nếu cần), sinh thanh; lỗi của một mã không làm hỏng cả lô."""
+    ticker, df, source, start_date, end_date, bar_type, params = job
+    stats = {'rows': 0, 'bars': 0, 'load_seconds': 0.0, 'bar_seconds': 0.0, 'error': None}
+    bars = None
+    try:
+        t0 = time.perf_counter()
+        if df is None:
+            df = _load_ticker(ticker, source, start_date, end_date)
+        stats['load_seconds'] = time.perf_counter() - t0
+        stats['rows'] = len(df)
+        if len(df):
+            t0 = time.perf_counter()
+            builder = _make_builder(bar_type, params)
+            pieces = [builder.update(_prepare(df))]
+            if bar_type == 'time':
+                pieces.append(builder.flush())
+            pieces = [p for p in pieces if not p.empty]
+            bars = pd.concat(pieces) if pieces else None
+            stats['bar_seconds'] = time.perf_counter() - t0
+            stats['bars'] = 0 if bars is None else len(bars)
+    except Exception as e:
+        stats['error'] = f"{type(e).__name__}: {e}"
+    return ticker, bars, stats
+
+
+def build_universe_bars(bar_type: str = 'dollar', tickers: list = None, start_date: str = None,
+                        end_date: str = None, source: str = 'csv', stocks: Dict = None,
+                        max_workers: int = None, **params) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Sinh thanh cho nhiều mã song song (mỗi mã là một job trên process pool).
+
+    :param bar_type: 'time' (tham số freq), 'dollar' (rolling_window, n_target)
+                     hoặc 'imbalance' (initial_T_guess, span); **params truyền cho builder tương ứng.
+    :param tickers: danh sách mã (mặc định: toàn bộ mã của `source`, hoặc mọi khoá của `stocks`);
+                    mã trùng chỉ được xử lý một lần.
+    :param source: 'csv' (datasets/stocks) hoặc 'store' (kho cột), worker tự đọc mã của mình.
+    :param stocks: dict {ticker: DataFrame} từ load_stocks; khi truyền thì không đọc lại từ `source`.
+    :param max_workers: số process. 1 = chạy tuần tự trong process hiện tại.
+    :return: (bars, stats)
+             bars: bảng dài, mỗi dòng một thanh, cột 'ticker', 'close_time' rồi các cột của thanh;
+                   các mã nối tiếp theo thứ tự xuất hiện đầu tiên trong `tickers` (cũng là thứ tự categories
+                   của cột 'ticker', không sắp theo tên), trong mỗi mã các thanh theo close_time tăng dần.
+             stats: DataFrame theo mã: rows, bars, load_seconds, bar_seconds, error.
+    """
+    if bar_type not in BAR_TYPES:
+        raise ValueError(f"bar_type phải là một trong {BAR_TYPES}.")
+    if source not in ('csv', 'store'):
+        raise ValueError("source phải là 'csv' hoặc 'store'.")
+    if stocks is not None:
+        tickers = list(stocks) if tickers is None else [t for t in tickers if t in stocks]
+    elif tickers is None and source == 'store':
+        tickers = list_store_tickers(stocks_store_path)
+    elif tickers is None:
+        tickers = sorted(os.path.splitext(f)[0] for f in os.listdir(stocks_data_path) if f.endswith('.csv'))
+    # Mỗi mã một job, một nhóm trong cột 'ticker': bỏ mã trùng, giữ thứ tự truyền vào
+    tickers = list(dict.fromkeys(tickers))
+
+    jobs = [(t, None if stocks is None else stocks[t], source, start_date, end_date, bar_type, params)
+            for t in tickers]
+    t0 = time.perf_counter()
+    if max_workers == 1 or len(jobs) <= 1:
+        results = [_bars_job(job) for job in jobs]
+    else:
+        workers = max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map giữ nguyên thứ tự mã; chunksize gom nhiều mã nhỏ vào một lần gửi
+            results = list(executor.map(_bars_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    elapsed = time.perf_counter() - t0
+
+    frames = [bars.reset_index() for _, bars, _ in results if bars is not None]
+    names = [ticker for ticker, bars, _ in results if bars is not None]
+    if frames:
+        bars = pd.concat(frames, ignore_index=True)
+        bars.insert(0, 'ticker', pd.Categorical(np.repeat(names, [len(f) for f in frames]), categories=names))
+    else:
+        bars = pd.DataFrame(columns=['ticker', 'close_time'])
+    stats = pd.DataFrame([s for _, _, s in results], index=pd.Index([t for t, _, _ in results], name='ticker'))
+
+    n_failed = int(stats['error'].notna().sum()) if len(stats) else 0
+    print(f"[Universe Bars] {len(tickers)} mã, {len(bars)} thanh {bar_type} trong {elapsed:.2f}s"
+          f" | lỗi: {n_failed}")
+    return bars, stats
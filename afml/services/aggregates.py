@@ -0,0 +1,166 @@
+from typing import Dict
+import json
+import shutil
+import sys
+import os
+
+import pandas as pd
+import numpy as np
+
+from afml.utils.config import stocks_data_path, stocks_agg_path
+from afml.services.columnar_store import TIME_COL, list_store_tickers, read_ticker, write_ticker
+
+# Các tần suất được tổng hợp sẵn từ dữ liệu 1 phút; mỗi tần suất là một kho cột riêng
+# {stocks_agg_path}/{freq}/{TICKER}/{YYYY-MM}/{col}.npy, cùng bố cục với columnar_store.
+AGG_FREQS = ('5min', '15min', '1D')
+_FREQ_ALIASES = {
+    '5m': '5min', '5min': '5min', '5T': '5min',
+    '15m': '15min', '15min': '15min', '15T': '15min',
+    'D': '1D', '1D': '1D', '1d': '1D', 'daily': '1D',
+}
+META_FILE = '_meta.json'
+
+
+def normalize_freq(freq: str) -> str:
+    """Chuẩn hoá tên tần suất ('15m', 'D', ...) về khoá trong AGG_FREQS."""
+    key = _FREQ_ALIASES.get(freq)
+    if key is None:
+        raise ValueError(f"freq phải là một trong {AGG_FREQS} (hoặc '5m', '15m', 'D').")
+    return key
+
+
+def aggregate_ohlcv(df: pd.DataFrame, freq: str) -> pd.DataFrame:
+    """
+    Gộp nến 1 phút (cột 'time' đã sắp xếp) thành nến `freq`, nhãn là mốc đầu kỳ.
+    Chỉ sinh các kỳ có dữ liệu (tương đương resample(...).agg(...).dropna()).
+    """
+    times = pd.DatetimeIndex(df[TIME_COL])
+    if len(times) == 0:
+        return pd.DataFrame(columns=[TIME_COL, 'open', 'high', 'low', 'close', 'volume'])
+    buckets = times.floor(normalize_freq(freq)).values
+    starts = np.concatenate(([0], np.flatnonzero(buckets[1:] != buckets[:-1]) + 1))
+    ends = np.append(starts[1:], len(buckets)) - 1
+
+    out = {TIME_COL: buckets[starts]}
+    if 'open' in df.columns:
+        out['open'] = df['open'].values[starts]
+    if 'high' in df.columns:
+        out['high'] = np.fmax.reduceat(df['high'].values, starts)
+    if 'low' in df.columns:
+        out['low'] = np.fmin.reduceat(df['low'].values, starts)
+    if 'close' in df.columns:
+        out['close'] = df['close'].values[ends]
+    if 'volume' in df.columns:
+        volume = df['volume'].values
+        if np.issubdtype(volume.dtype, np.floating):
+            volume = np.nan_to_num(volume)
+        out['volume'] = np.add.reduceat(volume, starts)
+    return pd.DataFrame(out)
+
+
+def _load_meta(freq_path):
+    meta_path = os.path.join(freq_path, META_FILE)
+    if not os.path.exists(meta_path):
+        return {}
+    with open(meta_path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_meta(freq_path, meta):
+    os.makedirs(freq_path, exist_ok=True)
+    meta_path = os.path.join(freq_path, META_FILE)
+    tmp_path = meta_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=1)
+    os.replace(tmp_path, meta_path)
+
+
+def _read_minutes(ticker, source, since, csv_path):
+    if source == 'store':
+        df = read_ticker(ticker, start_date=since)
+    else:
+        df = pd.read_csv(os.path.join(csv_path, f"{ticker}.csv"), parse_dates=[TIME_COL])
+    # Kỳ gộp tính theo giờ địa phương của dữ liệu (bỏ múi giờ, giữ giờ đồng hồ)
+    if isinstance(df[TIME_COL].dtype, pd.DatetimeTZDtype):
+        df[TIME_COL] = df[TIME_COL].dt.tz_localize(None)
+    if source == 'csv' and since is not None:
+        df = df.iloc[np.searchsorted(df[TIME_COL].values, since.to_datetime64(), side='left'):]
+    return df
+
+
+def update_aggregates(tickers: list = None, freqs=AGG_FREQS, source: str = 'csv', refresh: bool = False,
+                      csv_path: str = stocks_data_path, agg_path: str = stocks_agg_path) -> Dict:
+    """
+    Tạo/cập nhật kho nến tổng hợp từ dữ liệu 1 phút.
+    Mỗi (mã, tần suất) lưu mốc phút cuối đã gộp; lần sau chỉ gộp lại từ đầu kỳ chứa mốc đó
+    (kỳ cuối có thể còn dở), kỳ trùng 'time' được ghi đè. Với source='csv', mã có file
+    không đổi (size/mtime) được bỏ qua hoàn toàn. refresh=True dựng lại từ đầu.
+    :return: dict {freq: {ticker: số kỳ đã ghi}}
+    """
+    if source not in ('csv', 'store'):
+        raise ValueError("source phải là 'csv' hoặc 'store'.")
+    freqs = [normalize_freq(f) for f in ([freqs] if isinstance(freqs, str) else freqs)]
+    if tickers is None and source == 'store':
+        tickers = list_store_tickers()
+    elif tickers is None:
+        tickers = sorted(os.path.splitext(f)[0] for f in os.listdir(csv_path) if f.endswith('.csv'))
+    metas = {f: ({} if refresh else _load_meta(os.path.join(agg_path, f))) for f in freqs}
+
+    written = {f: {} for f in freqs}
+    for ticker in tickers:
+        stat = None
+        if source == 'csv':
+            file_path = os.path.join(csv_path, f"{ticker}.csv")
+            if not os.path.exists(file_path):
+                continue
+            stat = os.stat(file_path)
+            stale = [f for f in freqs if metas[f].get(ticker, {}).get('source') != [stat.st_size, stat.st_mtime]]
+        else:
+            stale = list(freqs)
+        if not stale:
+            continue
+
+        # Đọc phút một lần cho mọi tần suất, từ đầu kỳ sớm nhất cần gộp lại
+        since = {}
+        for f in stale:
+            entry = metas[f].get(ticker)
+            since[f] = pd.Timestamp(entry['last']).floor(f) if entry and entry.get('last') else None
+        earliest = None if any(s is None for s in since.values()) else min(since.values())
+        minutes = _read_minutes(ticker, source, earliest, csv_path)
+        if minutes.empty:
+            continue
+        minute_times = minutes[TIME_COL].values
+
+        for f in stale:
+            part = minutes
+            if since[f] is not None and since[f] != earliest:
+                part = minutes.iloc[np.searchsorted(minute_times, since[f].to_datetime64(), side='left'):]
+            bars = aggregate_ohlcv(part, f)
+            if refresh and os.path.isdir(os.path.join(agg_path, f, ticker)):
+                shutil.rmtree(os.path.join(agg_path, f, ticker))
+            write_ticker(ticker, bars, os.path.join(agg_path, f))
+            metas[f][ticker] = {
+                'last': str(pd.Timestamp(minute_times[-1])),
+                'source': [stat.st_size, stat.st_mtime] if stat is not None else None,
+            }
+            written[f][ticker] = len(bars)
+
+    for f in freqs:
+        _save_meta(os.path.join(agg_path, f), metas[f])
+    return written
+
+
+def read_aggregate(ticker: str, freq: str, start_date: str = None, end_date: str = None,
+                   columns: list = None, agg_path: str = stocks_agg_path) -> pd.DataFrame:
+    """Đọc nến tổng hợp của một mã (đẩy lọc thời gian/cột xuống kho cột)."""
+    return read_ticker(ticker, start_date, end_date, columns, os.path.join(agg_path, normalize_freq(freq)))
+
+
+if __name__ == "__main__":
+    # Dựng/cập nhật kho tổng hợp: python -m afml.services.aggregates [--refresh] [TICKER ...]
+    args = sys.argv[1:]
+    refresh = '--refresh' in args
+    selected = [a for a in args if a != '--refresh'] or None
+    result = update_aggregates(selected, refresh=refresh)
+    for freq, counts in result.items():
+        print(f"[Aggregates] {freq}: cập nhật {len(counts)} mã, {sum(counts.values())} kỳ -> {stocks_agg_path}")
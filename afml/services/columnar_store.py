@@ -0,0 +1,206 @@
+from typing import Dict
+import json
+import sys
+import os
+
+import pandas as pd
+import numpy as np
+
+from afml.utils.config import stocks_data_path, stocks_store_path
+
+# Bố cục kho cột: {store}/{TICKER}/{YYYY-MM}/{column}.npy + _manifest.json
+# Mỗi cột là một mảng .npy có kiểu cố định; 'time' lưu dạng datetime64[ns] theo giờ địa phương (naive).
+# Manifest ghi thứ tự cột, kiểu gốc và múi giờ của dữ liệu nguồn để đọc ra giống hệt khi đọc CSV.
+TIME_COL = 'time'
+MANIFEST_FILE = '_manifest.json'
+
+
+def _ticker_dir(ticker, store_path):
+    return os.path.join(store_path, ticker)
+
+
+def list_store_tickers(store_path: str = stocks_store_path) -> list:
+    if not os.path.isdir(store_path):
+        return []
+    return sorted(d for d in os.listdir(store_path) if os.path.isdir(os.path.join(store_path, d)))
+
+
+def list_partitions(ticker: str, store_path: str = stocks_store_path) -> list:
+    """Danh sách phân vùng 'YYYY-MM' của một mã, đã sắp xếp."""
+    path = _ticker_dir(ticker, store_path)
+    if not os.path.isdir(path):
+        return []
+    return sorted(p for p in os.listdir(path) if os.path.isdir(os.path.join(path, p)))
+
+
+def _read_manifest(part_dir):
+    """{'columns', 'dtypes', 'tz'} của phân vùng; None với phân vùng ghi trước khi có manifest."""
+    path = os.path.join(part_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _read_partition(part_dir, columns=None, mmap=True):
+    if columns is None:
+        manifest = _read_manifest(part_dir)
+        if manifest is not None:
+            columns = manifest['columns']
+        else:
+            columns = [os.path.splitext(f)[0] for f in sorted(os.listdir(part_dir)) if f.endswith('.npy')]
+    mode = 'r' if mmap else None
+    return {c: np.load(os.path.join(part_dir, f"{c}.npy"), mmap_mode=mode) for c in columns}
+
+
+def _write_partition(part_dir, arrays, manifest):
+    os.makedirs(part_dir, exist_ok=True)
+    for col, values in arrays.items():
+        # Ghi ra file tạm rồi đổi tên để người đọc không thấy file ghi dở
+        tmp_path = os.path.join(part_dir, f".{col}.tmp.npy")
+        np.save(tmp_path, values)
+        os.replace(tmp_path, os.path.join(part_dir, f"{col}.npy"))
+    # Manifest ghi sau cùng: chỉ mô tả các cột đã ghi xong
+    tmp_path = os.path.join(part_dir, f".{MANIFEST_FILE}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, os.path.join(part_dir, MANIFEST_FILE))
+
+
+def _tz_from_name(name):
+    """Khôi phục múi giờ từ str(tz): tên IANA ('Asia/Ho_Chi_Minh', 'UTC') hoặc độ lệch cố định ('UTC+07:00')."""
+    if name.startswith('UTC') and len(name) > 3:
+        return pd.Timestamp('2000-01-01T00:00' + name[3:]).tz
+    return name
+
+
+def _restore_frame(data, manifest):
+    """Đưa các mảng đã đọc về kiểu và múi giờ gốc ghi trong manifest."""
+    df = pd.DataFrame(data)
+    if manifest is None:
+        return df
+    for col, dtype in manifest['dtypes'].items():
+        if col in df.columns and str(df[col].dtype) != dtype:
+            df[col] = df[col].astype(dtype)
+    if manifest.get('tz') and TIME_COL in df.columns:
+        df[TIME_COL] = df[TIME_COL].dt.tz_localize(_tz_from_name(manifest['tz']))
+    return df
+
+
+def _frame_to_arrays(df):
+    arrays = {}
+    for col in df.columns:
+        values = df[col].values
+        if col == TIME_COL:
+            arrays[col] = np.asarray(values, dtype='datetime64[ns]')
+        elif np.issubdtype(values.dtype, np.number):
+            arrays[col] = np.ascontiguousarray(values)
+    return arrays
+
+
+def write_ticker(ticker: str, df: pd.DataFrame, store_path: str = stocks_store_path, compact: bool = False):
+    """
+    Ghi (hoặc gộp thêm) dữ liệu của một mã vào kho cột, phân vùng theo tháng.
+    Tháng đã tồn tại được gộp với dữ liệu mới, trùng 'time' thì giữ bản mới.
+    Chỉ các cột số được lưu. compact=True lưu kiểu gọn (float32 giá, uint32 volume).
+    """
+    if df.empty:
+        return
+    if compact:
+        # Import muộn: data_loader import ngược lại module này
+        from afml.services.data_loader import compact_frame
+        df = compact_frame(df)
+    df = df.copy()
+    df[TIME_COL] = pd.to_datetime(df[TIME_COL])
+    tz = df[TIME_COL].dt.tz
+    if tz is not None:
+        df[TIME_COL] = df[TIME_COL].dt.tz_localize(None)
+    df = df.sort_values(TIME_COL)
+    source_dtypes = {c: str(df[c].dtype) for c in df.columns}
+
+    months = df[TIME_COL].dt.strftime('%Y-%m')
+    for month, part in df.groupby(months, sort=True):
+        part_dir = os.path.join(_ticker_dir(ticker, store_path), month)
+        if os.path.isdir(part_dir):
+            existing = pd.DataFrame(_read_partition(part_dir, mmap=False))
+            part = pd.concat([existing, part], ignore_index=True)
+            part = part.drop_duplicates(subset=[TIME_COL], keep='last').sort_values(TIME_COL)
+        arrays = _frame_to_arrays(part.reset_index(drop=True))
+        manifest = {
+            'columns': list(arrays),
+            'dtypes': {c: source_dtypes.get(c, str(arrays[c].dtype)) for c in arrays},
+            'tz': str(tz) if tz is not None else None,
+        }
+        _write_partition(part_dir, arrays, manifest)
+
+
+def read_ticker(ticker: str, start_date: str = None, end_date: str = None, columns: list = None,
+                store_path: str = stocks_store_path) -> pd.DataFrame:
+    """
+    Đọc một mã từ kho cột, chỉ mở các phân vùng tháng giao với [start_date, end_date]
+    và chỉ các cột được yêu cầu (luôn kèm 'time'). Cắt biên trong phân vùng bằng searchsorted.
+    Thứ tự cột, kiểu và múi giờ được khôi phục theo manifest (giống kết quả đọc CSV gốc);
+    start_date/end_date so theo giờ địa phương của dữ liệu.
+    """
+    start = pd.to_datetime(start_date) if start_date else None
+    end = pd.to_datetime(end_date) if end_date else None
+    start_month = start.strftime('%Y-%m') if start is not None else None
+    end_month = end.strftime('%Y-%m') if end is not None else None
+
+    read_cols = None
+    if columns is not None:
+        read_cols = [TIME_COL] + [c for c in columns if c != TIME_COL]
+
+    pieces = []
+    manifest = None
+    for month in list_partitions(ticker, store_path):
+        if (start_month and month < start_month) or (end_month and month > end_month):
+            continue
+        part_dir = os.path.join(_ticker_dir(ticker, store_path), month)
+        manifest = manifest or _read_manifest(part_dir)
+        arrays = _read_partition(part_dir, read_cols)
+        times = arrays[TIME_COL]
+        lo = np.searchsorted(times, start.to_datetime64(), side='left') if start is not None else 0
+        hi = np.searchsorted(times, end.to_datetime64(), side='right') if end is not None else len(times)
+        if hi > lo:
+            pieces.append({c: np.asarray(v[lo:hi]) for c, v in arrays.items()})
+
+    if not pieces:
+        return pd.DataFrame(columns=read_cols or [TIME_COL])
+    data = {c: np.concatenate([p[c] for p in pieces]) for c in pieces[0]}
+    return _restore_frame(data, manifest)
+
+
+def convert_csv_to_store(tickers: list = None, csv_path: str = stocks_data_path,
+                         store_path: str = stocks_store_path, compact: bool = False) -> Dict:
+    """
+    Chuyển các file CSV (datasets/stocks/{TICKER}.csv) sang kho cột.
+    :return: dict {ticker: số dòng đã ghi}
+    """
+    # Import muộn: data_loader import ngược lại module này
+    from afml.services.data_loader import CSV_DTYPES, _read_csv_frame
+    if tickers is None:
+        tickers = sorted(os.path.splitext(f)[0] for f in os.listdir(csv_path) if f.endswith('.csv'))
+    written = {}
+    for i, ticker in enumerate(tickers, 1):
+        file_path = os.path.join(csv_path, f"{ticker}.csv")
+        if not os.path.exists(file_path):
+            continue
+        # Cùng cách đọc với load_stocks để kho lưu đúng kiểu dữ liệu của CSV
+        df = _read_csv_frame(file_path, CSV_DTYPES, parse_time=True)
+        if TIME_COL not in df.columns:
+            print(f"[Columnar Store] Bỏ qua {ticker}: thiếu cột '{TIME_COL}'.")
+            continue
+        write_ticker(ticker, df, store_path, compact=compact)
+        written[ticker] = len(df)
+        print(f"[Columnar Store] ({i}/{len(tickers)}) {ticker}: {len(df)} dòng.")
+    return written
+
+
+if __name__ == "__main__":
+    # Chuyển toàn bộ CSV sang kho cột: python -m afml.services.columnar_store [--compact] [TICKER ...]
+    args = sys.argv[1:]
+    compact = '--compact' in args
+    selected = [a for a in args if a != '--compact'] or None
+    result = convert_csv_to_store(selected, compact=compact)
+    print(f"[Columnar Store] Hoàn tất {len(result)} mã, {sum(result.values())} dòng -> {stocks_store_path}")
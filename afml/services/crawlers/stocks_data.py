@@ -6,6 +6,8 @@ from datetime import datetime
 import requests
 from vnstock.core.utils.user_agent import get_headers
 
+from afml.services.data_loader import compact_frame, memory_report
+
 class Config:
     today = datetime.now().strftime('%Y-%m-%d')
 
@@ -54,7 +56,18 @@ class RequestAPI:
 
 
 
-async def get_symbol_data(symbol: str, start_date='2013-01-01', end_date=Config.today):
+async def get_symbol_data(symbol: str, start_date='2013-01-01', end_date=Config.today, compact: bool = False):
+    """
+    Tải/cập nhật dữ liệu 1 phút của một mã và lưu CSV.
+    compact=True: DataFrame trả về dùng kiểu gọn (float32 giá, uint32 volume, datetime64 time)
+    để giữ được toàn thị trường trong bộ nhớ khi gom kết quả; file CSV không đổi.
+    """
+    result = await _get_symbol_data(symbol, start_date, end_date)
+    if compact and result is not None and not result.empty:
+        result = compact_frame(result)
+    return result
+
+async def _get_symbol_data(symbol: str, start_date='2013-01-01', end_date=Config.today):
     file_path = os.path.join(Config.save_dir, f"{symbol}.csv")
     loop = asyncio.get_running_loop()
     
@@ -112,7 +125,7 @@ async def get_symbol_data(symbol: str, start_date='2013-01-01', end_date=Config.
         
     return await loop.run_in_executor(None, fetch_history)
 
-async def get_data(tickers: list):
+async def get_data(tickers: list, compact: bool = False):
     # Now we process all tickers provided, checking if they need updates
     print(f"Tổng số ticker cần kiểm tra: {len(tickers)}")
     
@@ -123,7 +136,7 @@ async def get_data(tickers: list):
         chunk = tickers[i:i + chunk_size]
         print(f"Processing chunk {i//chunk_size + 1}/{(len(tickers) + chunk_size - 1) // chunk_size} ({len(chunk)} tickers)...")
         
-        tasks = [get_symbol_data(symbol) for symbol in chunk]
+        tasks = [get_symbol_data(symbol, compact=compact) for symbol in chunk]
         results = await asyncio.gather(*tasks)
         all_results.extend(results)
         
@@ -131,6 +144,9 @@ async def get_data(tickers: list):
             print(f"Đã chạy được {chunk_size} vòng, tạm dừng 1 phút để tránh giới hạn API...")
             await asyncio.sleep(61)  # Sleep 61s to be safe
             
+    if compact:
+        memory_report({t: df for t, df in zip(tickers, all_results) if df is not None})
+
     return all_results
 
 if __name__ == "__main__":
@@ -0,0 +1,359 @@
+from typing import Dict
+import pandas as pd
+import numpy as np
+import os
+import time
+
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from afml.utils.config import stocks_data_path, stocks_agg_path
+from afml.services.columnar_store import list_store_tickers, read_ticker
+from afml.services.aggregates import normalize_freq, read_aggregate, update_aggregates
+
+# Kiểu dữ liệu tường minh cho các cột giá (bỏ qua bước đoán kiểu của parser).
+# volume để parser tự suy: int64 như bản gốc, chỉ thành float64 khi file có ô trống.
+CSV_DTYPES = {
+    'open': 'float64',
+    'high': 'float64',
+    'low': 'float64',
+    'close': 'float64',
+}
+
+def _parse_time(df):
+    """Parse cột 'time' (nếu có) bằng pandas: mọi engine cho cùng kiểu, giữ nguyên múi giờ trong file."""
+    if 'time' in df.columns:
+        df['time'] = pd.to_datetime(df['time'])
+    return df
+
+def _local_bound(value, tz):
+    """Mốc lọc thời gian theo giờ địa phương của dữ liệu: mốc naive được gắn múi giờ `tz` của cột 'time'."""
+    value = pd.Timestamp(value)
+    if tz is not None and value.tz is None:
+        return value.tz_localize(tz)
+    return value
+
+def _read_csv_frame(file_path, dtypes=None, parse_time=False):
+    # Một lượt đọc: khoá của dtypes không có trong file được pandas bỏ qua
+    df = pd.read_csv(file_path, dtype=dtypes or None)
+    return _parse_time(df) if parse_time else df
+
+def _read_csv_buffers(args):
+    """
+    Worker của process pool: đọc CSV trong process riêng (không tranh GIL) và
+    trả về các mảng theo cột (pickle rẻ hơn DataFrame).
+    """
+    file_path, dtypes, parse_time = args
+    df = _read_csv_frame(file_path, dtypes, parse_time)
+    # .values của cột có múi giờ bỏ mất tz -> giữ mảng pandas để kết quả giống engine 'thread'
+    return {c: df[c].array if isinstance(df[c].dtype, pd.DatetimeTZDtype) else df[c].values for c in df.columns}
+
+def _read_csv_arrow(args):
+    """Đọc CSV bằng trình đọc đa luồng của Arrow (nhả GIL trong toàn bộ quá trình parse)."""
+    import pyarrow as pa
+    import pyarrow.csv as pv
+    file_path, dtypes, parse_time = args
+    column_types = {c: pa.from_numpy_dtype(np.dtype(t)) for c, t in (dtypes or {}).items()}
+    # 'time' đọc dạng chuỗi rồi parse như các engine khác (cùng độ phân giải, cùng múi giờ)
+    column_types['time'] = pa.string()
+    df = pv.read_csv(file_path, convert_options=pv.ConvertOptions(column_types=column_types)).to_pandas()
+    return _parse_time(df) if parse_time else df
+
+def read_parallel(files, engine: str = 'thread', max_workers: int = None, dtypes: dict = None,
+                  parse_time: bool = False, progress: bool = True, return_report: bool = False):
+    """
+    Đọc song song danh sách các file CSV.
+    :param files: List các đường dẫn file tuyệt đối
+    :param engine: 'thread' (ThreadPoolExecutor + pandas), 'process' (process pool trả về mảng NumPy,
+                   mở rộng theo số core) hoặc 'arrow' (pyarrow.csv đa luồng, cần cài pyarrow).
+    :param dtypes: kiểu dữ liệu tường minh theo cột (vd CSV_DTYPES).
+    :param parse_time: parse cột 'time' sang datetime64 ngay khi đọc.
+    :param progress: in tiến độ và thông lượng.
+    :param return_report: trả thêm báo cáo {'ok', 'failed', 'rows', 'bytes', 'seconds', ...}.
+    :return: Dictionary {ticker: DataFrame} (và report nếu return_report=True).
+             File lỗi không làm hỏng cả lô, được liệt kê trong report['failed'].
+    """
+    report = {'files': len(files), 'ok': 0, 'failed': [], 'rows': 0, 'bytes': 0, 'seconds': 0.0}
+    if not files:
+        return ({}, report) if return_report else {}
+        
+    print(f"Bắt đầu đọc {len(files)} file song song...")
+    jobs = [(f, dtypes, parse_time) for f in files]
+    if engine == 'thread':
+        executor_cls, worker = ThreadPoolExecutor, (lambda job: _read_csv_frame(*job))
+    elif engine == 'process':
+        executor_cls, worker = ProcessPoolExecutor, _read_csv_buffers
+    elif engine == 'arrow':
+        import pyarrow.csv  # noqa: F401  báo lỗi sớm nếu chưa cài pyarrow
+        executor_cls, worker = ThreadPoolExecutor, _read_csv_arrow
+    else:
+        raise ValueError("engine phải là 'thread', 'process' hoặc 'arrow'.")
+
+    t0 = time.perf_counter()
+    frames = {}
+    step = max(1, len(files) // 10)
+    with executor_cls(max_workers=max_workers) as executor:
+        futures = {executor.submit(worker, job): job[0] for job in jobs}
+        for done, future in enumerate(as_completed(futures), 1):
+            file_path = futures[future]
+            try:
+                data = future.result()
+                df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data, copy=False)
+                frames[file_path] = df
+                report['ok'] += 1
+                report['rows'] += len(df)
+                report['bytes'] += os.path.getsize(file_path)
+            except Exception as e:
+                report['failed'].append((file_path, f"{type(e).__name__}: {e}"))
+
+            if progress and (done % step == 0 or done == len(files)):
+                elapsed = max(time.perf_counter() - t0, 1e-9)
+                print(f"[read_parallel] {done}/{len(files)} file | {report['bytes'] / 2**20 / elapsed:.1f} MB/s"
+                      f" | {report['rows'] / elapsed:,.0f} dòng/s | lỗi: {len(report['failed'])}")
+
+    report['seconds'] = time.perf_counter() - t0
+    for file_path, error in report['failed']:
+        print(f"[read_parallel] Lỗi đọc {file_path}: {error}")
+    
+    # Tạo dictionary theo thứ tự của files: Key là tên file (bỏ đuôi .csv), Value là DataFrame
+    results = {}
+    for file_path in files:
+        if file_path in frames:
+            # Lấy tên file từ đường dẫn (ví dụ: 'AAA.csv' -> 'AAA')
+            ticker = os.path.splitext(os.path.basename(file_path))[0]
+            results[ticker] = frames[file_path]
+    return (results, report) if return_report else results
+
+PRICE_COLS = ('open', 'high', 'low', 'close')
+
+def compact_frame(df: pd.DataFrame, ticker: str = None, time_as: str = 'datetime64') -> pd.DataFrame:
+    """
+    Chuyển DataFrame OHLCV sang kiểu dữ liệu gọn:
+    - giá OHLC: float32
+    - volume: uint32 (nếu là số nguyên không âm vừa 32 bit), ngược lại int64/float32
+    - time: datetime64[ns] hoặc int64 epoch nano giây (time_as='epoch')
+    - ticker: cột categorical nếu truyền `ticker`
+    """
+    out = {}
+    for col in df.columns:
+        values = df[col]
+        if col in PRICE_COLS:
+            values = values.astype(np.float32)
+        elif col == 'volume':
+            v = values.values
+            integral = not np.issubdtype(v.dtype, np.floating) or (np.isfinite(v).all() and (v == np.round(v)).all())
+            if integral and len(v) and v.min() >= 0 and v.max() <= np.iinfo(np.uint32).max:
+                values = values.astype(np.uint32)
+            elif integral and not np.issubdtype(v.dtype, np.integer):
+                values = values.astype(np.int64)
+            elif not integral:
+                values = values.astype(np.float32)
+        elif col == 'time':
+            values = pd.to_datetime(values)
+            if values.dt.tz is not None:
+                values = values.dt.tz_localize(None)
+            values = values.astype('datetime64[ns]')
+            if time_as == 'epoch':
+                values = values.astype(np.int64)
+        out[col] = values
+    compact = pd.DataFrame(out, index=df.index)
+    if ticker is not None:
+        compact['ticker'] = pd.Categorical([ticker] * len(compact))
+    return compact
+
+def stack_universe(stocks_dict: Dict, compact: bool = True) -> pd.DataFrame:
+    """
+    Ghép {ticker: DataFrame} thành một bảng dài với cột 'ticker' categorical (mỗi mã chỉ lưu một lần).
+    """
+    tickers = list(stocks_dict)
+    frames = [compact_frame(stocks_dict[t]) if compact else stocks_dict[t] for t in tickers]
+    lengths = [len(f) for f in frames]
+    long_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    codes = np.repeat(np.arange(len(tickers), dtype=np.int32), lengths)
+    long_df['ticker'] = pd.Categorical.from_codes(codes, categories=tickers)
+    return long_df
+
+def memory_report(stocks_dict: Dict, verbose: bool = True) -> pd.Series:
+    """
+    Bộ nhớ (byte, tính cả chuỗi) của từng mã và tổng cộng.
+    """
+    usage = pd.Series({t: int(df.memory_usage(deep=True).sum()) for t, df in stocks_dict.items()}, dtype=np.int64)
+    if verbose:
+        print(f"[Memory] {len(usage)} mã, tổng {usage.sum() / 2**20:.1f} MB"
+              f" (trung bình {usage.mean() / 2**20 if len(usage) else 0:.2f} MB/mã)")
+    return usage
+
+def _compact_all(stocks_dict: Dict, compact: bool) -> Dict:
+    """Bước cuối chung của mọi nguồn trong load_stocks: compact=True -> kiểu gọn + in memory_report."""
+    if not compact:
+        return stocks_dict
+    stocks_dict = {t: compact_frame(df) for t, df in stocks_dict.items()}
+    memory_report(stocks_dict)
+    return stocks_dict
+
+def read_store_parallel(tickers, start_date=None, end_date=None, columns=None) -> Dict:
+    """
+    Đọc song song từ kho cột: chỉ các phân vùng tháng và cột cần thiết.
+    """
+    if not tickers:
+        return {}
+    with ThreadPoolExecutor() as executor:
+        dfs = list(executor.map(lambda t: read_ticker(t, start_date, end_date, columns), tickers))
+    return dict(zip(tickers, dfs))
+
+def load_stocks(tickers: list = None, start_date: str = None, end_date: str = None,
+                columns: list = None, source: str = 'csv', engine: str = 'thread',
+                compact: bool = False, freq: str = None, update: bool = False) -> Dict:
+    """
+    Hàm tiện ích để đọc file csv chứng khoán.
+    Hỗ trợ lọc theo danh sách mã (tickers) và khoảng thời gian (start_date, end_date).
+    :param columns: chỉ lấy các cột này (luôn kèm 'time').
+    :param source: 'csv' (datasets/stocks) hoặc 'store' (kho cột datasets/stocks_store,
+                   đẩy lọc thời gian/cột xuống tầng đọc, xem afml.services.columnar_store).
+    :param engine: cách đọc CSV song song, xem read_parallel ('thread', 'process', 'arrow').
+    :param compact: chuyển sang kiểu gọn (float32 giá, uint32 volume, datetime64 time), xem compact_frame,
+                    và in memory_report (với mọi source/freq).
+    :param freq: None/'1m' = nến 1 phút gốc; '5min', '15min', '1D' (hoặc '5m', '15m', 'D') = đọc từ
+                 kho nến tổng hợp sẵn (datasets/stocks_agg, xem afml.services.aggregates).
+    :param update: với freq, cập nhật tăng dần kho tổng hợp từ `source` trước khi đọc (ghi đĩa).
+                   Mặc định chỉ đọc; cập nhật kho bằng update_aggregates, `afml load --update-aggregates`
+                   hoặc `python -m afml.services.aggregates`.
+    """
+    if freq not in (None, '1m', '1min'):
+        return _load_aggregated(tickers, start_date, end_date, columns, source, compact, freq, update)
+    if source == 'store':
+        available = list_store_tickers()
+        selected = available if tickers is None else [t for t in tickers if t in set(available)]
+        stocks_dict = read_store_parallel(selected, start_date, end_date, columns)
+        return _compact_all(stocks_dict, compact)
+    if source != 'csv':
+        raise ValueError("source phải là 'csv' hoặc 'store'.")
+
+    if tickers is not None:
+        all_files = [
+            os.path.join(stocks_data_path, f"{t}.csv") 
+            for t in tickers 
+            if os.path.exists(os.path.join(stocks_data_path, f"{t}.csv"))
+        ]
+    else:
+        # Lấy danh sách full path của tất cả file .csv
+        all_files = [
+            os.path.join(stocks_data_path, f) 
+            for f in os.listdir(stocks_data_path) 
+            if f.endswith('.csv')
+        ]
+        
+    # Cùng dtypes và parse thời gian cho mọi engine: kết quả không phụ thuộc cách đọc
+    stocks_dict = read_parallel(all_files, engine=engine, dtypes=CSV_DTYPES, parse_time=True)
+    
+    # Tiền xử lý lọc thời gian cho từng DataFrame
+    if start_date or end_date:
+        for ticker, df in stocks_dict.items():
+            if 'time' in df.columns:
+                df['time'] = pd.to_datetime(df['time'])
+                tz = df['time'].dt.tz
+                mask = pd.Series(True, index=df.index)
+                if start_date:
+                    mask &= (df['time'] >= _local_bound(start_date, tz))
+                if end_date:
+                    mask &= (df['time'] <= _local_bound(end_date, tz))
+                stocks_dict[ticker] = df[mask].reset_index(drop=True)
+
+    if columns is not None:
+        for ticker, df in stocks_dict.items():
+            keep = ['time'] + [c for c in columns if c != 'time' and c in df.columns]
+            stocks_dict[ticker] = df[[c for c in keep if c in df.columns]]
+
+    return _compact_all(stocks_dict, compact)
+
+def _load_aggregated(tickers, start_date, end_date, columns, source, compact, freq, update):
+    freq = normalize_freq(freq)
+    if update:
+        update_aggregates(tickers, freqs=[freq], source=source)
+    available = list_store_tickers(os.path.join(stocks_agg_path, freq))
+    selected = available if tickers is None else [t for t in tickers if t in set(available)]
+    if tickers is not None and len(selected) < len(tickers):
+        missing = [t for t in tickers if t not in set(available)]
+        print(f"[load_stocks] {len(missing)} mã chưa có trong kho {freq} (chạy update_aggregates): {missing[:10]}")
+    with ThreadPoolExecutor() as executor:
+        dfs = list(executor.map(lambda t: read_aggregate(t, freq, start_date, end_date, columns), selected))
+    return _compact_all(dict(zip(selected, dfs)), compact)
+
+def _ffill_limited(panel, times, max_stale=None):
+    """
+    Forward-fill tại chỗ theo trục thời gian, chỉ điền khi giá trị cuối cùng còn "tươi":
+    max_stale là số dòng (int) hoặc khoảng thời gian (Timedelta/str, vd '15min').
+    """
+    n_rows = panel.shape[0]
+    row_ix = np.arange(n_rows)[:, None]
+    last_valid = np.where(~np.isnan(panel), row_ix, -1)
+    np.maximum.accumulate(last_valid, axis=0, out=last_valid)
+
+    fill = (last_valid >= 0) & np.isnan(panel)
+    if max_stale is not None:
+        if isinstance(max_stale, (int, np.integer)):
+            fill &= (row_ix - last_valid) <= max_stale
+        else:
+            age = times[:, None] - times[np.maximum(last_valid, 0)]
+            fill &= age <= pd.Timedelta(max_stale).to_timedelta64()
+    cols = np.broadcast_to(np.arange(panel.shape[1]), panel.shape)
+    panel[fill] = panel[last_valid[fill], cols[fill]]
+    return panel
+
+def assemble_panel(stocks: Dict, field: str, names: list = None, dtype=np.float64):
+    """
+    Ghép {ticker: DataFrame có cột 'time'} thành mảng (time x ticker) bằng một lần cấp phát.
+    :return: (panel, times, names) với times là lưới thời gian hợp (datetime64[ns], đã sắp xếp).
+    """
+    names = list(stocks) if names is None else names
+    names = [t for t in names if field in stocks[t].columns and 'time' in stocks[t].columns]
+
+    times_list = [pd.to_datetime(stocks[t]['time']).values.astype('datetime64[ns]') for t in names]
+    times = np.unique(np.concatenate(times_list)) if times_list else np.array([], dtype='datetime64[ns]')
+
+    # Một lần cấp phát cho toàn bộ panel
+    panel = np.full((len(times), len(names)), np.nan, dtype=dtype)
+    for j, (t, t_times) in enumerate(zip(names, times_list)):
+        panel[np.searchsorted(times, t_times), j] = stocks[t][field].values
+    return panel, times, names
+
+def load_panel(field: str = 'close', tickers: list = None, start_date: str = None, end_date: str = None,
+               how: str = 'inner', max_stale=None, dtype=np.float64, source: str = 'csv',
+               freq: str = None, update: bool = False) -> pd.DataFrame:
+    """
+    Dựng ma trận (time x ticker) cho một cột (vd 'close') bằng một lần cấp phát,
+    thay cho việc ghép DataFrame từ dict rồi dropna/to_datetime nhiều lần.
+
+    :param how: chính sách căn chỉnh thời gian
+        - 'inner': chỉ giữ các mốc thời gian mọi mã đều có dữ liệu.
+        - 'ffill': điền tiến giá trị gần nhất, giới hạn độ cũ bằng max_stale.
+        - 'mask' : giữ NaN ở ô thiếu (mặt nạ pairwise = panel.notna()).
+    :param max_stale: giới hạn độ cũ cho 'ffill' (số dòng hoặc Timedelta/str). None = không giới hạn.
+    :param dtype: np.float64 hoặc np.float32.
+    :param freq: tần suất nến (vd '1D' cho HRP theo ngày), xem load_stocks.
+    :param update: cập nhật kho tổng hợp trước khi đọc, xem load_stocks.
+    :return: DataFrame index 'time' (DatetimeIndex đã sắp xếp), columns = tickers.
+    """
+    if how not in ('inner', 'ffill', 'mask'):
+        raise ValueError("how phải là 'inner', 'ffill' hoặc 'mask'.")
+    stocks = load_stocks(tickers, start_date, end_date, columns=[field], source=source, freq=freq, update=update)
+    names = [t for t in (tickers if tickers is not None else stocks.keys()) if t in stocks]
+    panel, times, names = assemble_panel(stocks, field, names, dtype)
+
+    if how == 'inner':
+        keep = ~np.isnan(panel).any(axis=1)
+        panel, times = panel[keep], times[keep]
+    elif how == 'ffill':
+        _ffill_limited(panel, times, max_stale)
+
+    return pd.DataFrame(panel, index=pd.DatetimeIndex(times, name='time'), columns=names, copy=False)
+
+if __name__ == "__main__":
+    # Test nhanh khi chạy trực tiếp (lưu ý: cần chạy kiểu module: python -m afml.services.data_loader)
+    try:
+        stock_dict = load_stocks(tickers=['AAA', 'ACB'], start_date='2024-01-01')
+        print(f"Tổng số mã cổ phiếu đã tải: {len(stock_dict)}")
+        if stock_dict:
+            first_ticker = list(stock_dict.keys())[0]
+            print(f"Ví dụ dữ liệu của {first_ticker}:")
+            print(stock_dict[first_ticker].head())
+    except Exception as e:
+        print(f"Lỗi: {e}")
\ No newline at end of file
@@ -0,0 +1,214 @@
+from typing import Dict, Iterator, Tuple
+import io
+import queue
+import os
+import threading
+
+import pandas as pd
+import numpy as np
+
+from afml.utils.config import stocks_data_path, stocks_store_path
+from afml.services.columnar_store import list_partitions, list_store_tickers, read_ticker
+from afml.services.data_loader import CSV_DTYPES, _local_bound, _parse_time, assemble_panel
+
+
+class _CsvCursor:
+    """
+    Con trỏ đọc tuần tự một CSV đã sắp theo 'time', theo từng khối byte.
+    Không giữ file mở giữa các lần đọc (đủ cho hàng nghìn mã), chỉ giữ vị trí byte và phần dư đã parse.
+    """
+    def __init__(self, file_path, columns=None, block_bytes=1 << 20):
+        self.file_path = file_path
+        self.block_bytes = block_bytes
+        with open(file_path, 'rb') as f:
+            header_line = f.readline()
+        self.header = header_line.decode('utf-8').strip().split(',')
+        self.usecols = None if columns is None else ['time'] + [c for c in columns if c != 'time' and c in self.header]
+        self.offset = len(header_line)
+        self.eof = False
+        self.buffer = None
+
+    def _read_block(self):
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(self.block_bytes)
+        if len(data) < self.block_bytes:
+            self.eof = True
+        else:
+            # Chỉ parse đến hết dòng cuối cùng đầy đủ
+            cut = data.rfind(b'\n') + 1
+            if cut == 0:
+                # Một dòng dài hơn cả khối: đọc tiếp lần sau với khối lớn hơn
+                self.block_bytes *= 2
+                return self._read_block()
+            data = data[:cut]
+        self.offset += len(data)
+        if not data.strip():
+            return None
+        dtypes = {c: t for c, t in CSV_DTYPES.items() if c in self.header}
+        # Parse 'time' như load_stocks: cùng độ phân giải, giữ múi giờ trong file
+        df = pd.read_csv(io.BytesIO(data), names=self.header, usecols=self.usecols, dtype=dtypes)
+        return _parse_time(df if self.usecols is None else df[self.usecols])
+
+    def peek_time(self):
+        """Mốc thời gian kế tiếp chưa đọc, theo giờ địa phương (naive) của file (None nếu hết)."""
+        while (self.buffer is None or self.buffer.empty) and not self.eof:
+            self.buffer = self._read_block()
+        if self.buffer is None or self.buffer.empty:
+            return None
+        first = self.buffer['time'].iloc[0]
+        return first.tz_localize(None) if first.tz is not None else first
+
+    def take_until(self, end):
+        """Lấy mọi dòng có time < end (đọc thêm khối nếu cần); end naive được hiểu theo múi giờ của file."""
+        pieces = []
+        while True:
+            if self.buffer is None or self.buffer.empty:
+                if self.eof:
+                    break
+                self.buffer = self._read_block()
+                continue
+            times = self.buffer['time']
+            bound = _local_bound(end, times.dt.tz)
+            # .values của cột có múi giờ là UTC -> so với mốc đã đổi sang UTC (numpy tự nâng độ phân giải)
+            bound = bound.tz_convert(None) if bound.tz is not None else bound
+            cut = np.searchsorted(times.values, bound.to_datetime64(), side='left')
+            pieces.append(self.buffer.iloc[:cut])
+            self.buffer = self.buffer.iloc[cut:]
+            if not self.buffer.empty:
+                break
+        pieces = [p for p in pieces if not p.empty]
+        if not pieces:
+            return None
+        return pd.concat(pieces, ignore_index=True)
+
+
+def _iter_chunks(tickers, start, end, freq, columns, source, block_bytes):
+    if source == 'csv':
+        cursors = {t: _CsvCursor(os.path.join(stocks_data_path, f"{t}.csv"), columns, block_bytes) for t in tickers}
+        if start is not None:
+            for cursor in cursors.values():
+                cursor.take_until(start)
+        firsts = [c.peek_time() for c in cursors.values()]
+        firsts = [t for t in firsts if t is not None]
+        if not firsts:
+            return
+        period = pd.Timestamp(min(firsts)).to_period(freq)
+    else:
+        if start is None:
+            # Phân vùng tháng sớm nhất trong kho cột
+            months = [m for t in tickers for m in _store_months(t)[:1]]
+            if not months:
+                return
+            start = pd.Timestamp(min(months))
+        period = pd.Timestamp(start).to_period(freq)
+        last = None
+        if end is None:
+            months = [m for t in tickers for m in _store_months(t)[-1:]]
+            last = (pd.Period(max(months), 'M') + 1).start_time if months else None
+
+    while True:
+        p_start = max(period.start_time, start) if start is not None else period.start_time
+        p_end = (period + 1).start_time
+        if end is not None:
+            if p_start > end:
+                return
+            p_end = min(p_end, end + pd.Timedelta(1, 'ns'))
+
+        chunk = {}
+        if source == 'csv':
+            for t, cursor in cursors.items():
+                df = cursor.take_until(p_end)
+                if df is not None:
+                    chunk[t] = df
+            if not chunk and all(c.eof and (c.buffer is None or c.buffer.empty) for c in cursors.values()):
+                return
+        else:
+            if end is None and (last is None or p_start >= last):
+                return
+            for t in tickers:
+                df = read_ticker(t, p_start, p_end - pd.Timedelta(1, 'ns'), columns, stocks_store_path)
+                if not df.empty:
+                    chunk[t] = df
+        if chunk:
+            yield period.start_time, chunk
+        period += 1
+
+
+def _store_months(ticker):
+    return list_partitions(ticker, stocks_store_path)
+
+
+def stream_stocks(tickers: list = None, start_date: str = None, end_date: str = None, freq: str = 'D',
+                  columns: list = None, field: str = None, source: str = 'csv', prefetch: int = 1,
+                  dtype=np.float64, block_bytes: int = 1 << 20) -> Iterator[Tuple[pd.Timestamp, Dict]]:
+    """
+    Duyệt toàn universe theo thời gian, mỗi lần một kỳ ('D' ngày, 'W' tuần, 'M' tháng),
+    mọi mã cùng kỳ được trả về cùng lúc; bộ nhớ chỉ phụ thuộc kích thước một kỳ.
+    Kỳ kế tiếp được đọc trước trên luồng nền trong lúc kỳ hiện tại đang được xử lý.
+
+    :param columns: chỉ đọc các cột này (luôn kèm 'time').
+    :param field: nếu truyền (vd 'close'), mỗi kỳ trả về DataFrame (time x ticker) thay vì dict.
+    :param source: 'csv' (đọc tuần tự theo khối byte) hoặc 'store' (kho cột, đọc theo phân vùng).
+    :param prefetch: số kỳ đọc trước (0 = không dùng luồng nền).
+    :yield: (thời điểm bắt đầu kỳ, {ticker: DataFrame} hoặc panel DataFrame)
+    """
+    if source not in ('csv', 'store'):
+        raise ValueError("source phải là 'csv' hoặc 'store'.")
+    if tickers is None:
+        if source == 'csv':
+            tickers = sorted(os.path.splitext(f)[0] for f in os.listdir(stocks_data_path) if f.endswith('.csv'))
+        else:
+            tickers = list_store_tickers(stocks_store_path)
+    if field is not None:
+        columns = [field] if columns is None else list(dict.fromkeys(list(columns) + [field]))
+    start = pd.to_datetime(start_date) if start_date else None
+    end = pd.to_datetime(end_date) if end_date else None
+
+    def produce():
+        for period_start, chunk in _iter_chunks(tickers, start, end, freq, columns, source, block_bytes):
+            if field is not None:
+                panel, times, names = assemble_panel(chunk, field, None, dtype)
+                chunk = pd.DataFrame(panel, index=pd.DatetimeIndex(times, name='time'), columns=names, copy=False)
+            yield period_start, chunk
+
+    if not prefetch:
+        yield from produce()
+        return
+
+    # Luồng nền đọc trước tối đa `prefetch` kỳ vào hàng đợi
+    q = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+    done = object()
+
+    def put(item):
+        # Chờ chỗ trống trong hàng đợi nhưng thoát ngay nếu bên tiêu thụ đã dừng
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def worker():
+        try:
+            for item in produce():
+                if not put(item):
+                    return
+            put(done)
+        except Exception as e:
+            put(e)
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = q.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
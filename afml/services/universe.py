@@ -0,0 +1,159 @@
+from collections import OrderedDict
+from collections.abc import Mapping
+import json
+import os
+
+import pandas as pd
+
+from afml.utils.config import stocks_data_path
+from afml.services.data_loader import _read_csv_frame
+
+INDEX_FILE = '_index.json'
+
+
+def build_index(data_path: str = stocks_data_path, refresh: bool = False) -> dict:
+    """
+    Tạo/cập nhật file chỉ mục phụ (sidecar) {ticker: first, last, rows, size, mtime} cạnh các CSV.
+    Chỉ đọc lại cột 'time' của các file đã thay đổi (size/mtime khác) hoặc khi refresh=True.
+    """
+    index_path = os.path.join(data_path, INDEX_FILE)
+    index = {}
+    if os.path.exists(index_path) and not refresh:
+        with open(index_path, encoding='utf-8') as f:
+            index = json.load(f)
+
+    current = {}
+    for name in sorted(os.listdir(data_path)):
+        if not name.endswith('.csv'):
+            continue
+        ticker = os.path.splitext(name)[0]
+        file_path = os.path.join(data_path, name)
+        stat = os.stat(file_path)
+        entry = index.get(ticker)
+        if entry is None or entry['size'] != stat.st_size or entry['mtime'] != stat.st_mtime:
+            times = pd.to_datetime(pd.read_csv(file_path, usecols=['time'])['time'])
+            entry = {
+                'first': str(times.min()) if len(times) else None,
+                'last': str(times.max()) if len(times) else None,
+                'rows': int(len(times)),
+                'size': stat.st_size,
+                'mtime': stat.st_mtime,
+            }
+        current[ticker] = entry
+
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(current, f, indent=1)
+    os.replace(tmp_path, index_path)
+    return current
+
+
+class LazyUniverse(Mapping):
+    """
+    Universe cổ phiếu dạng mapping {ticker: DataFrame} tải lười: chỉ đọc file khi truy cập lần đầu.
+    Giữ tổng bộ nhớ các DataFrame đã tải dưới `memory_budget` bằng cách loại bỏ mã ít dùng gần đây (LRU).
+    Metadata (first/last/rows) lấy từ file chỉ mục phụ, không chạm vào file dữ liệu.
+    """
+    def __init__(self, tickers: list = None, start_date: str = None, end_date: str = None,
+                 columns: list = None, memory_budget: int = 2 * 2**30, data_path: str = stocks_data_path):
+        """
+        :param memory_budget: giới hạn bộ nhớ (byte) cho các DataFrame đang giữ. None = không giới hạn.
+        """
+        self.data_path = data_path
+        self.start_date = start_date
+        self.end_date = end_date
+        self.columns = columns
+        self.memory_budget = memory_budget
+        if tickers is None:
+            tickers = sorted(os.path.splitext(f)[0] for f in os.listdir(data_path) if f.endswith('.csv'))
+        self._tickers = list(tickers)
+        self._ticker_set = set(self._tickers)
+        self._cache = OrderedDict()
+        self._sizes = {}
+        self._index = None
+        self.memory_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._tickers)
+
+    def __iter__(self):
+        return iter(self._tickers)
+
+    def __contains__(self, ticker):
+        return ticker in self._ticker_set
+
+    def __getitem__(self, ticker):
+        if ticker not in self._ticker_set:
+            raise KeyError(ticker)
+        if ticker in self._cache:
+            self._cache.move_to_end(ticker)
+            self.hits += 1
+            return self._cache[ticker]
+
+        self.misses += 1
+        df = self._load(ticker)
+        size = int(df.memory_usage(deep=True).sum())
+        self._cache[ticker] = df
+        self._sizes[ticker] = size
+        self.memory_used += size
+        self._evict(keep=ticker)
+        return df
+
+    def _load(self, ticker):
+        df = _read_csv_frame(os.path.join(self.data_path, f"{ticker}.csv"), parse_time=True)
+        if self.columns is not None:
+            df = df[['time'] + [c for c in self.columns if c != 'time' and c in df.columns]]
+        if self.start_date or self.end_date:
+            mask = pd.Series(True, index=df.index)
+            if self.start_date:
+                mask &= df['time'] >= pd.to_datetime(self.start_date)
+            if self.end_date:
+                mask &= df['time'] <= pd.to_datetime(self.end_date)
+            df = df[mask].reset_index(drop=True)
+        return df
+
+    def _evict(self, keep=None):
+        if self.memory_budget is None:
+            return
+        while self.memory_used > self.memory_budget and len(self._cache) > 1:
+            ticker = next(iter(self._cache))
+            if ticker == keep:
+                break
+            del self._cache[ticker]
+            self.memory_used -= self._sizes.pop(ticker)
+            self.evictions += 1
+
+    def release(self, ticker=None):
+        """Bỏ một mã (hoặc toàn bộ) khỏi bộ nhớ."""
+        tickers = [ticker] if ticker is not None else list(self._cache)
+        for t in tickers:
+            if t in self._cache:
+                del self._cache[t]
+                self.memory_used -= self._sizes.pop(t)
+
+    @property
+    def loaded(self):
+        return list(self._cache)
+
+    def metadata(self, ticker=None):
+        """
+        Metadata từ file chỉ mục phụ (tạo bằng build_index). Không đọc file dữ liệu.
+        :return: dict của một mã, hoặc DataFrame cho toàn universe nếu ticker=None.
+        """
+        if self._index is None:
+            index_path = os.path.join(self.data_path, INDEX_FILE)
+            if not os.path.exists(index_path):
+                raise FileNotFoundError(f"[LazyUniverse] Chưa có {index_path}, hãy chạy build_index() trước.")
+            with open(index_path, encoding='utf-8') as f:
+                self._index = json.load(f)
+        if ticker is not None:
+            return self._index.get(ticker)
+        meta = pd.DataFrame.from_dict(
+            {t: self._index[t] for t in self._tickers if t in self._index}, orient='index')
+        if not meta.empty:
+            meta['first'] = pd.to_datetime(meta['first'])
+            meta['last'] = pd.to_datetime(meta['last'])
+        return meta
@@ -0,0 +1,8 @@
+import os
+
+# Thư mục gốc chứa datasets/: mặc định là gốc repo; đặt AFML_HOME khi cài package ra ngoài repo
+project_root = os.environ.get(
+    'AFML_HOME', os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+stocks_data_path = os.path.join(project_root, 'datasets', 'stocks')
+stocks_store_path = os.path.join(project_root, 'datasets', 'stocks_store')
+stocks_agg_path = os.path.join(project_root, 'datasets', 'stocks_agg')
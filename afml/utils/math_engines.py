@@ -0,0 +1,184 @@
+import pandas as pd
+import numpy as np
+
+def log_return(prices):
+    """
+    Tính log return từ một mảng các giá trị giá.
+    Công thức: Log return = ln(P_t / P_{t-1})
+    
+    :param prices: array-like (list, np.ndarray, pd.Series) chứa lịch sử giá.
+    :return: np.ndarray chứa các giá trị log return (kích thước n-1 so với mảng ban đầu)
+    """
+    prices_array = np.array(prices)
+    # prices_array[1:] lấy giá từ ngày thứ 2 trở đi (P_t)
+    # prices_array[:-1] lấy giá từ ngày đầu đến giáp ngày cuối (P_{t-1})
+    return np.log(prices_array[1:] / prices_array[:-1])
+
+def pairwise_distance(X, dtype=None, block_size=None):
+    """
+    Khoảng cách Euclid giữa mọi cặp cột của ma trận X (n_features x n_assets).
+    Dùng đồng nhất thức Gram: ||x_i - x_j||^2 = ||x_i||^2 + ||x_j||^2 - 2 * x_i.x_j
+    nên toàn bộ ma trận được tính bằng một phép nhân ma trận (BLAS) thay vì vòng lặp.
+
+    :param X: array-like 2 chiều, mỗi cột là một vector.
+    :param dtype: np.float32 để giảm một nửa bộ nhớ, mặc định np.float64.
+    :param block_size: số cột xử lý mỗi khối. None = tính một lần; đặt giá trị (vd 512)
+                       để bộ nhớ tạm chỉ còn O(block_size * n) khi n lớn (n=5000).
+    :return: np.ndarray (n_assets x n_assets), đối xứng, đường chéo bằng 0.
+    """
+    dtype = np.float64 if dtype is None else np.dtype(dtype)
+    X = np.array(X, dtype=dtype)
+    # Khoảng cách không đổi khi tịnh tiến: trừ trung bình theo hàng để giảm sai số triệt tiêu
+    X -= X.mean(axis=1, keepdims=True)
+    n = X.shape[1]
+    sq_norms = np.einsum('ij,ij->j', X, X)
+    out = np.empty((n, n), dtype=dtype)
+
+    step = max(n if not block_size else int(block_size), 1)
+    for start in range(0, n, step):
+        stop = min(start + step, n)
+        # Khối hàng [start:stop] của ma trận khoảng cách bình phương
+        block = out[start:stop]
+        np.dot(X[:, start:stop].T, X, out=block)
+        block *= -2.0
+        block += sq_norms[start:stop, None]
+        block += sq_norms[None, :]
+
+    # Sai số làm tròn có thể cho giá trị âm rất nhỏ trước khi lấy căn
+    np.maximum(out, 0.0, out=out)
+    np.sqrt(out, out=out)
+    # Ép đối xứng tuyệt đối (chép tam giác trên xuống dưới theo khối) và đường chéo bằng 0
+    for start in range(0, n, step):
+        stop = min(start + step, n)
+        out[start:stop, :start] = out[:start, start:stop].T
+        diag_block = out[start:stop, start:stop]
+        lower = np.tril_indices(stop - start, -1)
+        diag_block[lower] = diag_block.T[lower]
+    np.fill_diagonal(out, 0.0)
+    return out
+
+# Số cột mỗi khối trong các kernel panel (time x asset, C-contiguous): trong một khối,
+# vòng trong chạy dọc theo hàng nên truy cập bộ nhớ liên tục; các khối độc lập nên chạy song song được.
+PANEL_COL_BLOCK = 64
+
+def _as_panel(values):
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    return np.ascontiguousarray(values)
+
+def _check_out(out, shape, name):
+    if out is None:
+        return np.empty(shape, dtype=np.float64)
+    if out.shape != shape or out.dtype != np.float64:
+        raise ValueError(f"{name} phải là mảng float64 kích thước {shape}.")
+    return out
+
+def panel_log_returns(prices, out=None, parallel=False):
+    """
+    Log return cho cả ma trận giá (time x asset) trong một lần duyệt, thay cho vòng lặp log_return theo cột.
+    Ô có giá NaN hoặc <= 0 (ở t hoặc t-1) cho NaN thay vì inf/cảnh báo.
+
+    :param prices: array-like (T x N) hoặc (T,).
+    :param out: mảng float64 (T-1 x N) cấp phát sẵn; có thể là prices[1:] để tính tại chỗ.
+    :param parallel: chia các khối cột cho các luồng Numba.
+    :return: np.ndarray (T-1 x N).
+    """
+    prices = _as_panel(prices)
+    out = _check_out(out, (max(prices.shape[0] - 1, 0), prices.shape[1]), 'out')
+    from afml.utils import numba_kernels
+    kernel = numba_kernels.panel_log_returns_parallel if parallel else numba_kernels.panel_log_returns_serial
+    kernel(prices, out, PANEL_COL_BLOCK)
+    return out
+
+def panel_features(open_, high, low, close, volume=None, returns_out=None, typical_out=None,
+                   dollar_out=None, parallel=False):
+    """
+    Một lần duyệt hợp nhất trên các ma trận OHLC(V) (time x asset) tính:
+    log return của close (T-1 x N), typical price (O+H+L+C)/4 và dollar value = typical * volume
+    (không có volume thì dollar = O+H+L+C, giống dollar_value). Giá NaN hoặc <= 0 cho NaN.
+    Các mảng *_out cấp phát sẵn có thể trùng với đầu vào (vd returns_out=close[1:]) vì kernel duyệt ngược thời gian.
+
+    :return: (returns, typical, dollar)
+    """
+    close = _as_panel(close)
+    open_, high, low = _as_panel(open_), _as_panel(high), _as_panel(low)
+    has_volume = volume is not None
+    volume = _as_panel(volume) if has_volume else close
+    for name, arr in (('open', open_), ('high', high), ('low', low), ('volume', volume)):
+        if arr.shape != close.shape:
+            raise ValueError(f"{name} phải cùng kích thước với close {close.shape}.")
+    returns_out = _check_out(returns_out, (max(close.shape[0] - 1, 0), close.shape[1]), 'returns_out')
+    typical_out = _check_out(typical_out, close.shape, 'typical_out')
+    dollar_out = _check_out(dollar_out, close.shape, 'dollar_out')
+    from afml.utils import numba_kernels
+    kernel = numba_kernels.panel_features_parallel if parallel else numba_kernels.panel_features_serial
+    kernel(open_, high, low, close, volume, has_volume, returns_out, typical_out, dollar_out, PANEL_COL_BLOCK)
+    return returns_out, typical_out, dollar_out
+
+def test_normality(bars_df, title="Dollar Bars Normality Test"):
+    """
+    Thực hiện kiểm định tính chuẩn toàn diện trên chuỗi Lợi suất Logarit.
+    """
+    import scipy.stats as stats
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    # 1. Tính Log Returns
+    # Thay 'close' bằng tên cột giá đóng cửa thực tế trong DataFrame của Anh
+    returns = np.log(bars_df['close'] / bars_df['close'].shift(1)).dropna()
+    
+    # 2. Tính toán các Moment Thống kê
+    skewness = stats.skew(returns)
+    kurtosis = stats.kurtosis(returns) # Hàm này trả về Excess Kurtosis (Độ nhọn vượt trội so với phân phối chuẩn có mức = 0)
+    
+    # 3. Kiểm định Jarque-Bera
+    jb_stat, p_value = stats.jarque_bera(returns)
+    
+    # 4. In Báo cáo
+    print(f"--- BÁO CÁO THỐNG KÊ: {title} ---")
+    print(f"Số lượng quan sát (N): {len(returns)}")
+    print(f"Độ lệch (Skewness)  : {skewness:.4f} (Gần 0 là tốt)")
+    print(f"Độ nhọn (Kurtosis)   : {kurtosis:.4f} (Gần 0 là tốt. >0 là đuôi béo)")
+    print(f"Jarque-Bera Stat     : {jb_stat:.2f}")
+    print(f"P-value              : {p_value:.6e}")
+    
+    # 5. Vẽ đồ thị Trực quan hóa
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+    
+    # Đồ thị Histogram & KDE so với Phân phối chuẩn
+    sns.histplot(returns, kde=True, stat='density', ax=axes[0], color='blue', bins=100)
+    xmin, xmax = axes[0].get_xlim()
+    x = np.linspace(xmin, xmax, 100)
+    p = stats.norm.pdf(x, np.mean(returns), np.std(returns))
+    axes[0].plot(x, p, 'k', linewidth=2, label='Normal Curve')
+    axes[0].set_title('Histogram & KDE')
+    axes[0].legend()
+    
+    # Biểu đồ Q-Q Plot
+    stats.probplot(returns, dist="norm", plot=axes[1])
+    axes[1].set_title('Q-Q Plot')
+    
+    plt.tight_layout()
+    plt.show()
+
+def dollar_value(df: pd.DataFrame):
+    """
+    Tính toán Dollar Value từ một DataFrame chứa OHLC.
+    Nếu có Volume, Dollar Value = Typical Price * Volume.
+    Nếu không có Volume, trả về tổng O+H+L+C như thiết kế nháp.
+    """    
+    missing = [c for c in ('open', 'high', 'low', 'close') if c not in df.columns]
+    if missing:
+        raise ValueError("DataFrame yêu cầu phải có các cột 'open', 'high', 'low', 'close', 'volume.")
+    volume = df['volume'].values if 'volume' in df.columns else None
+    _, _, dollar = panel_features(df['open'].values, df['high'].values, df['low'].values,
+                                  df['close'].values, volume)
+    return pd.Series(dollar[:, 0], index=df.index, name='dollar_value')
+
+
+def __getattr__(name):
+    # Kernel Numba giữ tên cũ trong math_engines nhưng chỉ nạp numba khi được truy cập
+    if name in ('rec_bipart', 'rec_bipart_splits'):
+        from afml.utils import numba_kernels
+        return getattr(numba_kernels, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
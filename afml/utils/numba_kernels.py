@@ -0,0 +1,167 @@
+"""
+Các kernel Numba (@njit, cache=True) của math_engines.
+Tách riêng để `import numba` (và biên dịch/nạp cache) chỉ xảy ra khi kernel thực sự được dùng:
+math_engines và HRP import module này muộn, bên trong hàm.
+"""
+import os
+
+import numpy as np
+from numba import config, njit, prange
+
+# Các process pool của thư viện (batch HRP, NCO, batch_bars, read_parallel) tạo worker bằng fork:
+# sau khi kernel parallel=True chạy trên lớp luồng TBB, fork làm tiến trình cha treo khi thoát.
+# Mặc định dùng 'workqueue' (an toàn với fork); đặt NUMBA_THREADING_LAYER để chọn lớp khác.
+if 'NUMBA_THREADING_LAYER' not in os.environ:
+    config.THREADING_LAYER = 'workqueue'
+
+@njit(cache=True)
+def _cluster_var_block(cov_sorted, inv_diag, start, stop):
+    """
+    Phương sai cụm nghịch đảo phương sai trên khối liền kề [start, stop) của cov đã sắp xếp.
+    """
+    total = 0.0
+    for i in range(start, stop):
+        total += inv_diag[i]
+    c_var = 0.0
+    for i in range(start, stop):
+        row = 0.0
+        for j in range(start, stop):
+            row += cov_sorted[i, j] * inv_diag[j]
+        c_var += inv_diag[i] * row
+    return c_var / (total * total)
+
+@njit(cache=True)
+def rec_bipart(cov_sorted):
+    """
+    Recursive Bisection của HRP trên ma trận hiệp phương sai đã sắp theo thứ tự quasi-diag.
+    Mỗi cụm là một đoạn chỉ số [start, stop) nên không cần cắt/sao chép ma trận con.
+
+    :param cov_sorted: np.ndarray (n x n) C-contiguous, cov[sort_ix][:, sort_ix].
+    :return: np.ndarray trọng số theo thứ tự sort_ix.
+    """
+    n = cov_sorted.shape[0]
+    inv_diag = np.empty(n)
+    for i in range(n):
+        inv_diag[i] = 1.0 / (cov_sorted[i, i] + 1e-8)
+    w = np.ones(n)
+
+    # Ngăn xếp các cụm cần chia đôi (duyệt từ gốc xuống: thứ tự nhân alpha giống bản NumPy)
+    stack_start = np.empty(n, dtype=np.int64)
+    stack_stop = np.empty(n, dtype=np.int64)
+    stack_start[0] = 0
+    stack_stop[0] = n
+    top = 1
+    while top > 0:
+        top -= 1
+        start = stack_start[top]
+        stop = stack_stop[top]
+        if stop - start <= 1:
+            continue
+        mid = start + (stop - start) // 2
+
+        c_var0 = _cluster_var_block(cov_sorted, inv_diag, start, mid)
+        c_var1 = _cluster_var_block(cov_sorted, inv_diag, mid, stop)
+        alpha = 1.0 - c_var0 / (c_var0 + c_var1)
+
+        for i in range(start, mid):
+            w[i] *= alpha
+        for i in range(mid, stop):
+            w[i] *= 1.0 - alpha
+
+        stack_start[top] = start
+        stack_stop[top] = mid
+        stack_start[top + 1] = mid
+        stack_stop[top + 1] = stop
+        top += 2
+    return w
+
+@njit(cache=True)
+def rec_bipart_splits(cov_sorted, splits):
+    """
+    Recursive Bisection theo danh sách điểm chia (start, mid, stop) cho trước, từ gốc xuống
+    (vd chia theo dendrogram thật thay vì chia đôi danh sách).
+    """
+    n = cov_sorted.shape[0]
+    inv_diag = np.empty(n)
+    for i in range(n):
+        inv_diag[i] = 1.0 / (cov_sorted[i, i] + 1e-8)
+    w = np.ones(n)
+
+    for k in range(splits.shape[0]):
+        start = splits[k, 0]
+        mid = splits[k, 1]
+        stop = splits[k, 2]
+        c_var0 = _cluster_var_block(cov_sorted, inv_diag, start, mid)
+        c_var1 = _cluster_var_block(cov_sorted, inv_diag, mid, stop)
+        alpha = 1.0 - c_var0 / (c_var0 + c_var1)
+        for i in range(start, mid):
+            w[i] *= alpha
+        for i in range(mid, stop):
+            w[i] *= 1.0 - alpha
+    return w
+
+@njit(cache=True)
+def _log_returns_block(prices, out, c0, c1):
+    # Duyệt ngược theo thời gian để out có thể là view prices[1:] (tính tại chỗ)
+    for t in range(prices.shape[0] - 1, 0, -1):
+        for j in range(c0, c1):
+            p1 = prices[t, j]
+            p0 = prices[t - 1, j]
+            # So sánh với NaN luôn False nên NaN cũng bị che
+            if p1 > 0.0 and p0 > 0.0:
+                out[t - 1, j] = np.log(p1 / p0)
+            else:
+                out[t - 1, j] = np.nan
+
+@njit(cache=True)
+def panel_log_returns_serial(prices, out, col_block):
+    n_cols = prices.shape[1]
+    for c0 in range(0, n_cols, col_block):
+        _log_returns_block(prices, out, c0, min(c0 + col_block, n_cols))
+
+@njit(cache=True, parallel=True)
+def panel_log_returns_parallel(prices, out, col_block):
+    n_cols = prices.shape[1]
+    n_blocks = (n_cols + col_block - 1) // col_block
+    for b in prange(n_blocks):
+        c0 = b * col_block
+        _log_returns_block(prices, out, c0, min(c0 + col_block, n_cols))
+
+@njit(cache=True)
+def _features_block(open_, high, low, close, volume, has_volume, returns, typical, dollar, c0, c1):
+    for t in range(close.shape[0] - 1, -1, -1):
+        for j in range(c0, c1):
+            o = open_[t, j]
+            h = high[t, j]
+            lo = low[t, j]
+            c = close[t, j]
+            if t > 0:
+                c_prev = close[t - 1, j]
+                if c > 0.0 and c_prev > 0.0:
+                    returns[t - 1, j] = np.log(c / c_prev)
+                else:
+                    returns[t - 1, j] = np.nan
+            if o > 0.0 and h > 0.0 and lo > 0.0 and c > 0.0:
+                total = o + h + lo + c
+                tp = 0.25 * total
+                typical[t, j] = tp
+                dollar[t, j] = tp * volume[t, j] if has_volume else total
+            else:
+                typical[t, j] = np.nan
+                dollar[t, j] = np.nan
+
+@njit(cache=True)
+def panel_features_serial(open_, high, low, close, volume, has_volume, returns, typical, dollar, col_block):
+    n_cols = close.shape[1]
+    for c0 in range(0, n_cols, col_block):
+        _features_block(open_, high, low, close, volume, has_volume, returns, typical, dollar,
+                        c0, min(c0 + col_block, n_cols))
+
+@njit(cache=True, parallel=True)
+def panel_features_parallel(open_, high, low, close, volume, has_volume, returns, typical, dollar, col_block):
+    n_cols = close.shape[1]
+    n_blocks = (n_cols + col_block - 1) // col_block
+    for b in prange(n_blocks):
+        c0 = b * col_block
+        _features_block(open_, high, low, close, volume, has_volume, returns, typical, dollar,
+                        c0, min(c0 + col_block, n_cols))
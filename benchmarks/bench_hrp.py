@@ -0,0 +1,180 @@
+"""
+Benchmark từng giai đoạn của HRP trên universe tổng hợp có cấu trúc tương quan theo khối.
+
+Chạy (sau `pip install -e .`, hoặc từ thư mục gốc dự án với PYTHONPATH=.):
+    python benchmarks/bench_hrp.py --sizes 50x10000 200x100000 1000x100000 --out bench.json
+    python benchmarks/bench_hrp.py --baseline bench_baseline.json --tolerance 0.25
+
+Mặc định các universe nhỏ chạy với T=1e6 dòng (200x1e6 cần ~1.6 GB RAM, 0.8 GB với --float32).
+Kích thước lớn hơn (vd 1000x1e6, 5000x1e6) chạy được nếu đủ RAM: dữ liệu chiếm n * T * 8 byte (4 với --float32).
+Mỗi giai đoạn (covariance, distance, linkage, quasi_diag, bisection) được đo thời gian
+(lấy min qua --repeat lần, không bật tracemalloc) và bộ nhớ đỉnh (một lần chạy riêng với tracemalloc,
+có theo dõi cấp phát của NumPy).
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from afml.models.opti.HRP import HRP
+from afml.models.opti.estimators import SampleCovariance
+
+STAGES = ('covariance', 'distance', 'linkage', 'quasi_diag', 'bisection')
+DEFAULT_SIZES = ('50x1000000', '200x1000000', '1000x100000', '5000x20000')
+
+
+def synthetic_returns(n_assets, n_rows, n_blocks=10, block_corr=0.5, seed=0, dtype=np.float64, chunk_rows=100_000):
+    """
+    Lợi suất tổng hợp: mỗi tài sản = yếu tố chung của khối + nhiễu riêng,
+    tương quan trong khối ≈ block_corr, giữa các khối ≈ 0. Sinh theo khối dòng để giới hạn bộ nhớ tạm.
+    """
+    rng = np.random.default_rng(seed)
+    blocks = np.arange(n_assets) % max(1, min(n_blocks, n_assets))
+    loading = np.sqrt(block_corr)
+    noise = np.sqrt(1.0 - block_corr)
+    scale = rng.uniform(0.005, 0.03, n_assets).astype(dtype)
+
+    out = np.empty((n_rows, n_assets), dtype=dtype)
+    for start in range(0, n_rows, chunk_rows):
+        stop = min(start + chunk_rows, n_rows)
+        factors = rng.standard_normal((stop - start, blocks.max() + 1)).astype(dtype)
+        chunk = out[start:stop]
+        chunk[:] = rng.standard_normal((stop - start, n_assets)).astype(dtype)
+        chunk *= noise
+        chunk += loading * factors[:, blocks]
+        chunk *= scale
+    columns = [f"A{i:05d}" for i in range(n_assets)]
+    return pd.DataFrame(out, columns=columns)
+
+
+def _measure(func, repeat):
+    """
+    Trả về (kết quả, thời gian nhỏ nhất, bộ nhớ đỉnh MB).
+    Thời gian lấy từ `repeat` lần chạy không bật tracemalloc (tracemalloc làm chậm mỗi lần cấp phát);
+    bộ nhớ đỉnh đo riêng trong một lần chạy có theo dõi.
+    """
+    best = np.inf
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - t0)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, best, peak / 2**20
+
+
+def bench_universe(returns_df, hrp, repeat=3):
+    """Đo từng giai đoạn của pipeline HRP.allocate. Trả về dict stage -> (seconds, peak_mb)."""
+    timings = {}
+    (cov, corr), timings['covariance'], mem_cov = _measure(lambda: hrp.estimator.estimate(returns_df), repeat)
+    dist, timings['distance'], mem_dist = _measure(lambda: hrp.get_distance_matrix(corr), repeat)
+    link, timings['linkage'], mem_link = _measure(lambda: hrp.get_linkage(dist), repeat)
+
+    def quasi_diag():
+        tree = hrp.get_cluster_tree(link)
+        return tree, hrp.get_quasi_diag(link, tree=tree)
+
+    (tree, sort_ix), timings['quasi_diag'], mem_qd = _measure(quasi_diag, repeat)
+    bis_tree = tree if hrp.bisection == 'tree' else None
+    _, timings['bisection'], mem_bis = _measure(lambda: hrp.get_rec_bipart(cov, sort_ix, tree=bis_tree), repeat)
+
+    memory = dict(zip(STAGES, (mem_cov, mem_dist, mem_link, mem_qd, mem_bis)))
+    return {stage: (timings[stage], memory[stage]) for stage in STAGES}
+
+
+def compare(results, baseline, tolerance):
+    """In các giai đoạn chậm hơn baseline quá `tolerance` (tỉ lệ). Trả về số lượng hồi quy."""
+    base = {(r['n_assets'], r['n_rows'], r['stage']): r for r in baseline['results']}
+    regressions = 0
+    for r in results:
+        ref = base.get((r['n_assets'], r['n_rows'], r['stage']))
+        if ref is None or ref['seconds'] <= 0:
+            continue
+        ratio = r['seconds'] / ref['seconds']
+        flag = 'REGRESSION' if ratio > 1 + tolerance else 'ok'
+        if flag != 'ok':
+            regressions += 1
+        print(f"  n={r['n_assets']:>5} T={r['n_rows']:>8} {r['stage']:<11} "
+              f"{ref['seconds']:.4f}s -> {r['seconds']:.4f}s (x{ratio:.2f}) {flag}")
+    return regressions
+
+
+def parse_size(text):
+    n_assets, n_rows = text.lower().split('x')
+    return int(n_assets), int(float(n_rows))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark từng giai đoạn HRP trên dữ liệu tổng hợp.")
+    parser.add_argument('--sizes', nargs='+', default=list(DEFAULT_SIZES),
+                        help="Danh sách n_assets x n_rows, vd 1000x1e6.")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--blocks', type=int, default=10)
+    parser.add_argument('--float32', action='store_true',
+                        help="Sinh dữ liệu, ước lượng hiệp phương sai và tính khoảng cách bằng float32.")
+    parser.add_argument('--block-size', type=int, default=None, help="block_size cho ma trận khoảng cách.")
+    parser.add_argument('--numba', action='store_true', help="Dùng kernel Numba cho bisection.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='bench_output.json')
+    parser.add_argument('--baseline', default=None, help="File JSON kết quả cũ để so sánh.")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Ngưỡng chậm hơn cho phép (0.2 = 20%%).")
+    args = parser.parse_args(argv)
+
+    dtype = np.float32 if args.float32 else np.float64
+    hrp = HRP(dtype=dtype if args.float32 else None, block_size=args.block_size, use_numba=args.numba,
+              estimator=SampleCovariance(dtype=dtype))
+
+    results = []
+    for size in args.sizes:
+        n_assets, n_rows = parse_size(size)
+        print(f"[Bench HRP] n={n_assets}, T={n_rows}: sinh dữ liệu ({n_assets * n_rows * np.dtype(dtype).itemsize / 2**20:.0f} MB)...")
+        returns_df = synthetic_returns(n_assets, n_rows, n_blocks=args.blocks, seed=args.seed, dtype=dtype)
+        stages = bench_universe(returns_df, hrp, repeat=args.repeat)
+        del returns_df
+        for stage, (seconds, peak_mb) in stages.items():
+            print(f"  {stage:<11} {seconds:9.4f}s  peak {peak_mb:9.1f} MB")
+            results.append({'n_assets': n_assets, 'n_rows': n_rows, 'stage': stage,
+                             'seconds': seconds, 'peak_mb': peak_mb})
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+            'dtype': np.dtype(dtype).name,
+            'block_size': args.block_size,
+            'numba': args.numba,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"[Bench HRP] Đã ghi kết quả vào {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"[Bench HRP] So sánh với baseline {args.baseline} (tolerance {args.tolerance:.0%}):")
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +0,0 @@
-import os
-
-project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-stocks_data_path = os.path.join(project_root, 'datasets', 'stocks')
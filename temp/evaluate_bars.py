@@ -13,7 +13,7 @@ if project_root not in sys.path:
     sys.path.append(project_root)
 
 # Import module
-from src.models.preprocess.info_driven import TimeBar, DollarBar
+from afml.models.preprocess.info_driven import TimeBar, DollarBar
 
 # Tạo thư mục temp
 out_dir = r"E:\Projects\adv_ml_fin\temp"
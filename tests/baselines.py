@@ -0,0 +1,228 @@
+"""
+Bản cài đặt gốc (trước tối ưu) dùng làm chuẩn đối chiếu trong test.
+Giữ nguyên thuật toán của phiên bản đầu, chỉ bỏ phần in log.
+"""
+import numpy as np
+import pandas as pd
+
+
+def distance_of_distance(corr):
+    dist_corr = np.sqrt(0.5 * (1 - corr))
+    dist_of_dist = np.zeros(corr.shape)
+    n_assets = dist_corr.shape[0]
+    for i in range(n_assets):
+        for j in range(n_assets):
+            dist_of_dist[i, j] = np.sqrt(np.sum((dist_corr.iloc[:, i] - dist_corr.iloc[:, j])**2))
+    return pd.DataFrame(dist_of_dist, index=corr.index, columns=corr.columns)
+
+
+def cluster_var(cov, c_items):
+    cov_slice = cov.iloc[c_items, c_items]
+    ivp = 1. / (np.diag(cov_slice) + 1e-8)
+    ivp /= ivp.sum()
+    w = ivp.reshape(-1, 1)
+    return np.dot(np.dot(w.T, cov_slice), w)[0, 0]
+
+
+def rec_bipart(cov, sort_ix):
+    w = pd.Series(1.0, index=sort_ix)
+    c_items = [sort_ix]
+    while len(c_items) > 0:
+        c_items = [i[j:k] for i in c_items for j, k in ((0, len(i) // 2), (len(i) // 2, len(i))) if len(i) > 1]
+        for i in range(0, len(c_items), 2):
+            c_items0 = c_items[i]
+            c_items1 = c_items[i + 1]
+            c_var0 = cluster_var(cov, c_items0)
+            c_var1 = cluster_var(cov, c_items1)
+            alpha = 1 - c_var0 / (c_var0 + c_var1)
+            w.loc[c_items0] *= alpha
+            w.loc[c_items1] *= 1 - alpha
+    return w
+
+
+def quasi_diag(link):
+    link = link.astype(int)
+    sort_ix = pd.Series([link[-1, 0], link[-1, 1]])
+    num_items = link[-1, 3]
+    while sort_ix.max() >= num_items:
+        sort_ix.index = range(0, sort_ix.shape[0] * 2, 2)
+        df0 = sort_ix[sort_ix >= num_items]
+        i = df0.index
+        j = (df0.values - num_items).astype(int)
+        sort_ix.loc[i] = link[j, 0]
+        df0_new = pd.Series(link[j, 1], index=i + 1)
+        sort_ix = pd.concat([sort_ix, df0_new])
+        sort_ix = sort_ix.sort_index()
+        sort_ix.index = range(sort_ix.shape[0])
+    return sort_ix.tolist()
+
+
+def dynamic_dollar_bars(df, rolling_window=20, n_target=20):
+    daily_dollar_volume = df['dollar_value'].resample('D').sum()
+    daily_dollar_volume = daily_dollar_volume[daily_dollar_volume > 0]
+    rolling_vt = (daily_dollar_volume.rolling(window=rolling_window, min_periods=1).mean() / n_target).shift(1)
+    vt_dict = {k.date(): v for k, v in rolling_vt.dropna().items()}
+    thresholds = pd.Series(df.index.date, index=df.index).map(vt_dict).values
+    valid_idx = ~pd.isna(thresholds)
+
+    times = df.index.values[valid_idx]
+    opens = df['open'].values[valid_idx]
+    highs = df['high'].values[valid_idx]
+    lows = df['low'].values[valid_idx]
+    closes = df['close'].values[valid_idx]
+    volumes = df['volume'].values[valid_idx]
+    dollar_values = df['dollar_value'].values[valid_idx]
+    threshold_vals = thresholds[valid_idx]
+
+    bars = []
+    cum_dollar = cum_volume = 0.0
+    cum_ticks = 0
+    high_price, low_price = -np.inf, np.inf
+    open_price = open_time = None
+    for i in range(len(times)):
+        if open_price is None:
+            open_price = opens[i]
+            open_time = times[i]
+        cum_dollar += dollar_values[i]
+        cum_volume += volumes[i]
+        cum_ticks += 1
+        if highs[i] > high_price: high_price = highs[i]
+        if lows[i] < low_price: low_price = lows[i]
+        if cum_dollar >= threshold_vals[i]:
+            bars.append({
+                'open_time': open_time, 'close_time': times[i], 'open': open_price,
+                'high': max(high_price, open_price), 'low': min(low_price, open_price), 'close': closes[i],
+                'volume': cum_volume, 'dollar_value': cum_dollar, 'tick_count': cum_ticks,
+                'vt_threshold': threshold_vals[i],
+            })
+            cum_dollar = cum_volume = 0.0
+            cum_ticks = 0
+            high_price, low_price = -np.inf, np.inf
+            open_price = open_time = None
+    bars = pd.DataFrame(bars)
+    if not bars.empty:
+        bars.set_index('close_time', inplace=True)
+    return bars
+
+
+def _ewma(arr_in, state, alpha):
+    for x in arr_in:
+        state = (alpha * x) + ((1.0 - alpha) * state)
+    return state
+
+
+def imbalance_bars(df, initial_T_guess=100, span=100):
+    df = df.copy()
+    b_t = np.sign(df['close'].diff()).replace(0, np.nan).ffill().fillna(1)
+    df['b_t'] = b_t
+    df.dropna(subset=['b_t', 'dollar_value'], inplace=True)
+    df_warmup = df.head(initial_T_guess * 5)
+
+    alpha = 2.0 / (span + 1)
+    tick_imbalance_array = (df_warmup['b_t'] * df_warmup['dollar_value']).dropna().values
+    expected_b_v = _ewma(tick_imbalance_array[1:], tick_imbalance_array[0], alpha) if len(tick_imbalance_array) else 0.0
+    expected_T = initial_T_guess
+    threshold = expected_T * np.abs(expected_b_v)
+    floor = max(threshold * 0.1, df_warmup['typical_price'].median() * 0.1)
+
+    times = df.index.values
+    opens, highs, lows, closes = (df[c].values for c in ('open', 'high', 'low', 'close'))
+    volumes = df['volume'].values
+    dollar_values = df['dollar_value'].values
+    b_t_values = df['b_t'].values
+
+    theta = 0.0
+    current = []
+    bars = []
+    cum_volume = 0.0
+    cum_ticks = 0
+    open_price = open_time = None
+    high_price, low_price = -np.inf, np.inf
+    for i in range(len(df_warmup), len(times)):
+        tick_imbalance = b_t_values[i] * dollar_values[i]
+        theta += tick_imbalance
+        current.append(tick_imbalance)
+        if open_price is None:
+            open_price = opens[i]
+            open_time = times[i]
+        if highs[i] > high_price: high_price = highs[i]
+        if lows[i] < low_price: low_price = lows[i]
+        cum_volume += volumes[i]
+        cum_ticks += 1
+        if abs(theta) >= threshold:
+            bars.append({
+                'open_time': open_time, 'close_time': times[i], 'open': open_price,
+                'high': max(high_price, open_price), 'low': min(low_price, open_price), 'close': closes[i],
+                'volume': cum_volume, 'dollar_imbalance': theta, 'tick_count': cum_ticks,
+                'threshold_used': threshold,
+            })
+            expected_T = (alpha * len(current)) + ((1 - alpha) * expected_T)
+            expected_b_v = _ewma(np.array(current, dtype=np.float64), expected_b_v, alpha)
+            threshold = max(expected_T * np.abs(expected_b_v), floor)
+            theta = 0.0
+            current = []
+            cum_volume = 0.0
+            cum_ticks = 0
+            open_price = open_time = None
+            high_price, low_price = -np.inf, np.inf
+    bars = pd.DataFrame(bars)
+    if not bars.empty:
+        bars.set_index('close_time', inplace=True)
+    return bars
+
+
+def runs_bars(df, initial_T_guess=100, span=100, run_type='dollar'):
+    """Runs bars theo định nghĩa AFML 2.3.2.2, viết thẳng bằng Python (bản gốc chưa cài đặt runs_bar)."""
+    alpha = 2.0 / (span + 1)
+    opens, highs, lows, closes = (df[c].values for c in ('open', 'high', 'low', 'close'))
+    dollars = df['dollar_value'].values.astype(np.float64)
+    volumes = df['volume'].values.astype(np.float64)
+    values = {'tick': np.ones(len(df)), 'volume': volumes, 'dollar': dollars}[run_type]
+    times = df.index.values
+
+    def ewma(state, x):
+        return x if np.isnan(state) else alpha * x + (1 - alpha) * state
+
+    prev_close, prev_b = np.nan, 1.0
+    p_buy = v_buy = v_sell = np.nan
+    expected_T = initial_T_guess
+    n_warmup, seen = initial_T_guess * 5, 0
+    threshold = floor = None
+    bars = []
+    bar = None
+    for i in range(len(df)):
+        delta = closes[i] - prev_close
+        b = 1.0 if delta > 0 else (-1.0 if delta < 0 else prev_b)
+        prev_b, prev_close = b, closes[i]
+        if np.isnan(values[i]) or np.isnan(dollars[i]):
+            continue
+        p_buy = ewma(p_buy, 1.0 if b > 0 else 0.0)
+        if b > 0:
+            v_buy = ewma(v_buy, values[i])
+        else:
+            v_sell = ewma(v_sell, values[i])
+        expected_run = max(p_buy * np.nan_to_num(v_buy), (1 - p_buy) * np.nan_to_num(v_sell))
+        if seen < n_warmup:
+            seen += 1
+            if seen == n_warmup:
+                threshold = expected_T * expected_run
+                floor = threshold * 0.1
+            continue
+
+        if bar is None:
+            bar = {'open_time': times[i], 'open': opens[i], 'high': -np.inf, 'low': np.inf,
+                   'volume': 0.0, 'dollar_value': 0.0, 'buy_run': 0.0, 'sell_run': 0.0, 'tick_count': 0}
+        bar['high'] = max(bar['high'], highs[i])
+        bar['low'] = min(bar['low'], lows[i])
+        bar['volume'] += volumes[i]
+        bar['dollar_value'] += dollars[i]
+        bar['buy_run' if b > 0 else 'sell_run'] += values[i]
+        bar['tick_count'] += 1
+        if max(bar['buy_run'], bar['sell_run']) >= threshold:
+            bar.update(close_time=times[i], close=closes[i], threshold_used=threshold,
+                       high=max(bar['high'], bar['open']), low=min(bar['low'], bar['open']))
+            bars.append(bar)
+            expected_T = alpha * bar['tick_count'] + (1 - alpha) * expected_T
+            threshold = max(expected_T * expected_run, floor)
+            bar = None
+    return pd.DataFrame(bars)
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def block_returns(n_rows=500, n_assets=40, n_blocks=4, seed=0):
+    """Lợi suất giả lập có cấu trúc khối: mỗi khối chung một nhân tố, cộng nhiễu riêng."""
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(0, n_blocks, n_assets)
+    factors = rng.normal(0, 0.01, (n_rows, n_blocks))
+    X = factors[:, blocks] + rng.normal(0, 0.01, (n_rows, n_assets))
+    return pd.DataFrame(X, columns=[f"A{i:02d}" for i in range(n_assets)])
+
+
+def minute_data(days=60, seed=0, tz=None, unit='ns'):
+    """Nến phút giả lập theo phiên HOSE (9:15-11:30, 13:00-14:45) kèm typical_price, dollar_value."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2024-01-01', periods=days)
+    minutes = np.concatenate([np.arange(9 * 60 + 15, 11 * 60 + 30), np.arange(13 * 60, 14 * 60 + 45)])
+    offsets = (minutes * 60 * 10**9).astype('timedelta64[ns]')
+    index = pd.DatetimeIndex((dates.values[:, None] + offsets[None, :]).ravel(), name='time')
+    if tz:
+        index = index.tz_localize(tz)
+    index = index.as_unit(unit)
+
+    n = len(index)
+    # Giá làm tròn 0.1 để có nhiều tick không đổi giá (kiểm tra quy tắc tick)
+    close = np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.001, n))), 1)
+    open_ = close * np.exp(rng.normal(0, 0.0005, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.0005, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.0005, n)))
+    volume = rng.integers(0, 5000, n) * 100
+    volume[rng.random(n) < 0.05] = 0
+    df = pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}, index=index)
+    df['typical_price'] = (df['open'] + df['high'] + df['low'] + df['close']) / 4
+    df['dollar_value'] = df['typical_price'] * df['volume']
+    return df
+
+
+@pytest.fixture
+def returns_df():
+    return block_returns()
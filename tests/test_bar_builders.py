@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from afml.models.preprocess.bar_builders import (
+    BarBuilder, DollarBarBuilder, ImbalanceBarBuilder, TimeBarBuilder,
+)
+
+import baselines
+from conftest import minute_data
+
+
+@pytest.fixture(params=[('us', None), ('ns', 'Asia/Ho_Chi_Minh')], ids=['us', 'ns-tz'])
+def minutes(request):
+    unit, tz = request.param
+    df = minute_data(60, seed=4, tz=tz, unit=unit)
+    # Một ngày không giao dịch và vài phút đầu ngày không có khớp lệnh
+    day = df.index.normalize()
+    days = day.unique()
+    df.loc[day == days[10], ['volume', 'dollar_value']] = 0
+    first = np.flatnonzero(day == days[20])[:5]
+    df.iloc[first, [df.columns.get_loc('volume'), df.columns.get_loc('dollar_value')]] = 0
+    return df
+
+
+def _cuts(df, seed=5):
+    """Điểm cắt lô ngẫu nhiên, có cả điểm cắt giữa các phút đầu ngày không khớp lệnh."""
+    rng = np.random.default_rng(seed)
+    day = df.index.normalize()
+    inside_zero_run = np.flatnonzero(day == day.unique()[20])[2]
+    return np.sort(np.append(rng.choice(len(df), 30, replace=False), inside_zero_run))
+
+
+def _run_chunked(builder, df, cuts, snapshot_path=None):
+    """Đưa dữ liệu vào từng lô; nếu có snapshot_path thì snapshot/restore sau mỗi lô."""
+    parts = []
+    prev = 0
+    for cut in list(cuts) + [len(df)]:
+        parts.append(builder.update(df.iloc[prev:cut]))
+        prev = cut
+        if snapshot_path is not None:
+            builder.snapshot(snapshot_path)
+            builder = BarBuilder.restore(snapshot_path)
+    return builder, pd.concat([p for p in parts if not p.empty])
+
+
+@pytest.mark.parametrize('snapshot', [False, True])
+def test_time_builder_matches_resample(minutes, tmp_path, snapshot):
+    expected = minutes.resample('15min').agg(
+        open=('typical_price', 'first'), high=('typical_price', 'max'), low=('typical_price', 'min'),
+        close=('typical_price', 'last'), volume=('volume', 'sum'), dollar_value=('dollar_value', 'sum'),
+    ).dropna()
+    expected.index.name = 'close_time'
+    builder, got = _run_chunked(TimeBarBuilder('15min'), minutes, _cuts(minutes),
+                                tmp_path / 'time.npz' if snapshot else None)
+    # Khung cuối còn mở cho tới khi flush
+    pd.testing.assert_frame_equal(got, expected.iloc[:-1], check_dtype=False, check_freq=False)
+    pd.testing.assert_frame_equal(builder.flush(), expected.iloc[-1:], check_dtype=False, check_freq=False)
+
+
+@pytest.mark.parametrize('snapshot', [False, True])
+def test_dollar_builder_matches_static(minutes, tmp_path, snapshot):
+    expected = baselines.dynamic_dollar_bars(minutes, rolling_window=5, n_target=10)
+    _, got = _run_chunked(DollarBarBuilder(5, 10), minutes, _cuts(minutes),
+                          tmp_path / 'dollar.npz' if snapshot else None)
+    # Trung bình trượt theo ngày được cập nhật tăng dần: ngưỡng chỉ khớp tới sai số làm tròn
+    np.testing.assert_allclose(got['vt_threshold'].values, expected['vt_threshold'].values, rtol=1e-12)
+    pd.testing.assert_frame_equal(got.drop(columns='vt_threshold'), expected.drop(columns='vt_threshold'))
+
+
+@pytest.mark.parametrize('snapshot', [False, True])
+def test_imbalance_builder_matches_static(minutes, tmp_path, snapshot):
+    expected = baselines.imbalance_bars(minutes, initial_T_guess=20, span=20)
+    _, got = _run_chunked(ImbalanceBarBuilder(20, 20), minutes, _cuts(minutes),
+                          tmp_path / 'imbalance.npz' if snapshot else None)
+    pd.testing.assert_frame_equal(got, expected)
+
+
+def test_builder_skips_rows_already_seen(minutes):
+    expected = baselines.imbalance_bars(minutes, initial_T_guess=20, span=20)
+    builder = ImbalanceBarBuilder(20, 20)
+    first = builder.update(minutes.iloc[:5000])
+    # Lô sau chồng lấn lô trước (crawler ghi lại vài phút cuối)
+    second = builder.update(minutes.iloc[4000:])
+    pd.testing.assert_frame_equal(pd.concat([first, second]), expected)
@@ -0,0 +1,56 @@
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from afml.models.preprocess.info_driven import DollarBar
+
+import baselines
+from conftest import minute_data
+
+
+def quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+# pandas 2 đọc thời gian CSV ra datetime64[us]: kernel phải nhận đúng ns và trả lại đúng độ phân giải
+INDEX_KINDS = [('ns', None), ('us', None), ('us', 'Asia/Ho_Chi_Minh')]
+
+
+@pytest.mark.parametrize('unit, tz', INDEX_KINDS)
+def test_dollar_bars_match_original(unit, tz):
+    df = minute_data(60, seed=1, tz=tz, unit=unit)
+    expected = baselines.dynamic_dollar_bars(df, rolling_window=5, n_target=10)
+    got = quiet(DollarBar.dynamic_dollar_bars, df, rolling_window=5, n_target=10)
+    assert len(got) > 500
+    pd.testing.assert_frame_equal(got, expected)
+    # Giống bản gốc: index có tz cho thời gian UTC không tz, độ phân giải giữ nguyên
+    assert got.index.dtype == df.index.values.dtype and got['open_time'].dtype == df.index.values.dtype
+
+
+@pytest.mark.parametrize('unit, tz', INDEX_KINDS)
+def test_imbalance_bars_match_original(unit, tz):
+    df = minute_data(60, seed=2, tz=tz, unit=unit)
+    # Dòng thiếu dollar_value bị bỏ qua nhưng vẫn tham gia quy tắc tick (như bản gốc)
+    df.iloc[150:160, df.columns.get_loc('dollar_value')] = np.nan
+    expected = baselines.imbalance_bars(df, initial_T_guess=20, span=20)
+    got = quiet(DollarBar.imbalance, df, initial_T_guess=20, span=20)
+    assert len(got) >= 5
+    pd.testing.assert_frame_equal(got, expected)
+    assert got.index.dtype == df.index.values.dtype and got['open_time'].dtype == df.index.values.dtype
+
+
+@pytest.mark.parametrize('run_type', ['tick', 'volume', 'dollar'])
+@pytest.mark.parametrize('unit, tz', INDEX_KINDS)
+def test_runs_bars_match_reference(unit, tz, run_type):
+    df = minute_data(60, seed=3, tz=tz, unit=unit)
+    df.iloc[150:160, df.columns.get_loc('dollar_value')] = np.nan
+    expected = baselines.runs_bars(df, initial_T_guess=20, span=20, run_type=run_type)
+    got = quiet(DollarBar.runs_bar, df, initial_T_guess=20, span=20, run_type=run_type)
+    assert len(got) >= 5
+    assert got.index.dtype == df.index.values.dtype and got['open_time'].dtype == df.index.values.dtype
+    expected = expected.set_index('close_time')[got.columns]
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False, check_index_type=False, rtol=1e-12)
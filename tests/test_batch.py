@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from afml.models.opti.HRP import HRP
+from afml.models.opti.batch import batch_allocate
+
+from conftest import block_returns
+
+
+@pytest.fixture
+def ragged_returns():
+    df = block_returns(n_rows=300, n_assets=12, n_blocks=3, seed=4)
+    # Lịch sử không đều: mã niêm yết muộn và vài phiên thiếu dữ liệu rải rác
+    df.iloc[:120, 3] = np.nan
+    df.iloc[np.random.default_rng(4).choice(300, 20, replace=False), 7] = np.nan
+    return df
+
+
+def _jobs(df):
+    cols = list(df.columns)
+    return [
+        (None, None),
+        ((0, 149), cols[:6]),
+        ((100, 299), cols[2:10]),
+        (slice(50, 250), cols[::2]),
+    ]
+
+
+def test_each_job_matches_direct_allocate(ragged_returns):
+    jobs = _jobs(ragged_returns)
+    got = batch_allocate(ragged_returns, jobs, max_workers=1)
+    assert list(got.index) == list(range(len(jobs))) and got.index.name == 'job'
+    for job_id, (window, tickers) in enumerate(jobs):
+        # window theo nhãn bao gồm 2 đầu; index là RangeIndex nên nhãn = vị trí
+        start, stop = (window.start, window.stop) if isinstance(window, slice) else window or (0, None)
+        rows = slice(start, None if stop is None else stop + 1)
+        tickers = tickers if tickers is not None else list(ragged_returns.columns)
+        expected = HRP().allocate(ragged_returns.iloc[rows][tickers])
+        np.testing.assert_allclose(got.loc[job_id, tickers].values, expected.values, rtol=1e-12)
+        assert got.loc[job_id].drop(tickers).isna().all()
+
+
+def test_pool_matches_serial(ragged_returns):
+    jobs = {f"w{k}": job for k, job in enumerate(_jobs(ragged_returns))}
+    serial = batch_allocate(ragged_returns, jobs, max_workers=1)
+    pooled = batch_allocate(ragged_returns, jobs, max_workers=2)
+    assert list(pooled.index) == list(jobs)
+    pd.testing.assert_frame_equal(pooled, serial)
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_failed_job_does_not_lose_batch(ragged_returns, max_workers):
+    cols = list(ragged_returns.columns)
+    jobs = [(None, cols[:5]), (None, ['ZZZ']), ((0, 0), cols[:4]), ((0, 149), cols[4:])]
+    got, report = batch_allocate(ragged_returns, jobs, max_workers=max_workers, return_report=True)
+    assert report['ok'] == 2 and [job_id for job_id, _ in report['failed']] == [1, 2]
+    assert report['failed'][0][1].startswith('KeyError')
+    assert got.loc[[1, 2]].isna().all().all()
+    np.testing.assert_allclose(got.loc[0, cols[:5]].values, HRP().allocate(ragged_returns[cols[:5]]).values)
+    assert got.loc[3, cols[4:]].sum() == pytest.approx(1.0)
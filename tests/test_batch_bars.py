@@ -0,0 +1,68 @@
+import contextlib
+import io
+
+import pandas as pd
+import pytest
+
+from afml.models.preprocess import batch_bars
+from afml.models.preprocess.info_driven import DollarBar
+
+from conftest import minute_data
+
+TICKERS = ['T0', 'T1', 'T2', 'T3']
+PARAMS = {
+    'dollar': {'rolling_window': 5, 'n_target': 10},
+    'imbalance': {'initial_T_guess': 20, 'span': 20},
+}
+
+
+@pytest.fixture
+def universe(tmp_path, monkeypatch):
+    """datasets/stocks giả lập dưới AFML_HOME tạm (worker của process pool đọc lại cấu hình này)."""
+    stocks_dir = tmp_path / 'datasets' / 'stocks'
+    stocks_dir.mkdir(parents=True)
+    for k, ticker in enumerate(TICKERS):
+        df = minute_data(30 + 5 * k, seed=10 + k)
+        if ticker == 'T1':
+            # Dòng giá lỗi (0 và âm) vẫn đi qua công thức typical/dollar như bản tĩnh
+            df.iloc[700, df.columns.get_loc('low')] = 0.0
+            df.iloc[1500, [df.columns.get_loc(c) for c in ('open', 'low')]] = -1.0
+        df[['open', 'high', 'low', 'close', 'volume']].reset_index().to_csv(stocks_dir / f'{ticker}.csv', index=False)
+    monkeypatch.setenv('AFML_HOME', str(tmp_path))
+    monkeypatch.setattr(batch_bars, 'stocks_data_path', str(stocks_dir))
+    return stocks_dir
+
+
+def _build(bar_type, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return batch_bars.build_universe_bars(bar_type, **kwargs, **PARAMS[bar_type])
+
+
+@pytest.mark.parametrize('bar_type', ['dollar', 'imbalance'])
+def test_universe_bars_serial_parallel_and_static(universe, bar_type):
+    serial, stats = _build(bar_type, max_workers=1)
+    parallel, _ = _build(bar_type, max_workers=2)
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert stats.index.tolist() == TICKERS and stats['error'].isna().all()
+    assert serial['ticker'].cat.categories.tolist() == TICKERS
+
+    static = {'dollar': DollarBar.dynamic_dollar_bars, 'imbalance': DollarBar.imbalance}[bar_type]
+    for ticker in TICKERS:
+        df = pd.read_csv(universe / f'{ticker}.csv', parse_dates=['time'], index_col='time')
+        df['typical_price'] = (df['open'] + df['high'] + df['low'] + df['close']) / 4.0
+        df['dollar_value'] = df['typical_price'] * df['volume']
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = static(df, **PARAMS[bar_type])
+        got = serial[serial['ticker'] == ticker].drop(columns='ticker').set_index('close_time')
+        assert len(got) == stats.loc[ticker, 'bars'] > 0
+        # Thời gian giữ độ phân giải của CSV (datetime64[us]) như bản tĩnh
+        assert got.index.dtype == expected.index.dtype and got['open_time'].dtype == expected['open_time'].dtype
+        pd.testing.assert_frame_equal(got, expected, check_names=False, rtol=1e-12)
+
+
+def test_universe_bars_duplicate_tickers(universe):
+    bars, stats = _build('dollar', tickers=['T1', 'T0', 'T1'], max_workers=1)
+    assert stats.index.tolist() == ['T1', 'T0']
+    assert bars['ticker'].cat.categories.tolist() == ['T1', 'T0']
+    single, _ = _build('dollar', tickers=['T1', 'T0'], max_workers=1)
+    pd.testing.assert_frame_equal(bars, single)
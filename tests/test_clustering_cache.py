@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from afml.models.opti.HRP import HRP
+from afml.models.opti.clustering_cache import ClusteringCache
+
+from conftest import block_returns
+
+
+def test_hit_within_tol_reuses_linkage(returns_df):
+    cache = ClusteringCache(tol=0.05)
+    model = HRP(cache=cache)
+    model.allocate(returns_df.iloc[:480])
+    link = cache._entries[next(iter(cache._entries))][1]
+
+    shifted = returns_df.iloc[20:]
+    assert cache.drift(returns_df.iloc[:480].corr().values, shifted.corr().values) <= cache.tol
+    got = model.allocate(shifted)
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+    # Dùng lại linkage cũ, chỉ Recursive Bisection chạy trên cov mới
+    expected = HRP().allocate_cov(shifted.cov(), shifted.corr(), link=link)
+    np.testing.assert_allclose(got.values, expected.values, rtol=1e-12)
+
+
+def test_miss_beyond_tol_matches_fresh_allocate(returns_df):
+    cache = ClusteringCache(tol=0.05)
+    model = HRP(cache=cache)
+    model.allocate(returns_df)
+    other = block_returns(seed=3)
+    assert cache.drift(returns_df.corr().values, other.corr().values) > cache.tol
+
+    got = model.allocate(other)
+    assert cache.stats()['hits'] == 0 and cache.stats()['misses'] == 2
+    np.testing.assert_allclose(got.values, HRP().allocate(other).values, rtol=1e-12)
+    # Mốc mới thay mốc cũ: gọi lại cùng dữ liệu là hit
+    model.allocate(other)
+    assert cache.stats()['hits'] == 1 and len(cache) == 1
+
+
+def test_lru_eviction_at_capacity(returns_df):
+    cache = ClusteringCache(maxsize=2)
+    model = HRP(cache=cache)
+    universes = [list(returns_df.columns[k:k + 20]) for k in (0, 10, 20)]
+    a, b, c = (returns_df[cols] for cols in universes)
+
+    model.allocate(a)
+    model.allocate(b)
+    model.allocate(a)  # a thành mới dùng nhất -> b bị loại khi thêm c
+    model.allocate(c)
+    assert len(cache) == 2 and cache.stats()['evictions'] == 1
+    keys = [cache.make_key(cols, model.estimator.params()) for cols in universes]
+    assert list(cache._entries) == [keys[0], keys[2]]
+
+    model.allocate(b)  # đã bị loại: miss, rồi loại tiếp a
+    assert list(cache._entries) == [keys[2], keys[1]]
+    assert cache.stats() == {'hits': 1, 'misses': 4, 'evictions': 2, 'size': 2, 'hit_rate': pytest.approx(0.2)}
+
+
+def test_invalid_metric():
+    with pytest.raises(ValueError):
+        ClusteringCache(metric='l1')
@@ -0,0 +1,54 @@
+import contextlib
+import io
+
+import pandas as pd
+import pytest
+
+from afml.services import columnar_store, data_loader
+
+from conftest import minute_data
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    csv_path, store_path = tmp_path / 'csv', tmp_path / 'store'
+    csv_path.mkdir()
+    # Hai tháng để đọc theo khoảng phải cắt qua ranh giới phân vùng
+    df = minute_data(45, seed=9)[['open', 'high', 'low', 'close', 'volume']].reset_index()
+    df.to_csv(csv_path / 'NAIVE.csv', index=False)
+    df.assign(time=df['time'].dt.tz_localize('Asia/Ho_Chi_Minh')).to_csv(csv_path / 'AWARE.csv', index=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        columnar_store.convert_csv_to_store(csv_path=str(csv_path), store_path=str(store_path))
+    monkeypatch.setattr(data_loader, 'stocks_data_path', str(csv_path))
+    return str(csv_path), str(store_path)
+
+
+@pytest.mark.parametrize('columns', [None, ['volume', 'close']])
+def test_store_range_read_matches_csv_read(store, columns):
+    _, store_path = store
+    start, end = '2024-01-20', '2024-02-10 10:30'
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = data_loader.load_stocks(['NAIVE'], start, end, columns=columns)['NAIVE']
+    got = columnar_store.read_ticker('NAIVE', start, end, columns, store_path)
+    assert list(got.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(got, expected)
+
+
+def test_store_restores_timezone_and_dtypes(store):
+    csv_path, store_path = store
+    expected = data_loader._read_csv_frame(f"{csv_path}/AWARE.csv", data_loader.CSV_DTYPES, parse_time=True)
+    pd.testing.assert_frame_equal(columnar_store.read_ticker('AWARE', store_path=store_path), expected)
+
+    # Biên khoảng đọc so theo giờ địa phương của dữ liệu
+    got = columnar_store.read_ticker('AWARE', '2024-01-31 14:00', '2024-02-01 09:20', store_path=store_path)
+    wall = expected['time'].dt.tz_localize(None)
+    mask = (wall >= '2024-01-31 14:00') & (wall <= '2024-02-01 09:20')
+    pd.testing.assert_frame_equal(got, expected[mask].reset_index(drop=True))
+
+
+def test_store_merge_keeps_manifest(store):
+    csv_path, store_path = store
+    df = data_loader._read_csv_frame(f"{csv_path}/NAIVE.csv", data_loader.CSV_DTYPES, parse_time=True)
+    # Ghi lại một đoạn đã có: gộp theo 'time', giữ nguyên thứ tự cột và kiểu
+    columnar_store.write_ticker('NAIVE', df.iloc[100:400], store_path)
+    pd.testing.assert_frame_equal(columnar_store.read_ticker('NAIVE', store_path=store_path), df)
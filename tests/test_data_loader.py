@@ -0,0 +1,115 @@
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from afml.services import data_loader
+
+from conftest import minute_data
+
+
+@pytest.fixture
+def empty_agg_store(monkeypatch):
+    calls = []
+    monkeypatch.setattr(data_loader, 'update_aggregates', lambda *args, **kwargs: calls.append((args, kwargs)))
+    monkeypatch.setattr(data_loader, 'list_store_tickers', lambda path=None: [])
+    return calls
+
+
+def test_load_stocks_freq_is_read_only_by_default(empty_agg_store):
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert data_loader.load_stocks(['FPT'], freq='1D') == {}
+    assert empty_agg_store == []
+
+
+def test_load_stocks_freq_update_is_explicit(empty_agg_store):
+    with contextlib.redirect_stdout(io.StringIO()):
+        data_loader.load_stocks(['FPT'], freq='1D', update=True)
+    assert empty_agg_store == [((['FPT'],), {'freqs': ['1D'], 'source': 'csv'})]
+
+
+@pytest.fixture
+def csv_files(tmp_path):
+    df = minute_data(3, seed=6)[['open', 'high', 'low', 'close', 'volume']].reset_index()
+    naive = tmp_path / 'NAIVE.csv'
+    df.to_csv(naive, index=False)
+    aware = tmp_path / 'AWARE.csv'
+    df.assign(time=df['time'].dt.tz_localize('Asia/Ho_Chi_Minh')).to_csv(aware, index=False)
+    no_time = tmp_path / 'NOTIME.csv'
+    df.drop(columns='time').to_csv(no_time, index=False)
+    return [str(naive), str(aware), str(no_time)]
+
+
+@pytest.mark.parametrize('engine', ['process', 'arrow'])
+@pytest.mark.parametrize('parse_time', [True, False])
+def test_read_parallel_engines_return_same_frames(csv_files, engine, parse_time):
+    if engine == 'arrow':
+        pytest.importorskip('pyarrow')
+    kwargs = {'dtypes': data_loader.CSV_DTYPES, 'parse_time': parse_time, 'progress': False}
+    expected = data_loader.read_parallel(csv_files, engine='thread', **kwargs)
+    got = data_loader.read_parallel(csv_files, engine=engine, max_workers=2, **kwargs)
+    assert list(got) == list(expected) == ['NAIVE', 'AWARE', 'NOTIME']
+    for ticker in expected:
+        pd.testing.assert_frame_equal(got[ticker], expected[ticker])
+    assert all(df['volume'].dtype == 'int64' for df in got.values())
+    if parse_time:
+        assert str(expected['AWARE']['time'].dt.tz) == 'UTC+07:00'
+
+
+@pytest.mark.parametrize('source, freq', [('csv', None), ('store', None), ('csv', '1D')])
+def test_compact_reports_memory_on_every_path(monkeypatch, capsys, tmp_path, source, freq):
+    frame = minute_data(1, seed=7)[['open', 'high', 'low', 'close', 'volume']].reset_index()
+    (tmp_path / 'FPT.csv').write_text(frame.to_csv(index=False))
+    monkeypatch.setattr(data_loader, 'stocks_data_path', str(tmp_path))
+    monkeypatch.setattr(data_loader, 'list_store_tickers', lambda path=None: ['FPT'])
+    monkeypatch.setattr(data_loader, 'read_store_parallel', lambda tickers, *args: {'FPT': frame})
+    monkeypatch.setattr(data_loader, 'read_aggregate', lambda *args, **kwargs: frame)
+
+    stocks = data_loader.load_stocks(['FPT'], source=source, freq=freq, compact=True)
+    assert stocks['FPT']['close'].dtype == 'float32'
+    assert capsys.readouterr().out.count('[Memory] 1 mã') == 1
+
+
+@pytest.fixture
+def ragged_stocks(monkeypatch):
+    """Ba mã lệch lịch giao dịch (thiếu dòng, niêm yết muộn, có ô NaN) trả về thay cho load_stocks."""
+    rng = np.random.default_rng(11)
+    base = minute_data(2, seed=11)[['close']].reset_index()
+    stocks = {}
+    for k, ticker in enumerate(['AAA', 'BBB', 'CCC']):
+        df = base.iloc[k * 40:].copy()
+        df['close'] += k
+        df = df[rng.random(len(df)) > 0.3 * k].reset_index(drop=True)
+        df.loc[rng.choice(len(df), 5, replace=False), 'close'] = np.nan
+        stocks[ticker] = df
+    monkeypatch.setattr(data_loader, 'load_stocks', lambda *args, **kwargs: stocks)
+    return stocks
+
+
+def _pandas_panel(stocks):
+    long = pd.concat({t: df.set_index('time')['close'] for t, df in stocks.items()}, names=['ticker', 'time'])
+    return long.unstack('ticker').astype(np.float64).rename_axis(columns=None)
+
+
+@pytest.mark.parametrize('how, max_stale', [
+    ('inner', None), ('mask', None), ('ffill', None), ('ffill', 3), ('ffill', pd.Timedelta('4min')), ('ffill', '7min'),
+])
+def test_load_panel_matches_pandas_reference(ragged_stocks, how, max_stale):
+    got = data_loader.load_panel('close', how=how, max_stale=max_stale)
+    panel = _pandas_panel(ragged_stocks)
+    if how == 'inner':
+        expected = panel.dropna()
+    elif how == 'mask':
+        expected = panel
+    elif max_stale is None or isinstance(max_stale, int):
+        expected = panel.ffill(limit=max_stale)
+    else:
+        # Giới hạn theo thời gian: chỉ điền khi mốc có giá trị gần nhất chưa cũ quá max_stale
+        times = pd.Series(panel.index, index=panel.index)
+        last_seen = panel.notna().apply(lambda valid: times.where(valid).ffill())
+        fresh = last_seen.rsub(times, axis=0) <= pd.Timedelta(max_stale)
+        expected = panel.ffill().where(panel.notna() | fresh)
+    pd.testing.assert_frame_equal(got, expected, check_freq=False, check_index_type=False)
+    assert got.index.name == 'time' and list(got.columns) == ['AAA', 'BBB', 'CCC']
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from afml.models.opti.HRP import HRP
+from afml.models.opti.cluster_tree import ClusterTree
+
+import baselines
+
+
+@pytest.mark.parametrize('block_size', [None, 7])
+def test_distance_matrix_matches_pairwise_loop(returns_df, block_size):
+    corr = returns_df.corr()
+    expected = baselines.distance_of_distance(corr)
+    got = HRP(block_size=block_size).get_distance_matrix(corr)
+    np.testing.assert_allclose(got.values, expected.values, atol=1e-10)
+    assert got.index.equals(corr.index) and got.columns.equals(corr.columns)
+
+
+def test_distance_matrix_float32(returns_df):
+    corr = returns_df.corr()
+    got = HRP(dtype=np.float32).get_distance_matrix(corr)
+    assert got.values.dtype == np.float32
+    np.testing.assert_allclose(got.values, baselines.distance_of_distance(corr).values, atol=1e-4)
+
+
+@pytest.mark.parametrize('use_numba', [False, True])
+def test_rec_bipart_matches_list_bisection(returns_df, use_numba):
+    cov = returns_df.cov()
+    sort_ix = list(np.random.default_rng(1).permutation(cov.shape[0]))
+    expected = baselines.rec_bipart(cov, sort_ix)
+    got = HRP(use_numba=use_numba).get_rec_bipart(cov, sort_ix)
+    assert list(got.index) == sort_ix
+    np.testing.assert_allclose(got.values, expected.values, rtol=1e-12)
+    assert got.sum() == pytest.approx(1.0)
+
+
+@pytest.fixture
+def scipy_link(returns_df):
+    model = HRP()
+    return model.get_linkage(model.get_distance_matrix(returns_df.corr()))
+
+
+def test_quasi_diag_matches_original(scipy_link):
+    assert HRP().get_quasi_diag(scipy_link) == baselines.quasi_diag(scipy_link)
+
+
+def test_cluster_tree_splits_follow_dendrogram(scipy_link):
+    tree = ClusterTree(scipy_link)
+    n = tree.n_leaves
+    splits = tree.splits()
+    assert len(splits) == n - 1 and tuple(splits[0]) == (0, tree.size[tree.left[-1]], n)
+    for (start, mid, stop), node in zip(splits, range(tree.root, n - 1, -1)):
+        left, right = tree.children(node)
+        assert set(tree.order[start:mid]) == set(tree.leaves(left))
+        assert set(tree.order[mid:stop]) == set(tree.leaves(right))
+
+
+def test_cluster_tree_dendrogram_matches_scipy(scipy_link):
+    from scipy.cluster.hierarchy import dendrogram
+    expected = dendrogram(scipy_link, no_plot=True)
+    icoord, dcoord = ClusterTree(scipy_link).dendrogram_coords()
+    segments = sorted((tuple(xs), tuple(ys)) for xs, ys in zip(icoord, dcoord))
+    assert segments == sorted((tuple(xs), tuple(ys)) for xs, ys in zip(expected['icoord'], expected['dcoord']))
+    assert ClusterTree(scipy_link).order.tolist() == expected['leaves']
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from afml.utils.math_engines import PANEL_COL_BLOCK, panel_features, panel_log_returns
+
+
+def _prices(n_rows=200, n_cols=PANEL_COL_BLOCK * 2 + 5, seed=0):
+    """Giá dương ngẫu nhiên, rải NaN, 0 và giá âm để kiểm tra mặt nạ."""
+    rng = np.random.default_rng(seed)
+    prices = 50 * np.exp(np.cumsum(rng.normal(0, 0.01, (n_rows, n_cols)), axis=0))
+    bad = rng.random(prices.shape)
+    prices[bad < 0.02] = np.nan
+    prices[(bad >= 0.02) & (bad < 0.03)] = 0.0
+    prices[(bad >= 0.03) & (bad < 0.035)] = -1.0
+    return prices
+
+
+def _reference_log_returns(prices):
+    p1, p0 = prices[1:], prices[:-1]
+    valid = (p1 > 0) & (p0 > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(valid, np.log(p1 / p0), np.nan)
+
+
+def _reference_features(o, h, lo, c, v):
+    valid = (o > 0) & (h > 0) & (lo > 0) & (c > 0)
+    typical = np.where(valid, (o + h + lo + c) / 4, np.nan)
+    dollar = typical * v if v is not None else np.where(valid, o + h + lo + c, np.nan)
+    return _reference_log_returns(c), typical, dollar
+
+
+@pytest.mark.parametrize('parallel', [False, True])
+def test_panel_log_returns_matches_numpy(parallel):
+    prices = _prices()
+    got = panel_log_returns(prices, parallel=parallel)
+    np.testing.assert_allclose(got, _reference_log_returns(prices), rtol=1e-14)
+    assert np.isnan(got).sum() > 0 and np.isfinite(got[~np.isnan(got)]).all()
+
+
+@pytest.mark.parametrize('parallel', [False, True])
+def test_panel_log_returns_in_place(parallel):
+    prices = _prices(seed=1)
+    expected = _reference_log_returns(prices)
+    out = panel_log_returns(prices, out=prices[1:], parallel=parallel)
+    assert np.shares_memory(out, prices)
+    np.testing.assert_allclose(prices[1:], expected, rtol=1e-14)
+
+
+def test_panel_log_returns_1d_and_bad_out():
+    prices = _prices(n_cols=1, seed=2)[:, 0]
+    np.testing.assert_allclose(panel_log_returns(prices)[:, 0], _reference_log_returns(prices), rtol=1e-14)
+    with pytest.raises(ValueError):
+        panel_log_returns(prices, out=np.empty(len(prices)))
+
+
+@pytest.mark.parametrize('parallel', [False, True])
+@pytest.mark.parametrize('with_volume', [True, False])
+def test_panel_features_matches_numpy(parallel, with_volume):
+    rng = np.random.default_rng(3)
+    close = _prices(seed=3)
+    open_ = close * np.exp(rng.normal(0, 0.002, close.shape))
+    high = np.fmax(open_, close) * 1.001
+    low = np.fmin(open_, close) * 0.999
+    low[5, :3] = -2.0
+    volume = rng.integers(0, 1000, close.shape).astype(np.float64) if with_volume else None
+    if with_volume:
+        volume[rng.random(close.shape) < 0.01] = np.nan
+
+    got = panel_features(open_, high, low, close, volume, parallel=parallel)
+    for g, e in zip(got, _reference_features(open_, high, low, close, volume)):
+        np.testing.assert_allclose(g, e, rtol=1e-14)
+    assert np.isnan(got[1][5, :3]).all()
+
+
+@pytest.mark.parametrize('parallel', [False, True])
+def test_panel_features_in_place(parallel):
+    rng = np.random.default_rng(4)
+    close = _prices(seed=4)
+    open_, high, low = close * 1.0005, close * 1.001, close * 0.999
+    volume = rng.integers(1, 1000, close.shape).astype(np.float64)
+    expected = _reference_features(open_, high, low, close, volume)
+
+    # Lợi suất ghi đè lên close[1:], typical/dollar ghi đè lên open/volume
+    returns, typical, dollar = panel_features(open_, high, low, close, volume, returns_out=close[1:],
+                                              typical_out=open_, dollar_out=volume, parallel=parallel)
+    assert np.shares_memory(returns, close) and typical is open_ and dollar is volume
+    for g, e in zip((returns, typical, dollar), expected):
+        np.testing.assert_allclose(g, e, rtol=1e-14)
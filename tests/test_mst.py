@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from afml.models.opti.HRP import HRP
+from afml.models.opti.mst import IncrementalMST
+
+
+def _scipy_single(dist):
+    import scipy.cluster.hierarchy as sch
+    from scipy.spatial.distance import squareform
+    return sch.linkage(squareform(dist.values, checks=False), method='single')
+
+
+@pytest.mark.parametrize('distance', ['dod', 'corr'])
+def test_mst_linkage_matches_scipy_single(returns_df, distance):
+    dist = HRP(distance=distance).get_distance_matrix(returns_df.corr())
+    expected = _scipy_single(dist)
+    got = IncrementalMST(dist).to_linkage(dist.columns)
+    np.testing.assert_allclose(got[:, 2:], expected[:, 2:], rtol=1e-12)
+    np.testing.assert_array_equal(got[:, :2], expected[:, :2])
+
+
+def test_mst_backend_gives_same_hrp_weights(returns_df):
+    expected = HRP().allocate(returns_df)
+    got = HRP(linkage_backend='mst').allocate(returns_df)
+    np.testing.assert_allclose(got.values, expected.values, rtol=1e-12)
+
+
+def test_mst_insert_remove_matches_rebuild(returns_df):
+    dist = HRP(distance='corr').get_distance_matrix(returns_df.corr())
+    labels = list(dist.columns)
+    mst = IncrementalMST(dist.loc[labels[:-3], labels[:-3]])
+    for label in labels[-3:]:
+        mst.insert(label, dist.loc[label, mst.labels])
+    for label in (labels[0], labels[17], labels[-1]):
+        mst.remove(label)
+    kept = [l for l in labels if l not in (labels[0], labels[17], labels[-1])]
+    expected = _scipy_single(dist.loc[kept, kept])
+    got = mst.to_linkage(kept)
+    np.testing.assert_allclose(got[:, 2:], expected[:, 2:], rtol=1e-12)
+    np.testing.assert_array_equal(got[:, :2], expected[:, :2])
@@ -0,0 +1,54 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from afml.models.opti import NCO as nco_module
+from afml.models.opti.NCO import NCO, opt_port
+
+from conftest import block_returns
+
+
+@pytest.fixture
+def pools(monkeypatch):
+    """Ghi lại số process pool NCO tự dựng."""
+    created = []
+
+    class CountingPool(ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            created.append(kwargs.get('max_workers'))
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(nco_module, 'ProcessPoolExecutor', CountingPool)
+    return created
+
+
+def test_nco_small_universe_solves_in_process(returns_df, pools):
+    weights = NCO(n_clusters=4).allocate(returns_df)
+    assert pools == []
+    assert weights.index.equals(returns_df.columns)
+    assert weights.sum() == pytest.approx(1.0)
+
+
+def test_nco_large_universe_uses_pool_by_default(pools):
+    # 1000 mã ~ 31 cụm cỡ ~32: mỗi cụm nhỏ nhưng tổng khối lượng giải đủ lớn để dùng pool
+    returns_df = block_returns(n_rows=300, n_assets=1000, n_blocks=31, seed=8)
+    expected = NCO(n_clusters=31, max_workers=1).allocate(returns_df)
+    assert pools == []
+    got = NCO(n_clusters=31).allocate(returns_df)
+    assert pools == [None]
+    np.testing.assert_allclose(got.values, expected.values, rtol=1e-12)
+
+
+def test_nco_reused_executor_matches_serial(returns_df):
+    expected = NCO(n_clusters=4).allocate(returns_df)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        model = NCO(n_clusters=4, executor=executor, min_parallel_work=0)
+        for _ in range(2):
+            np.testing.assert_allclose(model.allocate(returns_df).values, expected.values, rtol=1e-12)
+
+
+def test_nco_single_cluster_is_min_variance(returns_df):
+    cov = returns_df.cov().values
+    weights = NCO(n_clusters=1).allocate(returns_df)
+    np.testing.assert_allclose(weights.values, opt_port(cov), rtol=1e-8)
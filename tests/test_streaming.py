@@ -0,0 +1,55 @@
+import contextlib
+import io
+
+import pandas as pd
+import pytest
+
+from afml.services import columnar_store, data_loader, streaming
+
+from conftest import minute_data
+
+
+@pytest.fixture
+def universe(tmp_path, monkeypatch):
+    csv_path, store_path = tmp_path / 'csv', tmp_path / 'store'
+    csv_path.mkdir()
+    df = minute_data(12, seed=5)[['open', 'high', 'low', 'close', 'volume']].reset_index()
+    df.to_csv(csv_path / 'NAIVE.csv', index=False)
+    df.assign(time=df['time'].dt.tz_localize('Asia/Ho_Chi_Minh')).to_csv(csv_path / 'AWARE.csv', index=False)
+    df.iloc[1500:].assign(close=df['close'] * 2).to_csv(csv_path / 'LATE.csv', index=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        columnar_store.convert_csv_to_store(csv_path=str(csv_path), store_path=str(store_path))
+    for module in (streaming, data_loader):
+        monkeypatch.setattr(module, 'stocks_data_path', str(csv_path))
+    monkeypatch.setattr(streaming, 'stocks_store_path', str(store_path))
+    return ['NAIVE', 'AWARE', 'LATE']
+
+
+@pytest.mark.parametrize('source', ['csv', 'store'])
+@pytest.mark.parametrize('freq, start, end, columns', [
+    ('D', None, None, None),
+    ('W', '2024-01-03 10:00', '2024-01-11 13:30', ['close', 'volume']),
+])
+def test_stream_chunks_concat_to_load_stocks(universe, source, freq, start, end, columns):
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = data_loader.load_stocks(universe, start, end, columns=columns)
+    pieces = {t: [] for t in universe}
+    periods = []
+    # Khối byte nhỏ để một kỳ trải qua nhiều khối và ranh giới khối rơi giữa kỳ
+    for period_start, chunk in streaming.stream_stocks(universe, start, end, freq=freq, columns=columns,
+                                                       source=source, block_bytes=4096):
+        periods.append(period_start)
+        for t, df in chunk.items():
+            pieces[t].append(df)
+    assert periods == sorted(periods) and len(periods) > 1
+    for t in universe:
+        got = pd.concat(pieces[t], ignore_index=True)
+        pd.testing.assert_frame_equal(got, expected[t])
+    assert str(expected['AWARE']['time'].dt.tz) == 'UTC+07:00'
+
+
+def test_stream_period_boundaries_use_file_timezone(universe):
+    # Kỳ ngày theo giờ địa phương: phiên 9:15-14:45 (+07:00) nằm trọn trong một kỳ
+    for period_start, chunk in streaming.stream_stocks(['AWARE'], freq='D', prefetch=0, block_bytes=4096):
+        local = chunk['AWARE']['time'].dt.tz_localize(None)
+        assert (local.dt.normalize() == period_start).all()
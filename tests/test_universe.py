@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+from afml.services import universe
+from afml.services.universe import LazyUniverse, build_index
+
+from conftest import minute_data
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    df = minute_data(3, seed=2)[['open', 'high', 'low', 'close', 'volume']].reset_index()
+    for k, ticker in enumerate(['AAA', 'BBB', 'CCC', 'DDD']):
+        df.iloc[k * 10:].to_csv(tmp_path / f"{ticker}.csv", index=False)
+    return str(tmp_path)
+
+
+def _forbid_reads(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("không được mở file dữ liệu")
+    monkeypatch.setattr(universe, '_read_csv_frame', fail)
+    monkeypatch.setattr(universe.pd, 'read_csv', fail)
+
+
+def test_memory_budget_evicts_least_recently_used(data_path):
+    size = int(LazyUniverse(data_path=data_path)['AAA'].memory_usage(deep=True).sum())
+    lazy = LazyUniverse(data_path=data_path, memory_budget=int(2.5 * size))
+
+    lazy['AAA'], lazy['BBB'], lazy['AAA']
+    assert lazy.loaded == ['BBB', 'AAA'] and lazy.evictions == 0
+    lazy['CCC']  # vượt ngân sách -> bỏ BBB (ít dùng gần đây nhất), giữ AAA vừa dùng
+    assert lazy.loaded == ['AAA', 'CCC'] and lazy.evictions == 1
+    assert lazy.memory_used <= lazy.memory_budget
+    assert lazy.memory_used == sum(int(lazy[t].memory_usage(deep=True).sum()) for t in lazy.loaded)
+
+    lazy['BBB']  # đọc lại từ đĩa
+    assert lazy.loaded == ['CCC', 'BBB'] and lazy.evictions == 2
+    assert (lazy.hits, lazy.misses) == (3, 4)
+
+
+def test_single_ticker_over_budget_is_kept(data_path):
+    lazy = LazyUniverse(data_path=data_path, memory_budget=1)
+    lazy['AAA'], lazy['BBB']
+    assert lazy.loaded == ['BBB']
+
+
+def test_metadata_served_from_index_without_opening_files(data_path, monkeypatch):
+    expected = {t: pd.read_csv(f"{data_path}/{t}.csv", parse_dates=['time'])['time'] for t in 'AAA BBB'.split()}
+    build_index(data_path)
+
+    _forbid_reads(monkeypatch)
+    # File không đổi: build_index chỉ dùng lại sidecar
+    build_index(data_path)
+    lazy = LazyUniverse(['AAA', 'BBB'], data_path=data_path)
+    meta = lazy.metadata()
+    assert list(meta.index) == ['AAA', 'BBB']
+    for t, times in expected.items():
+        assert meta.loc[t, 'first'] == times.min() and meta.loc[t, 'last'] == times.max()
+        assert meta.loc[t, 'rows'] == len(times) == lazy.metadata(t)['rows']
+    assert lazy.loaded == [] and lazy.misses == 0
+
+
+def test_metadata_requires_index(data_path):
+    with pytest.raises(FileNotFoundError):
+        LazyUniverse(data_path=data_path).metadata()
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from afml.models.opti.HRP import HRP
+from afml.models.opti.walk_forward import WalkForwardHRP
+
+
+@pytest.mark.parametrize('window, min_periods', [(1, 2), (0, 2), (10, 20)])
+def test_window_smaller_than_min_periods_is_rejected(window, min_periods):
+    with pytest.raises(ValueError, match='window'):
+        WalkForwardHRP(window=window, min_periods=min_periods)
+
+
+@pytest.mark.parametrize('window', [None, 60])
+def test_walk_forward_matches_hrp_on_each_window(returns_df, window):
+    returns_df = returns_df.iloc[:200, :12]
+    engine = WalkForwardHRP(window=window, min_periods=window or 2, refresh_every=5)
+    weights = engine.run(returns_df, rebalance=7)
+    assert len(weights) > 10
+    for ts, row in weights.iterrows():
+        end = returns_df.index.get_loc(ts) + 1
+        start = 0 if window is None else max(0, end - window)
+        expected = HRP().allocate(returns_df.iloc[start:end])
+        np.testing.assert_allclose(row.values, expected.values, rtol=1e-8)
+
+
+def test_smallest_window_runs(returns_df):
+    # window = 2: mọi tương quan là ±1, chỉ kiểm tra chạy hết và trọng số hợp lệ
+    weights = WalkForwardHRP(window=2).run(returns_df.iloc[:50, :8], rebalance=5)
+    assert np.isfinite(weights.values).all()
+    np.testing.assert_allclose(weights.sum(axis=1).values, 1.0)